@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from store.analytics.models import DailyProductSales, DailySales
+from store.analytics.utils.rollups import roll_up_orders
+from store.orders.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Add completed orders that aren't rolled up yet to the daily sales "
+        "rollups. Runs once, or every --interval seconds until stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.ANALYTICS_ROLLUP_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Seconds between rollups. With 0, roll up once and exit.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Delete the rollups and roll up every completed order again.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            with transaction.atomic():
+                DailyProductSales.objects.all().delete()
+                DailySales.objects.all().delete()
+                Order.objects.filter(rolled_up=True).update(rolled_up=False)
+
+        batch_size = options["batch_size"]
+        while True:
+            rolled_up = 0
+            while True:
+                count = roll_up_orders(batch_size)
+                rolled_up += count
+                if count < batch_size:
+                    break
+            self.stdout.write(f"Rolled up {rolled_up} orders.")
+
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
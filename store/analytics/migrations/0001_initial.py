@@ -0,0 +1,70 @@
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("products", "0006_product_is_hot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySales",
+            fields=[
+                ("day", models.DateField(primary_key=True, serialize=False)),
+                ("orders", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("units", models.IntegerField(default=0)),
+            ],
+            options={
+                "db_table": "daily_sales",
+                "managed": True,
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyProductSales",
+            fields=[
+                (
+                    "id",
+                    models.CharField(
+                        default=uuid.uuid4,
+                        max_length=36,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("orders", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("units", models.IntegerField(default=0)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "daily_product_sales",
+                "managed": True,
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "product"),
+                        name="daily_product_sales_day_product",
+                    )
+                ],
+            },
+        ),
+    ]
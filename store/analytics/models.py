@@ -0,0 +1,43 @@
+import uuid
+
+from django.db import models
+from store.products.models import Product
+
+
+class DailySales(models.Model):
+    """Completed orders, revenue and units sold per day."""
+
+    day = models.DateField(primary_key=True)
+    orders = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    units = models.IntegerField(default=0)
+
+    # Fields a row is looked up by when rolling up orders.
+    ROLLUP_KEY = ("day",)
+
+    class Meta:
+        db_table = "daily_sales"
+        managed = True
+
+
+class DailyProductSales(models.Model):
+    """Orders, revenue and units sold of one product per day."""
+
+    id = models.CharField(max_length=36, primary_key=True, default=uuid.uuid4)
+    day = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.DO_NOTHING)
+    orders = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    units = models.IntegerField(default=0)
+
+    ROLLUP_KEY = ("day", "product_id")
+
+    class Meta:
+        db_table = "daily_product_sales"
+        managed = True
+        constraints = [
+            # Also serves the date range scans of the top products report.
+            models.UniqueConstraint(
+                fields=["day", "product"], name="daily_product_sales_day_product"
+            ),
+        ]
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from store.analytics.models import DailySales
+
+
+class DateRangeSerializer(serializers.Serializer):
+    """
+    Validates the date_from/date_to query params of a report. Both are
+    inclusive; date_to defaults to today and date_from to
+    ANALYTICS_DEFAULT_DAYS days before it.
+    """
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        date_to = attrs.get("date_to") or timezone.localdate()
+        date_from = attrs.get("date_from") or date_to - timedelta(
+            days=settings.ANALYTICS_DEFAULT_DAYS - 1
+        )
+        if date_from > date_to:
+            raise serializers.ValidationError(
+                {"date_from": ["Must not be after date_to."]}
+            )
+        if (date_to - date_from).days >= settings.ANALYTICS_MAX_DAYS:
+            raise serializers.ValidationError(
+                {
+                    "date_from": [
+                        f"The range can span at most {settings.ANALYTICS_MAX_DAYS} "
+                        "days."
+                    ]
+                }
+            )
+        return {**attrs, "date_from": date_from, "date_to": date_to}
+
+
+class TopProductsQuerySerializer(DateRangeSerializer):
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    order_by = serializers.ChoiceField(choices=["units", "revenue"], default="units")
+
+
+class DailySalesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailySales
+        fields = ["day", "orders", "revenue", "units"]
+
+
+class RevenueSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    orders = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=None, decimal_places=2)
+    units = serializers.IntegerField()
+    days = DailySalesSerializer(many=True)
+
+
+class TopProductSerializer(serializers.Serializer):
+    product_id = serializers.CharField()
+    name = serializers.CharField(source="product__name")
+    orders = serializers.IntegerField(source="total_orders")
+    units = serializers.IntegerField(source="total_units")
+    revenue = serializers.DecimalField(
+        max_digits=None, decimal_places=2, source="total_revenue"
+    )
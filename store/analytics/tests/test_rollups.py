@@ -0,0 +1,135 @@
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from store.analytics.models import DailyProductSales, DailySales
+from store.analytics.utils.rollups import roll_up_orders
+from store.orders.enums import OrderStatusEnums
+from store.orders.models import Order
+from store.orders.tests.factories import OrderFactory, OrderItemFactory
+from store.orders.utils.order_processing import process_order
+from store.products.models import Product
+
+# Product ids.
+A = "00000000-0000-7000-8000-000000000001"
+B = "00000000-0000-7000-8000-000000000002"
+
+
+@pytest.fixture
+def products(db):
+    return [
+        Product.objects.create(id=A, name="A", price=10, stock=100),
+        Product.objects.create(id=B, name="B", price=25, stock=100),
+    ]
+
+
+def place(day, lines, status=OrderStatusEnums.COMPLETED.value):
+    """Create an order on ``day`` with (product, quantity) lines."""
+    order = OrderFactory(
+        status=status,
+        total_price=sum(product.price * quantity for product, quantity in lines),
+    )
+    for product, quantity in lines:
+        OrderItemFactory(order=order, product=product, quantity=quantity)
+    Order.objects.filter(id=order.id).update(
+        created=datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc)
+    )
+    return order
+
+
+def daily_sales():
+    return {
+        row.day: (row.orders, row.revenue, row.units)
+        for row in DailySales.objects.all()
+    }
+
+
+def daily_product_sales():
+    return {
+        (row.day, row.product_id): (row.orders, row.revenue, row.units)
+        for row in DailyProductSales.objects.all()
+    }
+
+
+@pytest.mark.django_db
+def test_roll_up_orders(products):
+    """Should sum completed orders per day and per product and day."""
+    a, b = products
+    place(date(2025, 1, 1), [(a, 2), (b, 1)])
+    place(date(2025, 1, 1), [(a, 1)])
+    place(date(2025, 1, 2), [(b, 4)])
+    place(date(2025, 1, 2), [(a, 5)], status=OrderStatusEnums.PENDING.value)
+
+    assert roll_up_orders(batch_size=100) == 3
+
+    assert daily_sales() == {
+        date(2025, 1, 1): (2, Decimal("55.00"), 4),
+        date(2025, 1, 2): (1, Decimal("100.00"), 4),
+    }
+    assert daily_product_sales() == {
+        (date(2025, 1, 1), A): (2, Decimal("30.00"), 3),
+        (date(2025, 1, 1), B): (1, Decimal("25.00"), 1),
+        (date(2025, 1, 2), B): (1, Decimal("100.00"), 4),
+    }
+    assert Order.objects.filter(rolled_up=False).count() == 1
+    assert roll_up_orders(batch_size=100) == 0
+
+
+@pytest.mark.django_db
+def test_roll_up_orders_is_incremental(products):
+    """Should add new orders to the existing rollup rows, in batches."""
+    a, b = products
+    for _ in range(3):
+        place(date(2025, 1, 1), [(a, 1)])
+    assert roll_up_orders(batch_size=2) == 2
+
+    place(date(2025, 1, 1), [(a, 1), (b, 2)])
+    assert roll_up_orders(batch_size=2) == 2
+
+    assert daily_sales() == {date(2025, 1, 1): (4, Decimal("90.00"), 6)}
+    assert daily_product_sales() == {
+        (date(2025, 1, 1), A): (4, Decimal("40.00"), 4),
+        (date(2025, 1, 1), B): (1, Decimal("50.00"), 2),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_process_order_rolls_up_on_commit(products, settings):
+    settings.ANALYTICS_ROLLUP_ON_ORDER = True
+    order = process_order([{"product_id": A, "quantity": 3}])
+
+    order.refresh_from_db()
+    assert order.rolled_up
+    assert daily_sales() == {order.created.date(): (1, Decimal("30.00"), 3)}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_process_order_without_rollup(products, settings):
+    settings.ANALYTICS_ROLLUP_ON_ORDER = False
+    order = process_order([{"product_id": A, "quantity": 3}])
+
+    order.refresh_from_db()
+    assert not order.rolled_up
+    assert not DailySales.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rollup_sales_command(products):
+    a, b = products
+    place(date(2025, 1, 1), [(a, 1)])
+    place(date(2025, 1, 2), [(b, 1)])
+    roll_up_orders(batch_size=100)
+    DailySales.objects.filter(day=date(2025, 1, 1)).update(orders=99)
+    place(date(2025, 1, 2), [(a, 2)])
+    out = StringIO()
+
+    call_command("rollup_sales", "--batch-size", "1", stdout=out)
+    assert "Rolled up 1 orders." in out.getvalue()
+
+    call_command("rollup_sales", "--rebuild", stdout=out)
+    assert "Rolled up 3 orders." in out.getvalue()
+    assert daily_sales() == {
+        date(2025, 1, 1): (1, Decimal("10.00"), 1),
+        date(2025, 1, 2): (2, Decimal("45.00"), 3),
+    }
@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from store import error_codes
+from store.analytics.models import DailyProductSales, DailySales
+from store.products.tests.factories import ProductsFactory
+
+
+class TestRevenueAPIView(APITestCase):
+    def setUp(self):
+        self.url = reverse("analytics:revenue")
+        DailySales.objects.create(
+            day=date(2025, 1, 1), orders=2, revenue=Decimal("55.50"), units=4
+        )
+        DailySales.objects.create(
+            day=date(2025, 1, 3), orders=1, revenue=Decimal("10.00"), units=1
+        )
+
+    def test_get_revenue(self):
+        """Test totals and per-day rows, with zeros for days without sales."""
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url, {"date_from": "2025-01-01", "date_to": "2025-01-03"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "status": "success",
+            "message": "Revenue retrieved successfully.",
+            "data": {
+                "date_from": "2025-01-01",
+                "date_to": "2025-01-03",
+                "orders": 3,
+                "revenue": 65.5,
+                "units": 5,
+                "days": [
+                    {"day": "2025-01-01", "orders": 2, "revenue": 55.5, "units": 4},
+                    {"day": "2025-01-02", "orders": 0, "revenue": 0.0, "units": 0},
+                    {"day": "2025-01-03", "orders": 1, "revenue": 10.0, "units": 1},
+                ],
+            },
+        }
+
+    @override_settings(ANALYTICS_DEFAULT_DAYS=7)
+    def test_default_range(self):
+        """Test the last ANALYTICS_DEFAULT_DAYS days are reported by default."""
+        response = self.client.get(self.url)
+
+        data = response.json()["data"]
+        today = timezone.localdate()
+        assert data["date_to"] == today.isoformat()
+        assert data["date_from"] == (today - timedelta(days=6)).isoformat()
+        assert len(data["days"]) == 7
+
+    @override_settings(ANALYTICS_MAX_DAYS=31)
+    def test_invalid_range(self):
+        for params in [
+            {"date_from": "2025-01-02", "date_to": "2025-01-01"},
+            {"date_from": "2025-01-01", "date_to": "2025-02-01"},
+            {"date_from": "yesterday"},
+        ]:
+            response = self.client.get(self.url, params)
+
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert response.json()["code"] == error_codes.VALIDATION_ERROR
+            assert "date_from" in response.json()["errors"]
+
+
+class TestTopProductsAPIView(APITestCase):
+    def setUp(self):
+        self.url = reverse("analytics:top-products")
+        self.params = {"date_from": "2025-01-01", "date_to": "2025-01-31"}
+        self.mouse = ProductsFactory(name="Mouse", price=10)
+        self.laptop = ProductsFactory(name="Laptop", price=900)
+        for day, product, units, revenue in [
+            (date(2025, 1, 1), self.mouse, 3, "30.00"),
+            (date(2025, 1, 2), self.mouse, 2, "20.00"),
+            (date(2025, 1, 2), self.laptop, 1, "900.00"),
+            (date(2025, 2, 1), self.laptop, 9, "8100.00"),
+        ]:
+            DailyProductSales.objects.create(
+                day=day, product=product, orders=1, units=units, revenue=revenue
+            )
+
+    def test_get_top_products_by_units(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, self.params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"] == [
+            {
+                "product_id": str(self.mouse.id),
+                "name": "Mouse",
+                "orders": 2,
+                "units": 5,
+                "revenue": 50.0,
+            },
+            {
+                "product_id": str(self.laptop.id),
+                "name": "Laptop",
+                "orders": 1,
+                "units": 1,
+                "revenue": 900.0,
+            },
+        ]
+
+    def test_get_top_products_by_revenue(self):
+        response = self.client.get(
+            self.url, {**self.params, "order_by": "revenue", "limit": 1}
+        )
+
+        assert [product["name"] for product in response.json()["data"]] == ["Laptop"]
+
+    def test_invalid_params(self):
+        response = self.client.get(self.url, {"order_by": "name", "limit": 0})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.json()["errors"]) == {"order_by", "limit"}
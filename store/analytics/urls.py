@@ -0,0 +1,17 @@
+from django.urls import path
+from store.analytics.views import RevenueAPIView, TopProductsAPIView
+
+app_name = "analytics"
+
+urlpatterns = [
+    path(
+        "revenue/",
+        view=RevenueAPIView.as_view(),
+        name="revenue",
+    ),
+    path(
+        "top-products/",
+        view=TopProductsAPIView.as_view(),
+        name="top-products",
+    ),
+]
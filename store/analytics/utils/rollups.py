@@ -0,0 +1,150 @@
+from collections import defaultdict
+from decimal import Decimal
+from functools import partial
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from store.analytics.models import DailyProductSales, DailySales
+from store.orders.enums import OrderStatusEnums
+from store.orders.models import Order, OrderItem
+
+
+def new_totals() -> Dict:
+    return {"orders": 0, "revenue": Decimal("0"), "units": 0}
+
+
+def rollup_key(row) -> Tuple:
+    return tuple(getattr(row, field) for field in row.ROLLUP_KEY)
+
+
+def rollup_rows(model, keys: Iterable[Tuple]):
+    """Return the rows of ``model`` matching ``keys``, and possibly more."""
+    keys = list(keys)
+    return model.objects.filter(
+        **{
+            f"{field}__in": {key[position] for key in keys}
+            for position, field in enumerate(model.ROLLUP_KEY)
+        }
+    )
+
+
+def add_to_rollups(model, totals: Dict[Tuple, Dict]) -> None:
+    """
+    Add ``totals`` to the rollup rows they are keyed by, creating missing
+    rows with zero totals first.
+
+    The rows are locked in primary key order and updated with one bulk
+    update, so concurrent rollups of the same day queue instead of
+    overwriting each other.
+
+    Args:
+        model: DailySales or DailyProductSales.
+        totals (dict): ROLLUP_KEY values -> {"orders", "revenue", "units"}.
+    """
+    locked = {
+        rollup_key(row): row
+        for row in rollup_rows(model, totals).select_for_update().order_by("pk")
+    }
+    missing = [key for key in totals if key not in locked]
+    if missing:
+        # Rows a concurrent rollup creates first are locked below instead.
+        model.objects.bulk_create(
+            [model(**dict(zip(model.ROLLUP_KEY, key))) for key in missing],
+            ignore_conflicts=True,
+        )
+        for row in rollup_rows(model, missing).select_for_update().order_by("pk"):
+            locked.setdefault(rollup_key(row), row)
+
+    updated = []
+    for key, row in locked.items():
+        if key in totals:
+            for field, value in totals[key].items():
+                setattr(row, field, getattr(row, field) + value)
+            updated.append(row)
+    model.objects.bulk_update(updated, ["orders", "revenue", "units"])
+
+
+def sum_orders(
+    orders: List[Tuple], items: List[Tuple]
+) -> Tuple[Dict[Tuple, Dict], Dict[Tuple, Dict]]:
+    """
+    Sum orders and their items per day and per product and day.
+
+    Args:
+        orders (list): (id, created, total_price) of every order.
+        items (list): (order_id, product_id, quantity, unit_price) of their
+        items.
+
+    Returns:
+        tuple: ({(day,): totals}, {(day, product_id): totals})
+    """
+    days = {}
+    daily = defaultdict(new_totals)
+    for order_id, created, total_price in orders:
+        day = days[order_id] = timezone.localtime(created).date()
+        daily[(day,)]["orders"] += 1
+        daily[(day,)]["revenue"] += total_price
+
+    per_product = defaultdict(new_totals)
+    for order_id, product_id, quantity, unit_price in items:
+        day = days[order_id]
+        daily[(day,)]["units"] += quantity
+        totals = per_product[(day, product_id)]
+        totals["orders"] += 1
+        totals["units"] += quantity
+        totals["revenue"] += unit_price * quantity
+    return daily, per_product
+
+
+def roll_up_orders(batch_size: int, order_ids: List[str] = None) -> int:
+    """
+    Add completed orders that aren't rolled up yet to the daily rollups,
+    oldest first, and flag them as rolled up.
+
+    Runs in one transaction, so an order is counted exactly once even if
+    several rollups run at the same time.
+
+    Args:
+        batch_size (int): Maximum number of orders to roll up.
+        order_ids (list, optional): Only roll up these orders.
+
+    Returns:
+        int: The number of orders rolled up.
+    """
+    with transaction.atomic():
+        orders = Order.objects.select_for_update().filter(
+            rolled_up=False, status=OrderStatusEnums.COMPLETED.value
+        )
+        if order_ids is not None:
+            orders = orders.filter(id__in=order_ids)
+        orders = list(
+            orders.order_by("created", "id").values_list(
+                "id", "created", "total_price"
+            )[:batch_size]
+        )
+        if not orders:
+            return 0
+
+        ids = [order_id for order_id, _, _ in orders]
+        items = OrderItem.objects.filter(order_id__in=ids).values_list(
+            "order_id", "product_id", "quantity", "unit_price"
+        )
+        daily, per_product = sum_orders(orders, items)
+        add_to_rollups(DailySales, daily)
+        add_to_rollups(DailyProductSales, per_product)
+        Order.objects.filter(id__in=ids).update(rolled_up=True)
+    return len(orders)
+
+
+def roll_up_on_commit(order_ids: List[str]) -> None:
+    """
+    Roll up the given orders once the current transaction commits, if
+    ANALYTICS_ROLLUP_ON_ORDER is set. A failed rollup is logged and left to
+    the rollup_sales command.
+    """
+    if settings.ANALYTICS_ROLLUP_ON_ORDER and order_ids:
+        transaction.on_commit(
+            partial(roll_up_orders, len(order_ids), order_ids), robust=True
+        )
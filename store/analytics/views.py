@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.db.models import Sum
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.serializers import ValidationError
+from store import error_codes
+from store.analytics.models import DailyProductSales, DailySales
+from store.db_router import replica_reads
+from store.analytics.serializers import (
+    DateRangeSerializer,
+    RevenueSerializer,
+    TopProductSerializer,
+    TopProductsQuerySerializer,
+)
+
+
+class AnalyticsAPIView(generics.GenericAPIView):
+    """
+    Base class of the reports, which read the daily rollups only, so their
+    cost depends on the date range and not on the number of orders. They
+    read from a replica, if configured.
+    """
+
+    query_serializer_class = DateRangeSerializer
+    message = None
+
+    def get_report(self, params):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        try:
+            query = self.query_serializer_class(data=request.query_params)
+            query.is_valid(raise_exception=True)
+            with replica_reads():
+                report = self.get_report(query.validated_data)
+            return Response(
+                {
+                    "status": "success",
+                    "message": self.message,
+                    "data": report,
+                },
+                status.HTTP_200_OK,
+            )
+
+        except ValidationError as e:
+            return Response(
+                {
+                    "errors": e.detail,
+                    "code": error_codes.VALIDATION_ERROR,
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+
+class RevenueAPIView(AnalyticsAPIView):
+    """Orders, revenue and units sold in a date range, in total and per day."""
+
+    serializer_class = RevenueSerializer
+    message = "Revenue retrieved successfully."
+
+    def get_report(self, params):
+        date_from, date_to = params["date_from"], params["date_to"]
+        rows = DailySales.objects.filter(day__range=(date_from, date_to)).in_bulk()
+        days = [
+            rows.get(date_from + timedelta(days=offset))
+            or DailySales(day=date_from + timedelta(days=offset))
+            for offset in range((date_to - date_from).days + 1)
+        ]
+        report = {
+            "date_from": date_from,
+            "date_to": date_to,
+            "orders": sum(day.orders for day in days),
+            "revenue": sum(day.revenue for day in days),
+            "units": sum(day.units for day in days),
+            "days": days,
+        }
+        return self.get_serializer(report).data
+
+
+class TopProductsAPIView(AnalyticsAPIView):
+    """The best-selling products in a date range, by units or revenue."""
+
+    serializer_class = TopProductSerializer
+    query_serializer_class = TopProductsQuerySerializer
+    message = "Top products retrieved successfully."
+
+    def get_report(self, params):
+        products = (
+            DailyProductSales.objects.filter(
+                day__range=(params["date_from"], params["date_to"])
+            )
+            .values("product_id", "product__name")
+            .annotate(
+                total_orders=Sum("orders"),
+                total_units=Sum("units"),
+                total_revenue=Sum("revenue"),
+            )
+            .order_by(f"-total_{params['order_by']}", "product_id")[: params["limit"]]
+        )
+        return self.get_serializer(products, many=True).data
@@ -0,0 +1,119 @@
+"""
+Closed-loop HTTP load generator for comparing WSGI and ASGI deployments.
+
+Each of ``--concurrency`` workers keeps one keep-alive connection open and
+sends requests back to back for ``--duration`` seconds. Results are
+printed as JSON:
+
+    python -m store.benchmarks.http_load \\
+        --url http://127.0.0.1:8000/products/async/ --concurrency 256
+
+It doesn't load Django, and besides the standard library it only imports
+store.benchmarks.stats. Run it from the root of a checkout, or anywhere
+the store package is importable, on any machine.
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from store.benchmarks.stats import latency_summary
+
+
+class Worker(threading.Thread):
+    def __init__(self, url, deadline, method="GET", body=None, timeout=30):
+        super().__init__(daemon=True)
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path + (f"?{parts.query}" if parts.query else "")
+        self.deadline = deadline
+        self.method = method
+        self.body = body
+        self.timeout = timeout
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def run(self):
+        headers = {"Content-Type": "application/json"} if self.body else {}
+        connection = None
+        while time.monotonic() < self.deadline:
+            if connection is None:
+                connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=self.timeout
+                )
+            started = time.perf_counter()
+            try:
+                connection.request(self.method, self.path, self.body, headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                connection.close()
+                connection = None
+                continue
+            self.latencies.append(time.perf_counter() - started)
+            self.statuses[response.status] = self.statuses.get(response.status, 0) + 1
+            if response.getheader("Connection", "").lower() == "close":
+                connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+
+
+def run(url, concurrency, duration, method="GET", body=None, warmup=0.0):
+    if warmup:
+        run(url, concurrency, warmup, method, body)
+
+    started = time.monotonic()
+    workers = [
+        Worker(url, started + duration, method, body) for _ in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - started
+
+    latencies = [latency for worker in workers for latency in worker.latencies]
+    statuses = {}
+    for worker in workers:
+        for code, count in worker.statuses.items():
+            statuses[str(code)] = statuses.get(str(code), 0) + count
+
+    return {
+        "url": url,
+        "method": method,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": len(latencies),
+        "errors": sum(worker.errors for worker in workers),
+        "statuses": statuses,
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", help="JSON request body, e.g. for POST /orders/.")
+    args = parser.parse_args(argv)
+
+    body = args.body.encode() if args.body else None
+    result = run(
+        args.url, args.concurrency, args.duration, args.method, body, args.warmup
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import datetime
+import json
+import subprocess
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from store.benchmarks.runner import build_scenarios, run_scenario
+from store.benchmarks.seed import seed_orders, seed_products
+from store.products.models import Product
+
+
+def git_revision():
+    try:
+        return (
+            subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            or None
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed the configured database and benchmark process_order, "
+        "GET /products/ and GET /orders/, printing the results as JSON. "
+        "Point DATABASE_* at a scratch database: seeded rows are not removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=1000,
+            help="Products to seed. With 0, existing products are used.",
+        )
+        parser.add_argument("--orders", type=int, default=1000, help="Orders to seed.")
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=["process_order", "products_list", "orders_list"],
+            help="Scenario to run; repeat for several. Defaults to all.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1],
+            help="One or more thread counts; every scenario runs at each.",
+        )
+        parser.add_argument(
+            "--operations",
+            type=int,
+            default=500,
+            help="Operations per scenario and concurrency level.",
+        )
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            "--host",
+            default=(
+                [host for host in settings.ALLOWED_HOSTS if host != "*"]
+                or ["localhost"]
+            )[0],
+            help="Host header for the HTTP scenarios.",
+        )
+        parser.add_argument(
+            "--with-cache",
+            action="store_true",
+            help="Keep the product list cache enabled.",
+        )
+        parser.add_argument("--output", help="Also write the results to this file.")
+
+    def get_product_ids(self, options):
+        if options["products"]:
+            return seed_products(options["products"])
+        return [
+            str(product_id)
+            for product_id in Product.objects.order_by("id").values_list(
+                "id", flat=True
+            )[:1000]
+        ]
+
+    def handle(self, *args, **options):
+        started_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        product_ids = self.get_product_ids(options)
+        if not product_ids:
+            raise CommandError("No products to benchmark, pass --products.")
+        seed_orders(options["orders"], product_ids, seed=options["seed"])
+
+        scenarios = build_scenarios(product_ids, options["host"], options["seed"])
+        names = options["scenario"] or list(scenarios)
+
+        cache_timeout = (
+            settings.PRODUCT_LIST_CACHE_TIMEOUT if options["with_cache"] else 0
+        )
+        results = []
+        with override_settings(PRODUCT_LIST_CACHE_TIMEOUT=cache_timeout):
+            for concurrency in options["concurrency"]:
+                for name in names:
+                    result = run_scenario(
+                        scenarios[name],
+                        options["operations"],
+                        concurrency,
+                        warmup=options["warmup"],
+                    )
+                    results.append(result)
+                    self.stderr.write(
+                        f"{name} x{concurrency}: {result['ops_per_s']} ops/s, "
+                        f"p99 {result['latency_ms']['p99']} ms"
+                    )
+
+        report = {
+            "git_revision": git_revision(),
+            "started_at": started_at,
+            "database": connection.vendor,
+            "django": django.get_version(),
+            "products": Product.objects.count(),
+            "product_list_cache": bool(cache_timeout),
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        self.stdout.write(output)
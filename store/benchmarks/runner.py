@@ -0,0 +1,187 @@
+"""
+In-process benchmark driver for the order and catalog hot paths.
+
+Each scenario runs a fixed number of operations split across
+``concurrency`` threads. Every thread has its own database connection and
+test client, and every operation is timed and has its queries counted, so
+results are comparable between commits on the same machine and database.
+"""
+
+import itertools
+import random
+import threading
+import time
+from typing import Callable, Dict, List
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from store.benchmarks.stats import latency_summary
+from store.orders.utils.order_processing import process_order
+
+# Query strings cycled through by the GET /products/ scenario.
+PRODUCT_LIST_QUERIES = [
+    "",
+    "?ordering=created",
+    "?ordering=-created&page_size=50",
+    "?name=bench%200000",
+    "?page=2",
+    "?count=none",
+]
+
+# Query strings cycled through by the GET /orders/ scenario.
+ORDER_LIST_QUERIES = [
+    "",
+    "?ordering=created",
+    "?page_size=50",
+]
+
+
+class Scenario:
+    """
+    A named operation to benchmark.
+
+    ``make_operation`` is called once per worker thread with that thread's
+    index and returns a callable that performs one operation. It raises to
+    signal a failed operation.
+    """
+
+    def __init__(self, name: str, make_operation: Callable[[int], Callable]):
+        self.name = name
+        self.make_operation = make_operation
+
+
+def http_get_scenario(name: str, path: str, queries: List[str], host: str):
+    def make_operation(worker_index):
+        client = Client(HTTP_HOST=host)
+        # Start each worker at a different query so they don't move in step.
+        start = worker_index % len(queries)
+        urls = itertools.cycle(queries[start:] + queries[:start])
+
+        def operation():
+            response = client.get(path + next(urls))
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+
+        return operation
+
+    return Scenario(name, make_operation)
+
+
+def process_order_scenario(
+    product_ids: List[str], seed: int = 0, max_lines: int = 3
+):
+    def make_operation(worker_index):
+        rng = random.Random(seed + worker_index)
+
+        def operation():
+            lines = rng.sample(
+                product_ids, rng.randint(1, min(max_lines, len(product_ids)))
+            )
+            process_order(
+                [{"product_id": product_id, "quantity": 1} for product_id in lines]
+            )
+
+        return operation
+
+    return Scenario("process_order", make_operation)
+
+
+def build_scenarios(
+    product_ids: List[str], host: str, seed: int = 0
+) -> Dict[str, Scenario]:
+    scenarios = [
+        process_order_scenario(product_ids, seed),
+        http_get_scenario(
+            "products_list", "/products/", PRODUCT_LIST_QUERIES, host
+        ),
+        http_get_scenario("orders_list", "/orders/", ORDER_LIST_QUERIES, host),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+class _Worker:
+    def __init__(self, operation, remaining, threaded):
+        self.operation = operation
+        self.remaining = remaining
+        self.threaded = threaded
+        self.latencies = []
+        self.queries = []
+        self.errors = {}
+
+    def run(self):
+        try:
+            while self.remaining():
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    try:
+                        self.operation()
+                    except Exception as e:
+                        name = type(e).__name__
+                        self.errors[name] = self.errors.get(name, 0) + 1
+                        continue
+                    elapsed = time.perf_counter() - started
+                self.latencies.append(elapsed)
+                self.queries.append(len(captured))
+        finally:
+            if self.threaded:
+                connection.close()
+
+
+def run_scenario(
+    scenario: Scenario, operations: int, concurrency: int, warmup: int = 0
+) -> Dict:
+    """
+    Run ``operations`` operations of ``scenario`` on ``concurrency`` threads.
+
+    With a concurrency of 1 the operations run on the calling thread, so
+    they share its connection and transaction.
+
+    Returns:
+        dict: Throughput, latency percentiles in milliseconds, mean queries
+        per operation and error counts by exception type.
+    """
+    if warmup:
+        run_scenario(scenario, warmup, concurrency)
+
+    counter = itertools.count()
+    lock = threading.Lock()
+
+    def remaining():
+        with lock:
+            return next(counter) < operations
+
+    threaded = concurrency > 1
+    workers = [
+        _Worker(scenario.make_operation(index), remaining, threaded)
+        for index in range(concurrency)
+    ]
+
+    started = time.perf_counter()
+    if threaded:
+        threads = [threading.Thread(target=worker.run) for worker in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        workers[0].run()
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for worker in workers for latency in worker.latencies]
+    queries = [count for worker in workers for count in worker.queries]
+    errors = {}
+    for worker in workers:
+        for name, count in worker.errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "operations": len(latencies),
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "ops_per_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": latency_summary(latencies),
+        "queries_per_op": round(sum(queries) / len(queries), 2) if queries else None,
+    }
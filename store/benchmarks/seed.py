@@ -0,0 +1,82 @@
+import random
+from decimal import Decimal
+from typing import List
+
+from django.db import transaction
+from store.orders.models import Order, OrderItem
+from store.orders.tests.factories import OrderFactory, OrderItemFactory
+from store.products.models import Product
+from store.products.tests.factories import ProductsFactory
+
+# Large enough that the order scenario never runs a product out of stock.
+SEED_STOCK = 1_000_000
+
+
+def seed_products(
+    count: int, batch_size: int = 1000, prefix: str = "Bench"
+) -> List[str]:
+    """
+    Insert ``count`` products built by ProductsFactory.
+
+    Names are ``"<prefix> <n>"`` so the name filter scenarios can match a
+    predictable slice of the catalog.
+
+    Returns:
+        list: Ids of the inserted products.
+    """
+    ids = []
+    for offset in range(0, count, batch_size):
+        products = [
+            ProductsFactory.build(
+                name=f"{prefix} {i:08d}",
+                price=Decimal(10 + i % 500),
+                stock=SEED_STOCK,
+            )
+            for i in range(offset, min(offset + batch_size, count))
+        ]
+        Product.objects.bulk_create(products)
+        ids.extend(str(product.id) for product in products)
+    return ids
+
+
+def seed_orders(
+    count: int,
+    product_ids: List[str],
+    items_per_order: int = 3,
+    batch_size: int = 1000,
+    seed: int = 0,
+) -> int:
+    """
+    Insert ``count`` completed orders built by OrderFactory, each with up to
+    ``items_per_order`` random lines over ``product_ids``. Stock isn't
+    touched; these orders only give the listing scenarios data to page
+    through.
+
+    Returns:
+        int: Number of orders inserted.
+    """
+    if not product_ids:
+        return 0
+
+    rng = random.Random(seed)
+    catalog = list(Product.objects.in_bulk(product_ids).values())
+    per_order = min(items_per_order, len(catalog))
+
+    for offset in range(0, count, batch_size):
+        orders, order_items = [], []
+        for _ in range(min(batch_size, count - offset)):
+            lines = rng.sample(catalog, per_order)
+            order = OrderFactory.build(
+                total_price=sum((product.price for product in lines), Decimal("0"))
+            )
+            orders.append(order)
+            order_items.extend(
+                OrderItemFactory.build(
+                    order=order, product=product, unit_price=product.price
+                )
+                for product in lines
+            )
+        with transaction.atomic():
+            Order.objects.bulk_create(orders)
+            OrderItem.objects.bulk_create(order_items)
+    return count
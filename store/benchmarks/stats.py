@@ -0,0 +1,28 @@
+import statistics
+from typing import Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(
+        len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """Summarize latencies given in seconds as milliseconds."""
+    latencies = sorted(latencies)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        "mean": ms(statistics.fmean(latencies)) if latencies else None,
+        "p50": ms(percentile(latencies, 0.50)),
+        "p95": ms(percentile(latencies, 0.95)),
+        "p99": ms(percentile(latencies, 0.99)),
+        "max": ms(latencies[-1]) if latencies else None,
+    }
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from store.benchmarks.runner import Scenario, run_scenario
+from store.orders.models import Order
+from store.products.models import Product
+
+
+@pytest.mark.django_db
+def test_run_benchmarks_reports_every_scenario(tmp_path):
+    output = tmp_path / "results.json"
+
+    call_command(
+        "run_benchmarks",
+        products=20,
+        orders=10,
+        operations=6,
+        warmup=0,
+        output=str(output),
+        stdout=open(tmp_path / "stdout", "w"),
+        stderr=open(tmp_path / "stderr", "w"),
+    )
+
+    report = json.loads(output.read_text())
+    assert report["database"] == "sqlite"
+    assert report["product_list_cache"] is False
+    assert [result["scenario"] for result in report["results"]] == [
+        "process_order",
+        "products_list",
+        "orders_list",
+    ]
+    for result in report["results"]:
+        assert result["errors"] == {}, result["scenario"]
+        assert result["operations"] == 6
+        assert result["queries_per_op"] > 0
+        assert set(result["latency_ms"]) == {"mean", "p50", "p95", "p99", "max"}
+
+    assert Product.objects.count() == 20
+    # 10 seeded orders plus the 6 placed by the process_order scenario.
+    assert Order.objects.count() == 16
+
+
+@pytest.mark.django_db
+def test_run_scenario_counts_failed_operations():
+    calls = []
+
+    def make_operation(worker_index):
+        def operation():
+            calls.append(worker_index)
+            if len(calls) % 2:
+                raise ValueError
+
+        return operation
+
+    result = run_scenario(Scenario("flaky", make_operation), 10, 1)
+
+    assert len(calls) == 10
+    assert result["operations"] == 5
+    assert result["errors"] == {"ValueError": 5}
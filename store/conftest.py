@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import caches
+from store.orders.utils.hot_stock import reset_store
+from store.orders.utils.idempotency import recent_responses
+from store.products.snapshots import product_snapshots
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Caches outlive the per-test database rollback, so reset them."""
+    for cache in caches.all():
+        cache.clear()
+    recent_responses.clear()
+    product_snapshots.clear()
+    reset_store()
+    yield
@@ -0,0 +1,104 @@
+"""
+Read replica routing.
+
+Every query goes to the primary (``default``) unless it runs inside
+``replica_reads()``, which the list views use for their reads. There, reads
+go to one of the DATABASE_REPLICAS, except:
+
+- inside ``use_primary()``, which pins code that must see the latest data,
+  such as checkout and uniqueness checks;
+- inside a transaction on the primary;
+- for a client that recently wrote, which ReplicaPinningMiddleware pins to
+  the primary for DATABASE_READ_YOUR_WRITES_SECONDS so it reads its own
+  writes despite replication lag.
+"""
+
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+# Cookie that pins a client that just wrote to the primary.
+PIN_COOKIE = "primary_pin"
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+_client_pinned = contextvars.ContextVar("client_pinned", default=False)
+
+
+def replicas():
+    """Return the aliases of the databases reads can be sent to."""
+    return settings.DATABASE_REPLICAS
+
+
+@contextmanager
+def replica_reads():
+    """Send the reads in the block to a replica, where that is safe."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Send every query in the block to the primary."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def pin_client(pinned):
+    """Pin the current request to the primary; returns a token for unpin."""
+    return _client_pinned.set(pinned)
+
+
+def unpin_client(token):
+    _client_pinned.reset(token)
+
+
+def client_pinned() -> bool:
+    """Return True if the current client is pinned to the primary."""
+    return _client_pinned.get()
+
+
+def reads_from_replica() -> bool:
+    """Return True if the reads of replica_reads() go to a replica right now."""
+    with replica_reads():
+        return read_alias() != PRIMARY
+
+
+def read_alias():
+    """Return the alias reads should use right now."""
+    aliases = replicas()
+    if (
+        not aliases
+        or not _replica_reads.get()
+        or _client_pinned.get()
+        or connections[PRIMARY].in_atomic_block
+    ):
+        return PRIMARY
+    return random.choice(aliases)
+
+
+class ReplicaRouter:
+    """Writes go to the primary and reads to read_alias()."""
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        pool = {PRIMARY, *replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
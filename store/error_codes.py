@@ -1,5 +1,9 @@
 SERVER_ERROR = "STR_0001"
 VALIDATION_ERROR = "STR_0002"
+IDEMPOTENCY_KEY_REUSED = "STR_0003"
+ORDER_NOT_FOUND = "STR_0004"
+ORDER_HOLD_INACTIVE = "STR_0005"
+PRODUCT_CHANGED = "STR_0006"
 
 ERRORS = [
     (SERVER_ERROR, "Server Error"),
@@ -7,4 +11,11 @@ ERRORS = [
         VALIDATION_ERROR,
         "Validation Failed, Please check errors field for details",
     ),
+    (
+        IDEMPOTENCY_KEY_REUSED,
+        "Idempotency key was already used with a different request",
+    ),
+    (ORDER_NOT_FOUND, "Order not found"),
+    (ORDER_HOLD_INACTIVE, "Order is not an active stock hold"),
+    (PRODUCT_CHANGED, "Products changed while the order was placed"),
 ]
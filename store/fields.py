@@ -0,0 +1,219 @@
+"""
+Compact UUID primary keys.
+
+CompactUUIDField stores a UUID in 16 bytes (BINARY(16) on MySQL, a BLOB on
+SQLite, the native uuid type on PostgreSQL) instead of a 36 character
+string, which roughly halves every primary key and foreign key index that
+contains it. In Python, and so on the wire, the value stays the canonical
+string, e.g. ``"0195a1f8-3c2e-7d4b-9a61-2f0c8e5b7a13"``.
+
+New keys are UUIDv7: they start with a millisecond timestamp, so rows are
+appended near the end of the clustered InnoDB primary key instead of at a
+random page.
+"""
+
+import os
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+from django.core import exceptions
+from django.db import models
+
+_UUID7_VERSION = 0x7 << 76
+_UUID7_VARIANT = 0b10 << 62
+
+
+def uuid7() -> str:
+    """
+    Return a new time-ordered UUID (version 7) as a string.
+
+    Keys from the same millisecond are ordered randomly.
+    """
+    timestamp = time.time_ns() // 1_000_000 & 0xFFFF_FFFF_FFFF
+    random = int.from_bytes(os.urandom(10), "big")
+    value = (
+        timestamp << 80
+        | _UUID7_VERSION
+        | (random >> 62 & 0xFFF) << 64
+        | _UUID7_VARIANT
+        | random & 0x3FFF_FFFF_FFFF_FFFF
+    )
+    return str(uuid.UUID(int=value))
+
+
+def uuid_string(value) -> str:
+    """
+    Return the canonical string of a UUID given as a UUID, a string in any
+    form uuid.UUID accepts, an int or 16 bytes.
+
+    Raises:
+        ValueError: If ``value`` isn't a UUID.
+    """
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (bytes, memoryview)):
+        return str(uuid.UUID(bytes=bytes(value)))
+    if isinstance(value, int):
+        return str(uuid.UUID(int=value))
+    return str(uuid.UUID(str(value)))
+
+
+def parse_uuid(value) -> Optional[str]:
+    """Return ``value`` as a canonical UUID string, or None if it isn't one."""
+    try:
+        return uuid_string(value)
+    except ValueError:
+        return None
+
+
+class CompactUUIDField(models.UUIDField):
+    description = "Universally unique identifier stored in 16 bytes"
+
+    def get_internal_type(self):
+        # Not "UUIDField": the backends' converters for that type expect the
+        # 32 character strings Django stores where there is no uuid type.
+        return "CompactUUIDField"
+
+    def db_type(self, connection):
+        if connection.features.has_native_uuid_field:
+            return "uuid"
+        if connection.vendor == "mysql":
+            return "binary(16)"
+        return "blob"
+
+    def to_python(self, value):
+        if value is None:
+            return None
+        try:
+            return uuid_string(value)
+        except ValueError:
+            raise exceptions.ValidationError(
+                self.error_messages["invalid"],
+                code="invalid",
+                params={"value": value},
+            )
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = self.to_python(value)
+        if value is None:
+            return None
+        value = uuid.UUID(value)
+        if connection.features.has_native_uuid_field:
+            return value
+        return connection.Database.Binary(value.bytes)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, str):
+            return value
+        return uuid_string(value)
+
+
+def _to_bytes(value):
+    return None if value is None else uuid.UUID(value).bytes
+
+
+def _to_string(value):
+    return None if value is None else uuid_string(value)
+
+
+def _mysql_foreign_keys(schema_editor, columns):
+    """Return (table, name, column, to_table, to_column) of FKs on ``columns``."""
+    connection = schema_editor.connection
+    foreign_keys = []
+    with connection.cursor() as cursor:
+        for table in sorted({table for table, _ in columns}):
+            constraints = connection.introspection.get_constraints(cursor, table)
+            for name, constraint in constraints.items():
+                if not constraint["foreign_key"]:
+                    continue
+                (column,) = constraint["columns"]
+                if (table, column) in columns:
+                    to_table, to_column = constraint["foreign_key"]
+                    foreign_keys.append((table, name, column, to_table, to_column))
+    return foreign_keys
+
+
+def _mysql_convert(schema_editor, columns, to_binary):
+    quote = schema_editor.quote_name
+    foreign_keys = _mysql_foreign_keys(schema_editor, columns)
+    for table, name, _, _, _ in foreign_keys:
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} DROP FOREIGN KEY {quote(name)}"
+        )
+    for table, column in columns:
+        table, column = quote(table), quote(column)
+        # A VARBINARY column holds both forms, so the values can be
+        # rewritten in place between the two type changes.
+        schema_editor.execute(
+            f"ALTER TABLE {table} MODIFY {column} varbinary(36) NOT NULL"
+        )
+        if to_binary:
+            schema_editor.execute(
+                f"UPDATE {table} SET {column} = UNHEX(REPLACE({column}, '-', ''))"
+            )
+            final_type = "binary(16)"
+        else:
+            schema_editor.execute(
+                f"UPDATE {table} SET {column} = LOWER(CONCAT_WS('-', "
+                f"HEX(SUBSTR({column}, 1, 4)), HEX(SUBSTR({column}, 5, 2)), "
+                f"HEX(SUBSTR({column}, 7, 2)), HEX(SUBSTR({column}, 9, 2)), "
+                f"HEX(SUBSTR({column}, 11, 6))))"
+            )
+            final_type = "varchar(36)"
+        schema_editor.execute(
+            f"ALTER TABLE {table} MODIFY {column} {final_type} NOT NULL"
+        )
+    for table, name, column, to_table, to_column in foreign_keys:
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} "
+            f"FOREIGN KEY ({quote(column)}) "
+            f"REFERENCES {quote(to_table)} ({quote(to_column)})"
+        )
+
+
+def _sqlite_convert(schema_editor, columns, to_binary):
+    connection = schema_editor.connection
+    connection.ensure_connection()
+    function, stored_as = (
+        ("uuid_bytes", "text") if to_binary else ("uuid_string", "blob")
+    )
+    connection.connection.create_function(
+        function,
+        1,
+        _to_bytes if to_binary else _to_string,
+        deterministic=True,
+    )
+    quote = schema_editor.quote_name
+    for table, column in columns:
+        schema_editor.execute(
+            f"UPDATE {quote(table)} SET {quote(column)} = {function}({quote(column)}) "
+            f"WHERE typeof({quote(column)}) = '{stored_as}'"
+        )
+
+
+def convert_uuid_columns(
+    schema_editor, columns: List[Tuple[str, str]], to_binary: bool = True
+):
+    """
+    Rewrite the UUIDs in ``columns`` between the 36 character string form
+    and 16 bytes, for a migration to or from CompactUUIDField.
+
+    Pass a primary key together with every foreign key column that refers
+    to it, so the rows still join when the migration commits. On MySQL the
+    columns are also changed to their new type, with the foreign keys
+    dropped meanwhile, so run this before the AlterField when converting to
+    bytes and after reversing it when converting back; the AlterField then
+    finds the columns already converted. SQLite keeps either form in any
+    column, and PostgreSQL casts the values in the AlterField itself.
+
+    Args:
+        schema_editor: The migration's schema editor.
+        columns (list): (table, column) pairs.
+        to_binary (bool): Convert to bytes, or back to strings.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        _mysql_convert(schema_editor, columns, to_binary)
+    elif vendor == "sqlite":
+        _sqlite_convert(schema_editor, columns, to_binary)
@@ -0,0 +1,186 @@
+"""
+Per-request query and timing metrics.
+
+RequestMetricsMiddleware activates a RequestMetrics for each request. While
+it is active, every query run on any database connection, including the
+ones used by sync_to_async threads, is counted and timed, and serializers
+using TimedSerializerMixin add their rendering time.
+"""
+
+import contextvars
+import os
+import time
+import traceback
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_current_metrics = contextvars.ContextVar("request_metrics", default=None)
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def call_site_stack(limit=8):
+    """Return the innermost project frames of the current stack as strings."""
+    frames = [
+        f"{os.path.relpath(frame.filename, os.path.dirname(_PROJECT_DIR))}"
+        f":{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(_PROJECT_DIR) and frame.filename != _THIS_FILE
+    ]
+    return frames[-limit:]
+
+
+class RequestMetrics:
+    """Query count, database time and serializer time for one request."""
+
+    def __init__(self, slow_query_ms=None, max_queries=None, slow_query_limit=None):
+        self.slow_query_ms = (
+            settings.REQUEST_METRICS_SLOW_QUERY_MS
+            if slow_query_ms is None
+            else slow_query_ms
+        )
+        self.max_queries = (
+            settings.REQUEST_METRICS_MAX_QUERIES if max_queries is None else max_queries
+        )
+        self.slow_query_limit = (
+            settings.REQUEST_METRICS_SLOW_QUERY_LIMIT
+            if slow_query_limit is None
+            else slow_query_limit
+        )
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.statements = Counter()
+        # (duration, sql, stack) for queries worth reporting.
+        self.flagged_queries = []
+        self._serializer_depth = 0
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.db_time += duration
+        self.statements[sql] += 1
+
+        # A stack is only captured for slow queries, and for every query once
+        # the request has run more than max_queries, which is where N+1
+        # loops show up.
+        too_slow = self.slow_query_ms and duration * 1000 >= self.slow_query_ms
+        too_many = self.max_queries and self.query_count > self.max_queries
+        if too_slow or too_many:
+            self.flagged_queries.append((duration, sql, call_site_stack()))
+
+    def should_report(self):
+        return bool(self.flagged_queries)
+
+    def report(self):
+        """Return a JSON-serializable summary of the request."""
+        now = time.perf_counter()
+        slowest = sorted(self.flagged_queries, key=lambda query: -query[0])
+        summary = {
+            "queries": self.query_count,
+            "db_ms": round(self.db_time * 1000, 3),
+            "serializer_ms": round(self.serializer_time * 1000, 3),
+            "view_ms": (
+                round((now - self.view_started) * 1000, 3)
+                if self.view_started is not None
+                else None
+            ),
+            "total_ms": round((now - self.started) * 1000, 3),
+        }
+        if self.should_report():
+            summary["repeated_queries"] = [
+                {"sql": sql, "count": count}
+                for sql, count in self.statements.most_common(self.slow_query_limit)
+                if count > 1
+            ]
+            summary["slow_queries"] = [
+                {"sql": sql, "ms": round(duration * 1000, 3), "stack": stack}
+                for duration, sql, stack in slowest[: self.slow_query_limit]
+            ]
+        return summary
+
+    def server_timing(self):
+        """Return the value of the Server-Timing header."""
+        summary = self.report()
+        metrics = [
+            f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"',
+            f'serializer;dur={summary["serializer_ms"]}',
+        ]
+        if summary["view_ms"] is not None:
+            metrics.append(f'view;dur={summary["view_ms"]}')
+        metrics.append(f'total;dur={summary["total_ms"]}')
+        return ", ".join(metrics)
+
+
+def activate(metrics):
+    # Connections opened before this module was imported missed the
+    # connection_created hook.
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(None, connection)
+    return _current_metrics.set(metrics)
+
+
+def deactivate(token):
+    _current_metrics.reset(token)
+
+
+def get_current_metrics():
+    return _current_metrics.get()
+
+
+def record_queries(execute, sql, params, many, context):
+    """Database execute wrapper that times queries for the active request."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Wrappers live on the connection object, which outlives reconnects.
+    # Insert rather than append: connection.execute_wrapper() pops the last
+    # wrapper on exit and must not remove this one.
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_queries)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class TimedSerializerMixin:
+    """
+    Adds the time spent in to_representation (and in to_representation_values
+    for ValuesSerializerMixin serializers) to the active request metrics.
+
+    Only the outermost call is timed, so nested and many=True serializers
+    aren't counted twice.
+    """
+
+    def _timed(self, method, value):
+        metrics = _current_metrics.get()
+        if metrics is None or metrics._serializer_depth:
+            return method(value)
+
+        metrics._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return method(value)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics._serializer_depth -= 1
+
+    def to_representation(self, instance):
+        return self._timed(super().to_representation, instance)
+
+    def to_representation_values(self, rows):
+        return self._timed(super().to_representation_values, rows)
@@ -0,0 +1,125 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from store import db_router, instrumentation
+
+logger = logging.getLogger("store.request_metrics")
+
+
+class RequestMetricsMiddleware:
+    """
+    Records query count, database time, serializer time and view time for
+    every request.
+
+    The metrics are returned in a Server-Timing header and, when
+    REQUEST_METRICS_LOG is set, logged as one JSON line per request.
+    Requests with queries slower than REQUEST_METRICS_SLOW_QUERY_MS, or with
+    more than REQUEST_METRICS_MAX_QUERIES queries, are always logged as a
+    warning with the slowest queries and their call sites.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = instrumentation.RequestMetrics()
+        token = instrumentation.activate(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            instrumentation.deactivate(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = instrumentation.RequestMetrics()
+        token = instrumentation.activate(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            instrumentation.deactivate(token)
+        return self.finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = instrumentation.get_current_metrics()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+    def finish(self, request, response, metrics):
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing()
+
+        if metrics.should_report() or settings.REQUEST_METRICS_LOG:
+            line = {
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                **metrics.report(),
+            }
+            level = logging.WARNING if metrics.should_report() else logging.INFO
+            logger.log(level, json.dumps(line))
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """
+    Read-your-writes for the replica routing in store.db_router.
+
+    A successful unsafe request sets a cookie that pins the client to the
+    primary for DATABASE_READ_YOUR_WRITES_SECONDS, so its next reads see
+    what it just wrote even if the replicas lag behind.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = db_router.pin_client(db_router.PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.unpin_client(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = db_router.pin_client(db_router.PIN_COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            db_router.unpin_client(token)
+        return self.finish(request, response)
+
+    def finish(self, request, response):
+        if (
+            db_router.replicas()
+            and settings.DATABASE_READ_YOUR_WRITES_SECONDS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                db_router.PIN_COOKIE,
+                "1",
+                max_age=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
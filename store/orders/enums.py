@@ -4,3 +4,4 @@ from store.enums import BaseEnum
 class OrderStatusEnums(BaseEnum):
     PENDING = 1
     COMPLETED = 2
+    CANCELLED = 3
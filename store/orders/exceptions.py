@@ -1,5 +1,11 @@
 from store.exceptions import BaseException
-from store.error_codes import VALIDATION_ERROR
+from store.error_codes import (
+    IDEMPOTENCY_KEY_REUSED,
+    ORDER_HOLD_INACTIVE,
+    ORDER_NOT_FOUND,
+    PRODUCT_CHANGED,
+    VALIDATION_ERROR,
+)
 from rest_framework import status
 
 
@@ -7,3 +13,27 @@ class InsufficientStockException(BaseException):
     http_status_code = status.HTTP_400_BAD_REQUEST
     error_code = VALIDATION_ERROR
     message = "Insufficient stock"
+
+
+class IdempotencyKeyMismatchException(BaseException):
+    http_status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    error_code = IDEMPOTENCY_KEY_REUSED
+    message = "Idempotency-Key was already used with a different request."
+
+
+class OrderNotFoundException(BaseException):
+    http_status_code = status.HTTP_404_NOT_FOUND
+    error_code = ORDER_NOT_FOUND
+    message = "Order not found."
+
+
+class OrderHoldInactiveException(BaseException):
+    http_status_code = status.HTTP_409_CONFLICT
+    error_code = ORDER_HOLD_INACTIVE
+    message = "Order is not an active stock hold."
+
+
+class ProductChangedException(BaseException):
+    http_status_code = status.HTTP_409_CONFLICT
+    error_code = PRODUCT_CHANGED
+    message = "Products changed while the order was placed, please retry."
@@ -0,0 +1,11 @@
+from django_filters import rest_framework as filters
+from store.orders.models import Order
+
+
+class OrderFilter(filters.FilterSet):
+    created_after = filters.IsoDateTimeFilter(field_name="created", lookup_expr="gte")
+    created_before = filters.IsoDateTimeFilter(field_name="created", lookup_expr="lt")
+
+    class Meta:
+        model = Order
+        fields = ["created_after", "created_before"]
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from store.orders.filters import OrderFilter
+from store.orders.models import Order
+from store.orders.utils.order_export import FORMAT_CSV, FORMAT_NDJSON, export_orders
+
+
+class Command(BaseCommand):
+    help = "Stream orders with their line items as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=[FORMAT_NDJSON, FORMAT_CSV], default=FORMAT_NDJSON
+        )
+        parser.add_argument("--created-after", help="ISO date or datetime.")
+        parser.add_argument("--created-before", help="ISO date or datetime.")
+        parser.add_argument("--output", help="Output file. Defaults to stdout.")
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.ORDER_EXPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        filterset = OrderFilter(
+            {
+                key: options[key]
+                for key in ("created_after", "created_before")
+                if options[key]
+            },
+            queryset=Order.objects.all(),
+        )
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        chunks = export_orders(filterset.qs, options["format"], options["batch_size"])
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", newline="") as f:
+            for chunk in chunks:
+                f.write(chunk)
@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from store.orders.utils.hot_stock import flush_pending_stock, get_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply the quantities sold of hot products to products.stock. Runs "
+        "once, or every --interval seconds until stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.HOT_STOCK_FLUSH_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Seconds between flushes. With 0, flush once and exit.",
+        )
+        parser.add_argument(
+            "--reconcile",
+            action="store_true",
+            help=(
+                "Also rebuild the counters from the database and drop stale "
+                "reservations. Only useful with the sqlite backend, whose "
+                "counters are shared with the server processes."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            flushed = 0
+            while True:
+                count = flush_pending_stock(batch_size)
+                flushed += count
+                if count < batch_size:
+                    break
+            self.stdout.write(f"Flushed {flushed} pending order items.")
+
+            store = get_store()
+            if options["reconcile"] and store is not None:
+                result = store.reconcile()
+                self.stdout.write(
+                    f"Reconciled {result['counters']} counters, dropped "
+                    f"{result['stale_reservations']} stale reservations."
+                )
+
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
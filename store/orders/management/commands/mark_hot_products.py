@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from store.orders.utils.hot_stock import flush_pending_stock
+from store.products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Flag products as hot, so they reserve stock in the hot stock counter "
+        "store, or unflag them with --off. Unflagging flushes pending stock; "
+        "wait HOT_STOCK_RECONCILE_INTERVAL seconds before flagging a product "
+        "again, so no server process keeps its old counter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("product_ids", nargs="+")
+        parser.add_argument("--off", action="store_true")
+
+    def handle(self, *args, **options):
+        # The version bump makes checkouts re-read the flag.
+        updated = Product.objects.filter(id__in=options["product_ids"]).update(
+            is_hot=not options["off"], version=F("version") + 1
+        )
+        if options["off"]:
+            # Orders for these products now decrement products.stock, which
+            # must no longer count the quantities still pending.
+            batch_size = settings.HOT_STOCK_FLUSH_BATCH_SIZE
+            while flush_pending_stock(batch_size) == batch_size:
+                pass
+        self.stdout.write(
+            f"{'Unflagged' if options['off'] else 'Flagged'} {updated} products."
+        )
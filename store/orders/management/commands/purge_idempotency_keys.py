@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from store.orders.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete expired POST /orders/ idempotency keys in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                IdempotencyKey.objects.filter(expires_at__lte=now).values_list(
+                    "key", flat=True
+                )[: options["batch_size"]]
+            )
+            if not keys:
+                break
+            deleted += IdempotencyKey.objects.filter(key__in=keys).delete()[0]
+        self.stdout.write(f"Deleted {deleted} expired idempotency keys.")
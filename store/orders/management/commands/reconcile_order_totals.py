@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from store.orders.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Report total revenue and orders whose total_price doesn't match the "
+        "sum of their line items. All totals are computed in the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--created-after", help="ISO date or datetime.")
+        parser.add_argument("--created-before", help="ISO date or datetime.")
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=100,
+            help="Maximum number of mismatched orders to list.",
+        )
+
+    def handle(self, *args, **options):
+        orders = Order.objects.all()
+        if options["created_after"]:
+            orders = orders.filter(created__gte=options["created_after"])
+        if options["created_before"]:
+            orders = orders.filter(created__lt=options["created_before"])
+
+        self.stdout.write(f"Revenue: {orders.revenue() or 0}")
+
+        mismatched = orders.with_mismatched_totals().values_list(
+            "id", "total_price", "items_total"
+        )
+        count = 0
+        for order_id, total_price, items_total in mismatched[: options["limit"]]:
+            count += 1
+            self.stdout.write(
+                f"{order_id}: total_price={total_price} items_total={items_total}"
+            )
+        self.stdout.write(f"Mismatched orders listed: {count}")
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from store.orders.utils.order_holds import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Cancel PENDING orders whose stock hold has expired and return their "
+        "stock. Runs once, or every --interval seconds until stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.ORDER_HOLD_RELEASE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Seconds between sweeps. With 0, sweep once and exit.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            released = 0
+            while True:
+                count = release_expired_holds(batch_size)
+                released += count
+                if count < batch_size:
+                    break
+            self.stdout.write(f"Released {released} expired holds.")
+
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="orderitem",
+            name="order",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="items",
+                to="orders.order",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0002_orderitem_order_related_name"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["created", "id"], name="orders_created_id_idx"
+            ),
+        ),
+    ]
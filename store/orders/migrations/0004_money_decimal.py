@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_unit_price(apps, schema_editor):
+    """
+    Order items never stored the price they were sold at, so the current
+    product price is the best available value for existing rows.
+    """
+    OrderItem = apps.get_model("orders", "OrderItem")
+    Product = apps.get_model("products", "Product")
+    OrderItem.objects.filter(unit_price__isnull=True).update(
+        unit_price=Subquery(
+            Product.objects.filter(id=OuterRef("product_id")).values("price")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0003_hot_query_indexes"),
+        ("products", "0004_money_decimal"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="total_price",
+            field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name="orderitem",
+            name="unit_price",
+            field=models.DecimalField(decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.RunPython(backfill_unit_price, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="orderitem",
+            name="unit_price",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0005_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderitem",
+            name="stock_pending",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="orderitem",
+            index=models.Index(
+                fields=["stock_pending", "product"],
+                name="order_items_stock_pending_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0006_orderitem_stock_pending"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="rolled_up",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["rolled_up", "created"], name="orders_rolled_up_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0007_order_rolled_up"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="status",
+            field=models.SmallIntegerField(
+                choices=[("PENDING", 1), ("COMPLETED", 2), ("CANCELLED", 3)],
+                default=1,
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "expires_at"], name="orders_holds_idx"
+            ),
+        ),
+    ]
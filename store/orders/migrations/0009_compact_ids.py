@@ -0,0 +1,45 @@
+import store.fields
+from django.db import migrations
+from store.fields import convert_uuid_columns
+
+# orders.id, order_items.id and the columns referring to them.
+COLUMNS = [
+    ("orders", "id"),
+    ("order_items", "order_id"),
+    ("order_items", "id"),
+]
+
+
+def convert_to_binary(apps, schema_editor):
+    convert_uuid_columns(schema_editor, COLUMNS)
+
+
+def convert_to_string(apps, schema_editor):
+    convert_uuid_columns(schema_editor, COLUMNS, to_binary=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0008_order_holds"),
+        ("products", "0008_product_compact_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_to_binary, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="order",
+            name="id",
+            field=store.fields.CompactUUIDField(
+                default=store.fields.uuid7, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="orderitem",
+            name="id",
+            field=store.fields.CompactUUIDField(
+                default=store.fields.uuid7, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, convert_to_string),
+    ]
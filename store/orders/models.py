@@ -1,35 +1,76 @@
 from django.db import models
+from django.db.models import DecimalField, ExpressionWrapper, F, Q, Sum
+from store.fields import CompactUUIDField, uuid7
 from store.orders.enums import OrderStatusEnums
-import uuid
 from store.products.models import Product
 
 
+class OrderQuerySet(models.QuerySet):
+    def with_items_total(self):
+        """Annotate each order with the sum of its line totals, computed in SQL."""
+        return self.annotate(
+            items_total=Sum(
+                ExpressionWrapper(
+                    F("items__unit_price") * F("items__quantity"),
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                )
+            )
+        )
+
+    def with_mismatched_totals(self):
+        """Orders whose stored total_price differs from their line totals."""
+        return self.with_items_total().filter(~Q(total_price=F("items_total")))
+
+    def revenue(self):
+        """Return the exact sum of total_price over the queryset."""
+        return self.aggregate(revenue=Sum("total_price"))["revenue"]
+
+
 class Order(models.Model):
-    id = models.CharField(max_length=36, primary_key=True, default=uuid.uuid4)
-    total_price = models.FloatField()
+    id = CompactUUIDField(primary_key=True, default=uuid7)
+    total_price = models.DecimalField(max_digits=14, decimal_places=2)
     status = models.SmallIntegerField(
         choices=OrderStatusEnums.choices(),
         default=OrderStatusEnums.PENDING.value,
     )
+    # Set once the order is counted in the analytics daily rollups.
+    rolled_up = models.BooleanField(default=False)
+    # When a PENDING order's stock hold is released, unless confirmed first.
+    expires_at = models.DateTimeField(null=True, blank=True)
 
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
-    objects = models.Manager()
+    objects = OrderQuerySet.as_manager()
 
     class Meta:
         db_table = "orders"
         managed = True
+        indexes = [
+            # Default ordering and keyset pagination.
+            models.Index(fields=["created", "id"], name="orders_created_id_idx"),
+            # Orders still to be rolled up, oldest first.
+            models.Index(fields=["rolled_up", "created"], name="orders_rolled_up_idx"),
+            # Expired holds, for release_expired_holds.
+            models.Index(fields=["status", "expires_at"], name="orders_holds_idx"),
+        ]
 
     def mark_completed(self):
         self.status = OrderStatusEnums.COMPLETED.value
-        self.save()
+        self.save(update_fields=["status", "modified"])
 
 
 class OrderItem(models.Model):
-    id = models.CharField(max_length=36, primary_key=True, default=uuid.uuid4)
-    order = models.ForeignKey(Order, on_delete=models.DO_NOTHING)
+    id = CompactUUIDField(primary_key=True, default=uuid7)
+    order = models.ForeignKey(
+        Order, on_delete=models.DO_NOTHING, related_name="items"
+    )
     product = models.ForeignKey(Product, on_delete=models.DO_NOTHING)
     quantity = models.IntegerField()
+    # Price of one unit when the order was placed.
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    # Set for hot products, whose quantity is taken from products.stock later
+    # by flush_hot_stock rather than when the order is placed.
+    stock_pending = models.BooleanField(default=False)
 
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
@@ -38,3 +79,34 @@ class OrderItem(models.Model):
     class Meta:
         db_table = "order_items"
         managed = True
+        indexes = [
+            # Pending quantities, per product, for the flush and the counters.
+            models.Index(
+                fields=["stock_pending", "product"],
+                name="order_items_stock_pending_idx",
+            ),
+        ]
+
+
+class IdempotencyKey(models.Model):
+    """
+    The response of a POST /orders/ sent with an Idempotency-Key header.
+
+    The row is inserted in the same transaction as the order it records, so
+    a concurrent request with the same key blocks on the primary key until
+    that transaction ends and then replays the stored response.
+    """
+
+    key = models.CharField(max_length=255, primary_key=True)
+    # sha256 of the request body, to reject a key reused for another request.
+    request_hash = models.CharField(max_length=64)
+    response_status = models.SmallIntegerField(null=True)
+    response_body = models.JSONField(null=True)
+
+    created = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    objects = models.Manager()
+
+    class Meta:
+        db_table = "idempotency_keys"
+        managed = True
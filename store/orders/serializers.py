@@ -1,10 +1,17 @@
+from collections import defaultdict
+
+from django.conf import settings
 from rest_framework import serializers
+from store.fields import parse_uuid
+from store.instrumentation import TimedSerializerMixin
 from store.orders.models import Order, OrderItem
 from store.products.models import Product
+from store.products.snapshots import product_snapshots
 from store.orders.enums import OrderStatusEnums
+from store.serializers import ValuesSerializerMixin
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     product_id = serializers.CharField()
     quantity = serializers.IntegerField(min_value=1)  # Ensure quantity is at least 1
 
@@ -13,36 +20,84 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ["product_id", "quantity"]
 
     def validate_product_id(self, value):
-        """Ensure the product exists in the database."""
-        if not Product.objects.filter(id=value).exists():
-            raise serializers.ValidationError(
-                "Invalid product_id: Product does not exist."
-            )
-        return value
+        # The canonical form, so duplicates are caught whatever the case.
+        # Anything else is reported as an unknown product.
+        return parse_uuid(value) or value
+
+
+def cart_product_ids(items):
+    """Return the ids in ``items`` that can be a product's."""
+    return {item["product_id"] for item in items if parse_uuid(item["product_id"])}
+
+
+def validate_cart(value):
+    """Ensure the products list is not empty and has no duplicates."""
+    if not value:
+        raise serializers.ValidationError(
+            "At least one product is required to place an order."
+        )
+    unique_product_ids = set()
+    for item in value:
+        product_id = item["product_id"]
+        if product_id in unique_product_ids:
+            raise serializers.ValidationError(f"Duplicate product_id found: {product_id}")
+        unique_product_ids.add(product_id)
+    return value
+
 
+def unknown_product_errors(items, products):
+    """Return per-line errors for cart lines whose product wasn't resolved."""
+    return [
+        {}
+        if item["product_id"] in products
+        else {"product_id": ["Invalid product_id: Product does not exist."]}
+        for item in items
+    ]
 
-class OrderSerializer(serializers.ModelSerializer):
+
+def order_product_representation(product_id, name, price, quantity):
+    return {
+        "id": str(product_id),
+        "name": name,
+        "price": price,
+        "quantity": quantity,
+    }
+
+
+class OrderSerializer(
+    TimedSerializerMixin, ValuesSerializerMixin, serializers.ModelSerializer
+):
     products = OrderItemSerializer(many=True, write_only=True)
     status = serializers.SerializerMethodField()
 
+    # Read by get_status.
+    extra_value_fields = ["status"]
+
     class Meta:
         model = Order
         fields = ["id", "products", "total_price", "status", "created"]
         read_only_fields = ["id", "total_price", "status", "created"]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # product_id -> Product for every product in the cart, populated by
+        # validate_products so process_order doesn't fetch them again.
+        self.resolved_products = {}
+
     def validate_products(self, value):
-        """Ensure the products list is not empty."""
-        if not value:
-            raise serializers.ValidationError(
-                "At least one product is required to place an order."
-            )
-        unique_product_ids = set()
-        for item in value:
-            product_id = item["product_id"]
-            if product_id in unique_product_ids:
-                raise serializers.ValidationError(f"Duplicate product_id found: {product_id}")
-            unique_product_ids.add(product_id)
+        """
+        Ensure the products list is not empty, has no duplicates and only
+        references existing products. Products are resolved from this
+        worker's snapshots, and the rest with one query.
+        """
+        validate_cart(value)
 
+        products = product_snapshots.get_many(cart_product_ids(value))
+        errors = unknown_product_errors(value, products)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        self.resolved_products = products
         return value
 
     def get_status(self, obj):
@@ -52,17 +107,80 @@ class OrderSerializer(serializers.ModelSerializer):
         """Customize the output representation of an order."""
         representation = super().to_representation(instance)
 
-        # Fetch order items and include product details in response
-        order_items = OrderItem.objects.filter(order=instance).select_related("product")
+        # Order items and their products are prefetched by the view, so this
+        # reads from the prefetch cache instead of querying per order.
+        order_items = instance.items.all()
 
         representation["products"] = [
-            {
-                "id": str(item.product.id),
-                "name": item.product.name,
-                "price": item.product.price,
-                "quantity": item.quantity,
-            }
+            order_product_representation(
+                item.product.id, item.product.name, item.product.price, item.quantity
+            )
             for item in order_items
         ]
 
         return representation
+
+    def to_representation_values(self, rows):
+        """
+        Represent ``.values()`` rows of orders, loading the items and
+        products of every order with one query.
+        """
+        data = super().to_representation_values(rows)
+        if not rows:
+            return data
+
+        products_by_order = defaultdict(list)
+        items = (
+            OrderItem.objects.filter(order_id__in=[row["id"] for row in rows])
+            .order_by("id")
+            .values_list(
+                "order_id", "product_id", "product__name", "product__price", "quantity"
+            )
+        )
+        for order_id, *item in items:
+            products_by_order[order_id].append(order_product_representation(*item))
+
+        for row, representation in zip(rows, data):
+            representation["products"] = products_by_order[row["id"]]
+        return data
+
+
+class CartSerializer(serializers.Serializer):
+    products = OrderItemSerializer(many=True)
+
+    def validate_products(self, value):
+        return validate_cart(value)
+
+
+class OrderBatchSerializer(serializers.Serializer):
+    orders = CartSerializer(many=True, allow_empty=False)
+    # All-or-nothing by default; False places every order that has stock.
+    atomic = serializers.BooleanField(default=True)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # product_id -> Product for every product in every cart.
+        self.resolved_products = {}
+
+    def validate_orders(self, value):
+        """Resolve the products of every cart in the batch with one query."""
+        max_size = settings.ORDER_BATCH_MAX_SIZE
+        if len(value) > max_size:
+            raise serializers.ValidationError(
+                f"A batch can contain at most {max_size} orders."
+            )
+
+        product_ids = set()
+        for cart in value:
+            product_ids |= cart_product_ids(cart["products"])
+        products = Product.objects.in_bulk(list(product_ids))
+
+        errors = []
+        for cart in value:
+            cart_errors = unknown_product_errors(cart["products"], products)
+            errors.append({"products": cart_errors} if any(cart_errors) else {})
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        self.resolved_products = products
+        return value
@@ -0,0 +1,23 @@
+import factory
+from factory.django import DjangoModelFactory
+from store.orders.enums import OrderStatusEnums
+from store.orders.models import Order, OrderItem
+from store.products.tests.factories import ProductsFactory
+
+
+class OrderFactory(DjangoModelFactory):
+    total_price = 100
+    status = OrderStatusEnums.COMPLETED.value
+
+    class Meta:
+        model = Order
+
+
+class OrderItemFactory(DjangoModelFactory):
+    order = factory.SubFactory(OrderFactory)
+    product = factory.SubFactory(ProductsFactory)
+    quantity = 1
+    unit_price = factory.SelfAttribute("product.price")
+
+    class Meta:
+        model = OrderItem
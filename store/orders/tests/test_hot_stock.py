@@ -0,0 +1,187 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from store.orders.exceptions import InsufficientStockException
+from store.orders.models import OrderItem
+from store.orders.utils.batch_processing import place_order_batch
+from store.orders.utils.hot_stock import build_store, flush_pending_stock, get_store
+from store.orders.utils.order_processing import fetch_products, process_order
+from store.orders.utils.stock_reservation import reserve_stock
+from store.products.models import Product
+
+# Product ids.
+HOT = "00000000-0000-7000-8000-000000000001"
+COLD = "00000000-0000-7000-8000-000000000002"
+
+
+@pytest.fixture
+def hot_stock(settings):
+    settings.HOT_STOCK_BACKEND = "local"
+    settings.HOT_STOCK_SHARDS = 4
+    return settings
+
+
+@pytest.fixture
+def products(db):
+    return {
+        HOT: Product.objects.create(
+            id=HOT, name="Hot", price=10, stock=3, is_hot=True
+        ),
+        COLD: Product.objects.create(id=COLD, name="Cold", price=5, stock=10),
+    }
+
+
+def pending(product_id):
+    return list(
+        OrderItem.objects.filter(product_id=product_id).values_list(
+            "stock_pending", flat=True
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_hot_order_is_written_behind(hot_stock, products):
+    """Should reserve hot stock in the store and apply it on flush."""
+    process_order(
+        [{"product_id": HOT, "quantity": 2}, {"product_id": COLD, "quantity": 1}]
+    )
+
+    assert Product.objects.get(id=HOT).stock == 3
+    assert Product.objects.get(id=COLD).stock == 9
+    assert pending(HOT) == [True]
+    assert pending(COLD) == [False]
+    assert get_store().available([HOT]) == {HOT: 1}
+
+    assert flush_pending_stock(batch_size=100) == 1
+
+    assert Product.objects.get(id=HOT).stock == 1
+    assert pending(HOT) == [False]
+    assert get_store().available([HOT]) == {HOT: 1}
+
+
+@pytest.mark.django_db
+def test_hot_stock_is_never_oversold(hot_stock, products):
+    """Should reject the order that would take hot stock below zero."""
+    for _ in range(3):
+        process_order([{"product_id": HOT, "quantity": 1}])
+
+    with pytest.raises(InsufficientStockException) as exc_info:
+        process_order([{"product_id": HOT, "quantity": 1}])
+
+    assert exc_info.value.get_errors() == {"product_id": [HOT]}
+    flush_pending_stock(batch_size=2)
+    flush_pending_stock(batch_size=2)
+    assert Product.objects.get(id=HOT).stock == 0
+
+
+@pytest.mark.django_db
+def test_failed_order_releases_hot_stock(hot_stock, products):
+    """Should return the hot reservation when the rest of the order fails."""
+    stale_products = fetch_products([HOT, COLD])
+    reserve_stock({COLD: 10})
+
+    with pytest.raises(InsufficientStockException):
+        process_order(
+            [
+                {"product_id": HOT, "quantity": 3},
+                {"product_id": COLD, "quantity": 1},
+            ],
+            products=stale_products,
+        )
+
+    assert get_store().available([HOT]) == {HOT: 3}
+    assert not OrderItem.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_committed_order_clears_its_reservation(hot_stock, products):
+    """Should drop the journaled reservation once the order commits."""
+    process_order([{"product_id": HOT, "quantity": 1}])
+
+    store = get_store()
+    assert all(not shard.get_reservations() for shard in store.shards)
+    assert store.reconcile(stale_after=0) == {"counters": 1, "stale_reservations": 0}
+    assert store.available([HOT]) == {HOT: 2}
+
+
+@pytest.mark.django_db
+def test_reconcile(hot_stock, products):
+    """Should rebuild counters, picking up restocks and dead reservations."""
+    store = get_store()
+    store.reserve("crashed-checkout", {HOT: 2})
+    shards = store.reserve("live-checkout", {HOT: 1})
+    Product.objects.filter(id=HOT).update(stock=5)
+
+    assert store.reconcile(stale_after=3600) == {
+        "counters": 1,
+        "stale_reservations": 0,
+    }
+    # Both reservations are still in flight.
+    assert store.available([HOT]) == {HOT: 2}
+
+    store.commit("live-checkout", shards)
+    assert store.reconcile(stale_after=0) == {"counters": 1, "stale_reservations": 1}
+    assert store.available([HOT]) == {HOT: 5}
+
+    Product.objects.filter(id=HOT).update(is_hot=False)
+    assert store.reconcile() == {"counters": 0, "stale_reservations": 0}
+
+
+@pytest.mark.django_db
+def test_sqlite_store_is_shared(products, tmp_path):
+    """Should share counters and reservations between store instances."""
+    first = build_store("sqlite", str(tmp_path), 2)
+    second = build_store("sqlite", str(tmp_path), 2)
+
+    shards = first.reserve("checkout", {HOT: 2})
+    with pytest.raises(InsufficientStockException):
+        second.reserve("other-checkout", {HOT: 2})
+
+    second.release("checkout", shards)
+    assert first.available([HOT]) == {HOT: 3}
+
+
+@pytest.mark.django_db
+def test_batch_allocates_hot_stock_from_the_store(hot_stock, products):
+    """Should place the carts that fit in the hot stock and reject the rest."""
+    carts = [
+        [{"product_id": HOT, "quantity": 2}, {"product_id": COLD, "quantity": 1}],
+        [{"product_id": HOT, "quantity": 2}],
+    ]
+
+    placed, rejected = place_order_batch(
+        carts, fetch_products([HOT, COLD]), atomic=False
+    )
+
+    assert [index for index, _ in placed] == [0]
+    assert rejected == [{"index": 1, "product_id": [HOT]}]
+    assert get_store().available([HOT]) == {HOT: 1}
+    assert pending(HOT) == [True]
+    assert Product.objects.get(id=COLD).stock == 9
+
+
+@pytest.mark.django_db
+def test_mark_hot_products_off_flushes(hot_stock, products):
+    """Should flush pending stock when a product is unflagged."""
+    process_order([{"product_id": HOT, "quantity": 2}])
+    out = StringIO()
+
+    call_command("mark_hot_products", HOT, "--off", stdout=out)
+
+    product = Product.objects.get(id=HOT)
+    assert not product.is_hot
+    assert product.stock == 1
+    assert "Unflagged 1 products." in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_flush_hot_stock_command(hot_stock, products):
+    for _ in range(3):
+        process_order([{"product_id": HOT, "quantity": 1}])
+    out = StringIO()
+
+    call_command("flush_hot_stock", "--batch-size", "2", "--reconcile", stdout=out)
+
+    assert Product.objects.get(id=HOT).stock == 0
+    assert "Flushed 3 pending order items." in out.getvalue()
+    assert "Reconciled 1 counters" in out.getvalue()
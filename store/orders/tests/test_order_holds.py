@@ -0,0 +1,146 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from store.analytics.models import DailySales
+from store.orders.enums import OrderStatusEnums
+from store.orders.exceptions import (
+    InsufficientStockException,
+    OrderHoldInactiveException,
+    OrderNotFoundException,
+)
+from store.orders.models import Order, OrderItem
+from store.orders.utils.hot_stock import flush_pending_stock
+from store.orders.utils.order_holds import (
+    confirm_hold,
+    release_expired_holds,
+    release_hold,
+)
+from store.orders.utils.order_processing import process_order
+from store.products.models import Product
+
+# Product ids.
+A = "00000000-0000-7000-8000-000000000001"
+B = "00000000-0000-7000-8000-000000000002"
+
+
+@pytest.fixture
+def products(db):
+    return {
+        A: Product.objects.create(id=A, name="A", price=10, stock=5),
+        B: Product.objects.create(id=B, name="B", price=20, stock=5),
+    }
+
+
+def hold(quantities, seconds=60):
+    return process_order(
+        [
+            {"product_id": product_id, "quantity": quantity}
+            for product_id, quantity in quantities.items()
+        ],
+        hold_for=seconds,
+    )
+
+
+def stock():
+    return dict(Product.objects.order_by("id").values_list("id", "stock"))
+
+
+def expire(*orders):
+    Order.objects.filter(id__in=[order.id for order in orders]).update(
+        expires_at=timezone.now() - timedelta(seconds=1)
+    )
+
+
+@pytest.mark.django_db
+def test_hold_takes_stock(products):
+    order = hold({A: 2, B: 1})
+
+    assert order.status == OrderStatusEnums.PENDING.value
+    assert order.expires_at > timezone.now()
+    assert stock() == {A: 3, B: 4}
+    with pytest.raises(InsufficientStockException):
+        hold({A: 4})
+
+
+@pytest.mark.django_db
+def test_confirm_hold(products, settings):
+    settings.ANALYTICS_ROLLUP_ON_ORDER = True
+    order = hold({A: 2})
+
+    confirm_hold(order.id)
+
+    order.refresh_from_db()
+    assert order.status == OrderStatusEnums.COMPLETED.value
+    assert order.expires_at is None
+    assert stock() == {A: 3, B: 5}
+    with pytest.raises(OrderHoldInactiveException):
+        confirm_hold(order.id)
+
+
+@pytest.mark.django_db
+def test_expired_hold_cannot_be_confirmed(products):
+    order = hold({A: 2})
+    expire(order)
+
+    with pytest.raises(OrderHoldInactiveException):
+        confirm_hold(order.id)
+    with pytest.raises(OrderNotFoundException):
+        confirm_hold("missing")
+
+
+@pytest.mark.django_db
+def test_release_hold(products):
+    order = hold({A: 2, B: 1})
+
+    release_hold(order.id)
+
+    assert Order.objects.get(id=order.id).status == OrderStatusEnums.CANCELLED.value
+    assert stock() == {A: 5, B: 5}
+    with pytest.raises(OrderHoldInactiveException):
+        release_hold(order.id)
+
+
+@pytest.mark.django_db
+def test_release_expired_holds(products, django_assert_num_queries):
+    orders = [hold({A: 1, B: 1}) for _ in range(4)]
+    active = hold({A: 1})
+    expire(*orders)
+
+    # Savepoint, select the holds and their items, restock, clear pending
+    # items, cancel, release: the same for any number of holds.
+    with django_assert_num_queries(7):
+        assert release_expired_holds(batch_size=3) == 3
+    assert release_expired_holds(batch_size=3) == 1
+    assert release_expired_holds(batch_size=3) == 0
+
+    assert stock() == {A: 4, B: 5}
+    assert Order.objects.get(id=active.id).status == OrderStatusEnums.PENDING.value
+    assert not DailySales.objects.exists()
+
+
+@pytest.mark.django_db
+def test_release_hot_hold_before_flush(products, settings):
+    """Should clear pending items of hot products instead of restocking."""
+    settings.HOT_STOCK_BACKEND = "local"
+    Product.objects.filter(id=A).update(is_hot=True)
+    order = hold({A: 2, B: 1})
+    assert stock() == {A: 5, B: 4}
+
+    release_hold(order.id)
+    flush_pending_stock(batch_size=100)
+
+    assert stock() == {A: 5, B: 5}
+    assert not OrderItem.objects.filter(stock_pending=True).exists()
+
+
+@pytest.mark.django_db
+def test_release_expired_holds_command(products):
+    expire(hold({A: 1}), hold({B: 2}))
+    out = StringIO()
+
+    call_command("release_expired_holds", "--batch-size", "1", stdout=out)
+
+    assert "Released 2 expired holds." in out.getvalue()
+    assert stock() == {A: 5, B: 5}
@@ -1,6 +1,11 @@
 import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.exceptions import ValidationError
 from store.products.models import Product
+from store.orders.models import Order, OrderItem
 from store.orders.enums import OrderStatusEnums
 from store.orders.exceptions import InsufficientStockException
 from store.orders.utils.order_processing import (
@@ -9,16 +14,24 @@ from store.orders.utils.order_processing import (
     create_order,
     process_order,
 )
+from store.orders.utils.stock_reservation import reservation_stats, reserve_stock
+
+# Product ids.
+P1 = "00000000-0000-7000-8000-000000000001"
+P2 = "00000000-0000-7000-8000-000000000002"
+P3 = "00000000-0000-7000-8000-000000000003"
+P4 = "00000000-0000-7000-8000-000000000004"
+MISSING = "00000000-0000-7000-8000-000000000999"
 
 
 @pytest.fixture
 def sample_products(db):
     """Create sample products for testing."""
     return [
-        Product.objects.create(id=1, name="Product A", price=100, stock=10),
-        Product.objects.create(id=2, name="Product B", price=200, stock=5),
+        Product.objects.create(id=P1, name="Product A", price=100, stock=10),
+        Product.objects.create(id=P2, name="Product B", price=200, stock=5),
         Product.objects.create(
-            id=3, name="Product C", price=50, stock=0
+            id=P3, name="Product C", price=50, stock=0
         ),  # Out of stock
     ]
 
@@ -27,8 +40,8 @@ def sample_products(db):
 def valid_cart():
     """Return a valid cart with existing products and sufficient stock."""
     return [
-        {"product_id": 1, "quantity": 2},
-        {"product_id": 2, "quantity": 1},
+        {"product_id": P1, "quantity": 2},
+        {"product_id": P2, "quantity": 1},
     ]
 
 
@@ -36,7 +49,7 @@ def valid_cart():
 def out_of_stock_cart():
     """Return a cart containing an out-of-stock product."""
     return [
-        {"product_id": 3, "quantity": 1},  # Product C is out of stock
+        {"product_id": P3, "quantity": 1},  # Product C is out of stock
     ]
 
 
@@ -44,18 +57,18 @@ def out_of_stock_cart():
 def invalid_cart():
     """Return a cart with a non-existent product."""
     return [
-        {"product_id": 999, "quantity": 1},  # Product does not exist
+        {"product_id": MISSING, "quantity": 1},  # Product does not exist
     ]
 
 
 @pytest.mark.django_db
 def test_fetch_products(sample_products):
     """Should return a dictionary of products by ID."""
-    product_ids = [1, 2]
+    product_ids = [P1, P2]
     products = fetch_products(product_ids)
     assert isinstance(products, dict)
     assert len(products) == 2
-    assert str(1) in products and str(2) in products
+    assert P1 in products and P2 in products
 
 
 @pytest.mark.django_db
@@ -67,13 +80,13 @@ def test_fetch_products_with_empty_list():
 @pytest.mark.django_db
 def test_fetch_products_with_non_existent_ids():
     """Should return an empty dictionary when product IDs don't exist."""
-    assert fetch_products([999]) == {}
+    assert fetch_products([MISSING]) == {}
 
 
 @pytest.mark.django_db
 def test_validate_and_prepare_order_items_valid(sample_products, valid_cart):
     """Should return order items and calculate the correct total price."""
-    products = fetch_products([1, 2])
+    products = fetch_products([P1, P2])
     order_items, total_price = validate_and_prepare_order_items(products, valid_cart)
 
     assert len(order_items) == 2
@@ -85,7 +98,7 @@ def test_validate_and_prepare_order_items_product_not_found(
     sample_products, invalid_cart
 ):
     """Should raise ValidationError when a product is not found."""
-    products = fetch_products([1, 2])
+    products = fetch_products([P1, P2])
     with pytest.raises(ValidationError):
         validate_and_prepare_order_items(products, invalid_cart)
 
@@ -95,7 +108,8 @@ def test_validate_and_prepare_order_items_insufficient_stock(
     sample_products, out_of_stock_cart
 ):
     """Should raise InsufficientStockException when stock is insufficient."""
-    products = fetch_products([1, 2, 3])
+    # Snapshots don't carry stock; products read with it fail fast.
+    products = Product.objects.in_bulk([P1, P2, P3])
     with pytest.raises(InsufficientStockException):
         validate_and_prepare_order_items(products, out_of_stock_cart)
 
@@ -104,7 +118,7 @@ def test_validate_and_prepare_order_items_insufficient_stock(
 @pytest.mark.django_db
 def test_create_order(sample_products, valid_cart):
     """Should create an order and associate order items correctly."""
-    products = fetch_products([1, 2])
+    products = fetch_products([P1, P2])
     order_items, total_price = validate_and_prepare_order_items(products, valid_cart)
 
     order = create_order(order_items, total_price)
@@ -121,3 +135,117 @@ def test_process_order_success(sample_products, valid_cart):
     order = process_order(valid_cart)
 
     assert order.status == OrderStatusEnums.COMPLETED.value
+
+    assert Product.objects.get(id=P1).stock == initial_stock[P1] - 2
+    assert Product.objects.get(id=P2).stock == initial_stock[P2] - 1
+
+
+@pytest.mark.django_db
+def test_process_order_writes_each_row_once(sample_products, valid_cart):
+    """Should insert the order in its final status without a follow-up UPDATE."""
+    products = fetch_products([P1, P2])
+
+    with CaptureQueriesContext(connection) as ctx:
+        process_order(valid_cart, products=products)
+
+    statements = [
+        query["sql"].split()[0]
+        for query in ctx.captured_queries
+        if "SAVEPOINT" not in query["sql"]
+    ]
+    # Stock decrement, order insert, order items insert.
+    assert statements == ["UPDATE", "INSERT", "INSERT"]
+
+
+# ✅ TEST reserve_stock
+@pytest.mark.django_db
+def test_reserve_stock_decrements_all_products(sample_products):
+    """Should decrement every product in a single reservation."""
+    reserve_stock({P2: 5, P1: 3})
+
+    assert Product.objects.get(id=P1).stock == 7
+    assert Product.objects.get(id=P2).stock == 0
+
+
+@pytest.mark.django_db
+def test_reserve_stock_is_all_or_nothing(sample_products):
+    """Should leave every product untouched when one of them is short."""
+    reservation_stats.reset()
+
+    with pytest.raises(InsufficientStockException) as exc_info:
+        reserve_stock({P1: 3, P2: 6})
+
+    assert exc_info.value.get_errors() == {"product_id": [P2]}
+    assert Product.objects.get(id=P1).stock == 10
+    assert Product.objects.get(id=P2).stock == 5
+    assert reservation_stats.snapshot() == {P2: {"conflicts": 1, "retries": 0}}
+
+
+@pytest.mark.django_db
+def test_process_order_loses_race_for_last_unit(sample_products):
+    """Should reject an order whose stock was taken after it was validated."""
+    reservation_stats.reset()
+    cart = [{"product_id": P2, "quantity": 5}]
+    stale_products = fetch_products([P2])
+
+    # A concurrent checkout buys the remaining stock between our read and
+    # our write.
+    reserve_stock({P2: 5})
+
+    with patch(
+        "store.orders.utils.order_processing.fetch_products",
+        return_value=stale_products,
+    ):
+        with pytest.raises(InsufficientStockException):
+            process_order(cart)
+
+    assert Product.objects.get(id=P2).stock == 0
+    assert reservation_stats.snapshot()[P2]["conflicts"] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_process_order_retries_after_deadlock(sample_products, valid_cart):
+    """Should retry the transaction when it is picked as a deadlock victim."""
+    reservation_stats.reset()
+    deadlock = OperationalError(1213, "Deadlock found when trying to get lock")
+
+    with patch(
+        "store.orders.utils.order_processing.reserve_stock",
+        side_effect=[deadlock, None],
+    ) as mock_reserve:
+        order = process_order(valid_cart)
+
+    assert mock_reserve.call_count == 2
+    assert order.status == OrderStatusEnums.COMPLETED.value
+    assert reservation_stats.snapshot()[P1]["retries"] == 1
+
+
+# ✅ TEST money
+@pytest.mark.django_db
+def test_total_price_is_exact(sample_products):
+    """Should add up prices without floating point drift."""
+    Product.objects.create(id=P4, name="Product D", price="0.10", stock=10)
+    products = fetch_products([P4])
+
+    order_items, total_price = validate_and_prepare_order_items(
+        products, [{"product_id": P4, "quantity": 3}]
+    )
+
+    assert total_price == Decimal("0.30")
+    assert order_items[0].unit_price == Decimal("0.10")
+
+
+@pytest.mark.django_db
+def test_order_totals_reconcile_in_database(sample_products, valid_cart):
+    """Should compute line totals and revenue with SQL aggregates."""
+    order = process_order(valid_cart)
+    tampered = process_order([{"product_id": P1, "quantity": 1}])
+    Order.objects.filter(id=tampered.id).update(total_price=Decimal("99.99"))
+
+    totals = {o.id: o.items_total for o in Order.objects.with_items_total()}
+
+    assert totals[str(order.id)] == Decimal("400.00")
+    mismatched = Order.objects.with_mismatched_totals()
+    assert [o.id for o in mismatched] == [str(tampered.id)]
+    assert Order.objects.revenue() == Decimal("499.99")
+    assert OrderItem.objects.filter(order=order).count() == 2
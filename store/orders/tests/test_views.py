@@ -1,7 +1,21 @@
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
-from store.orders.models import Order, OrderItem
+from store import error_codes
+from store.orders.models import IdempotencyKey, Order, OrderItem
+from store.orders.utils.idempotency import recent_responses
+from store.orders.utils.order_processing import process_order
 from store.products.tests.factories import ProductsFactory
 from unittest.mock import patch
 from rest_framework.serializers import ValidationError
@@ -21,6 +35,62 @@ class TestOrderCreateAPIView(APITestCase):
         assert response.json()["pagination"]["count"] == 0
         assert response.json()["data"] == []
 
+    def test_get_orders_with_products(self):
+        """Test listed orders include their products."""
+        payload = {"products": [{"product_id": str(self.product.id), "quantity": 2}]}
+        self.client.post(self.url, payload, format="json")
+
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"][0]["products"] == [
+            {
+                "id": str(self.product.id),
+                "name": "Test Product",
+                "price": 20.0,
+                "quantity": 2,
+            }
+        ]
+
+    def test_get_orders_query_count_independent_of_page_size(self):
+        """Test listing orders costs the same number of queries for any page size."""
+        products = ProductsFactory.create_batch(3, stock=100)
+        for _ in range(20):
+            payload = {
+                "products": [
+                    {"product_id": str(product.id), "quantity": 1}
+                    for product in products
+                ]
+            }
+            self.client.post(self.url, payload, format="json")
+
+        for page_size in (1, 5, 20):
+            # COUNT(*), the page of orders, and their items with products.
+            with self.assertNumQueries(3):
+                response = self.client.get(self.url, {"page_size": page_size})
+            assert len(response.json()["data"]) == page_size
+
+    def test_get_orders_matches_model_serialization(self):
+        """Test pages built from .values() rows are byte-identical."""
+        products = ProductsFactory.create_batch(3, stock=100)
+        for index in range(4):
+            payload = {
+                "products": [
+                    {"product_id": str(product.id), "quantity": index + 1}
+                    for product in products[: index + 1]
+                ]
+            }
+            self.client.post(self.url, payload, format="json")
+
+        for params in ({}, {"ordering": "created", "page_size": 2}, {"cursor": ""}):
+            response = self.client.get(self.url, params)
+            with override_settings(FAST_LIST_SERIALIZATION=False):
+                expected = self.client.get(self.url, params)
+
+            assert response.status_code == status.HTTP_200_OK
+            assert response.content == expected.content
+            assert response.content == JSONRenderer().render(response.data)
+
     def test_create_order_success(self):
         """Test successfully creating an order."""
         payload = {"products": [{"product_id": str(self.product.id), "quantity": 2}]}
@@ -124,6 +194,26 @@ class TestOrderCreateAPIView(APITestCase):
         assert created_order.quantity == 3
         assert created_order.order.total_price == 45.0
 
+    def test_create_order_query_count_independent_of_cart_size(self):
+        """Test a checkout costs the same number of queries for any cart size."""
+
+        def count_queries(products):
+            payload = {
+                "products": [
+                    {"product_id": str(product.id), "quantity": 1}
+                    for product in products
+                ]
+            }
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(self.url, payload, format="json")
+            assert response.status_code == status.HTTP_201_CREATED
+            return len(ctx.captured_queries)
+
+        small_cart = count_queries(ProductsFactory.create_batch(1))
+        large_cart = count_queries(ProductsFactory.create_batch(25))
+
+        assert small_cart == large_cart
+
     @patch("store.orders.utils.order_processing.process_order")
     def test_create_order_concurrent_stock_update(self, mock_process_order):
         """Test concurrent order processing where stock runs out."""
@@ -153,3 +243,534 @@ class TestOrderCreateAPIView(APITestCase):
         response = self.client.post(self.url, payload, format="json")
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "Duplicate product_id found" in response.json()['errors']['products'][0]
+
+
+class TestOrderBatchCreateAPIView(APITestCase):
+    def setUp(self):
+        self.url = reverse("order:batch-create")
+        self.keyboard = ProductsFactory(name="Keyboard", stock=5, price=50)
+        self.mouse = ProductsFactory(name="Mouse", stock=2, price=20)
+
+    def cart(self, *lines):
+        return {
+            "products": [
+                {"product_id": str(product.id), "quantity": quantity}
+                for product, quantity in lines
+            ]
+        }
+
+    def test_create_batch_success(self):
+        """Test placing several orders in one request."""
+        payload = {
+            "orders": [
+                self.cart((self.keyboard, 2), (self.mouse, 1)),
+                self.cart((self.keyboard, 3)),
+            ]
+        }
+        response = self.client.post(self.url, payload, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()["data"]
+        assert [order["index"] for order in data["orders"]] == [0, 1]
+        assert data["rejected"] == []
+
+        first = Order.objects.get(id=data["orders"][0]["order_id"])
+        assert first.total_price == 120
+        assert first.items.count() == 2
+        self.keyboard.refresh_from_db()
+        self.mouse.refresh_from_db()
+        assert self.keyboard.stock == 0
+        assert self.mouse.stock == 1
+
+    def test_create_batch_atomic_rejects_everything(self):
+        """Test an all-or-nothing batch places nothing if one order lacks stock."""
+        payload = {
+            "orders": [self.cart((self.keyboard, 1)), self.cart((self.mouse, 3))]
+        }
+        response = self.client.post(self.url, payload, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["message"] == "Insufficient stock"
+        assert response.json()["errors"]["orders"] == [
+            {"index": 1, "product_id": [str(self.mouse.id)]}
+        ]
+        assert Order.objects.count() == 0
+        self.keyboard.refresh_from_db()
+        assert self.keyboard.stock == 5
+
+    def test_create_batch_partial_success(self):
+        """Test a partial batch places the orders that fit, in order."""
+        payload = {
+            "atomic": False,
+            "orders": [
+                self.cart((self.mouse, 2)),
+                self.cart((self.mouse, 1), (self.keyboard, 1)),
+                self.cart((self.keyboard, 4)),
+            ],
+        }
+        response = self.client.post(self.url, payload, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()["data"]
+        assert [order["index"] for order in data["orders"]] == [0, 2]
+        assert data["rejected"] == [{"index": 1, "product_id": [str(self.mouse.id)]}]
+        assert Order.objects.count() == 2
+        self.keyboard.refresh_from_db()
+        assert self.keyboard.stock == 1
+
+    def test_create_batch_invalid_product(self):
+        """Test unknown products are reported against their order and line."""
+        payload = {
+            "orders": [
+                self.cart((self.keyboard, 1)),
+                {"products": [{"product_id": "99999999", "quantity": 1}]},
+            ]
+        }
+        response = self.client.post(self.url, payload, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = response.json()["errors"]["orders"]
+        assert errors[0] == {}
+        assert "product_id" in errors[1]["products"][0]
+
+    def test_create_batch_empty(self):
+        """Test an empty batch is rejected."""
+        response = self.client.post(self.url, {"orders": []}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_create_batch_query_count_independent_of_batch_size(self):
+        """Test a batch costs the same number of queries for any number of orders."""
+        products = ProductsFactory.create_batch(3, stock=1000)
+
+        def count_queries(orders):
+            payload = {
+                "orders": [
+                    self.cart(*[(product, 1) for product in products])
+                    for _ in range(orders)
+                ]
+            }
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(self.url, payload, format="json")
+            assert response.status_code == status.HTTP_201_CREATED
+            return len(ctx.captured_queries)
+
+        # Kept under SQLite's bound-parameter limit, past which bulk inserts
+        # are split into several statements.
+        assert count_queries(2) == count_queries(40)
+
+
+# Run sync-only work in the test thread so it shares the test transaction.
+class TestOrderIdempotencyKey(APITestCase):
+    def setUp(self):
+        self.url = reverse("order:list-create")
+        self.product = ProductsFactory(name="Test Product", stock=10, price=20.0)
+        self.payload = {
+            "products": [{"product_id": str(self.product.id), "quantity": 2}]
+        }
+
+    def post(self, payload=None, key="key-1"):
+        return self.client.post(
+            self.url,
+            payload or self.payload,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_repeated_key_replays_response(self):
+        """Test a retried request returns the first order without placing another."""
+        first = self.post()
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.post()
+
+        assert first.status_code == second.status_code == status.HTTP_201_CREATED
+        assert second.json() == first.json()
+        assert second["Idempotent-Replayed"] == "true"
+        # Served from the in-process LRU without touching the database.
+        assert len(queries) == 0
+        assert Order.objects.count() == 1
+        self.product.refresh_from_db()
+        assert self.product.stock == 8
+
+    def test_repeated_key_replays_stored_response(self):
+        """Test another worker (empty LRU) replays the response from the table."""
+        first = self.post()
+        recent_responses.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.post()
+
+        assert second.json() == first.json()
+        assert len(queries) == 1
+        assert Order.objects.count() == 1
+
+    def test_concurrent_request_replays_committed_response(self):
+        """
+        Test a request that missed the stored key, because it was still being
+        written, replays it once the insert of the key fails.
+        """
+        first = self.post()
+        recent_responses.clear()
+
+        with patch(
+            "store.orders.views.get_stored_response", return_value=None
+        ), patch("store.orders.views.process_order") as mock_process_order:
+            second = self.post()
+
+        mock_process_order.assert_not_called()
+        assert second.status_code == status.HTTP_201_CREATED
+        assert second.json() == first.json()
+        assert Order.objects.count() == 1
+
+    def test_key_reused_with_different_body(self):
+        self.post()
+
+        response = self.post(
+            {"products": [{"product_id": str(self.product.id), "quantity": 1}]}
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["code"] == error_codes.IDEMPOTENCY_KEY_REUSED
+        assert Order.objects.count() == 1
+
+    def test_failed_request_does_not_store_key(self):
+        """Test a key can be retried after the order was rejected."""
+        response = self.post(
+            {"products": [{"product_id": str(self.product.id), "quantity": 11}]}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not IdempotencyKey.objects.exists()
+
+        response = self.post(
+            {"products": [{"product_id": str(self.product.id), "quantity": 11}]}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Idempotent-Replayed" not in response
+
+    def test_expired_key_places_new_order(self):
+        first = self.post()
+        recent_responses.clear()
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+
+        second = self.post()
+
+        assert second.status_code == status.HTTP_201_CREATED
+        assert second.json()["data"] != first.json()["data"]
+        assert Order.objects.count() == 2
+        assert IdempotencyKey.objects.get().expires_at > timezone.now()
+
+    def test_different_keys_place_separate_orders(self):
+        self.post(key="key-1")
+        self.post(key="key-2")
+
+        assert Order.objects.count() == 2
+
+    def test_invalid_key(self):
+        response = self.post(key="k" * 256)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Idempotency-Key" in response.json()["errors"]
+        assert not Order.objects.exists()
+
+    def test_purge_expired_keys(self):
+        self.post(key="key-1")
+        self.post(key="key-2")
+        IdempotencyKey.objects.filter(key="key-1").update(expires_at=timezone.now())
+
+        call_command("purge_idempotency_keys", batch_size=1, stdout=StringIO())
+
+        assert list(IdempotencyKey.objects.values_list("key", flat=True)) == ["key-2"]
+
+
+@override_settings(ASYNC_SYNC_WORKERS=0)
+class TestOrderListCreateAsyncView(APITestCase):
+    def setUp(self):
+        self.url = reverse("order:list-create-async")
+        self.product = ProductsFactory(name="Test Product", stock=10, price=20.0)
+
+    def test_create_and_list_orders(self):
+        """Test placing an order and listing it through the async view."""
+        payload = {"products": [{"product_id": str(self.product.id), "quantity": 2}]}
+        response = self.client.post(self.url, payload, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        order_id = response.json()["data"]["order_id"]
+        self.product.refresh_from_db()
+        assert self.product.stock == 8
+
+        response = self.client.get(self.url)
+        expected = self.client.get(reverse("order:list-create"))
+        assert response.json() == expected.json()
+        assert response.json()["data"][0]["id"] == order_id
+
+    def test_list_created_range(self):
+        """Test the async listing applies the same date filters."""
+        process_order([{"product_id": str(self.product.id), "quantity": 1}])
+
+        response = self.client.get(
+            self.url, {"created_after": "2999-01-01T00:00:00Z"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"] == []
+
+        response = self.client.get(self.url, {"created_before": "2999-01-01"})
+        assert len(response.json()["data"]) == 1
+
+        response = self.client.get(self.url, {"created_after": "yesterday"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "created_after" in response.json()["errors"]
+
+    def test_create_order_errors(self):
+        """Test validation and stock errors use the usual envelopes."""
+        response = self.client.post(
+            self.url,
+            {"products": [{"product_id": "99999999", "quantity": 1}]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "product_id" in response.json()["errors"]["products"][0]
+
+        response = self.client.post(
+            self.url,
+            {"products": [{"product_id": str(self.product.id), "quantity": 11}]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["message"] == "Insufficient stock"
+
+        response = self.client.post(
+            self.url, "not json", content_type="application/json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestOrderExportAPIView(APITestCase):
+    def setUp(self):
+        self.url = reverse("order:export")
+        self.keyboard = ProductsFactory(name="Keyboard", stock=50, price=50)
+        self.mouse = ProductsFactory(name="Mouse, wireless", stock=50, price=20)
+        self.first = process_order(
+            [
+                {"product_id": str(self.keyboard.id), "quantity": 1},
+                {"product_id": str(self.mouse.id), "quantity": 2},
+            ]
+        )
+        self.second = process_order(
+            [{"product_id": str(self.mouse.id), "quantity": 1}]
+        )
+        Order.objects.filter(id=self.first.id).update(
+            created=timezone.make_aware(datetime(2025, 1, 1))
+        )
+        Order.objects.filter(id=self.second.id).update(
+            created=timezone.make_aware(datetime(2025, 2, 1))
+        )
+
+    def read(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [line["id"] for line in lines] == [
+            str(self.first.id),
+            str(self.second.id),
+        ]
+        assert lines[0] == {
+            "id": str(self.first.id),
+            "status": "completed",
+            "total_price": 90.0,
+            "created": "2025-01-01T00:00:00Z",
+            "products": [
+                {
+                    "id": str(item.product_id),
+                    "name": item.product.name,
+                    "unit_price": float(item.unit_price),
+                    "quantity": item.quantity,
+                }
+                for item in self.first.items.order_by("id")
+            ],
+        }
+
+    def test_export_csv(self):
+        response = self.client.get(self.url, {"export_format": "csv"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/csv"
+        rows = list(csv.reader(self.read(response).splitlines()))
+        assert rows[0] == [
+            "order_id",
+            "status",
+            "total_price",
+            "created",
+            "product_id",
+            "product_name",
+            "unit_price",
+            "quantity",
+        ]
+        # One row per order item.
+        assert [row[0] for row in rows[1:]] == [str(self.first.id)] * 2 + [
+            str(self.second.id)
+        ]
+        assert rows[-1] == [
+            str(self.second.id),
+            "completed",
+            "20.00",
+            "2025-02-01T00:00:00Z",
+            str(self.mouse.id),
+            "Mouse, wireless",
+            "20.00",
+            "1",
+        ]
+
+    def test_export_created_range(self):
+        response = self.client.get(
+            self.url,
+            {"created_after": "2025-01-15", "created_before": "2025-03-01"},
+        )
+
+        lines = self.read(response).splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [str(self.second.id)]
+
+    def test_export_batches_without_count(self):
+        """Test each batch costs two queries and nothing counts the table."""
+        with override_settings(ORDER_EXPORT_BATCH_SIZE=1):
+            with CaptureQueriesContext(connection) as queries:
+                lines = self.read(self.client.get(self.url)).splitlines()
+
+        assert len(lines) == 2
+        # Two full batches and the empty one that ends the export.
+        assert len(queries) == 5
+        assert not any("COUNT(" in query["sql"] for query in queries)
+
+    def test_export_invalid_params(self):
+        response = self.client.get(self.url, {"export_format": "xml"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "export_format" in response.json()["errors"]
+
+        response = self.client.get(self.url, {"created_after": "yesterday"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "created_after" in response.json()["errors"]
+
+    def test_export_orders_command(self):
+        output = StringIO()
+
+        call_command(
+            "export_orders", format="csv", created_before="2025-01-15", stdout=output
+        )
+
+        rows = list(csv.reader(output.getvalue().splitlines()))
+        assert len(rows) == 3
+        assert {row[0] for row in rows[1:]} == {str(self.first.id)}
+
+
+class TestOrderListConditionalGet(APITestCase):
+    def setUp(self):
+        self.url = reverse("order:list-create")
+        self.product = ProductsFactory(name="Keyboard", stock=10)
+        process_order([{"product_id": self.product.id, "quantity": 1}])
+
+    def test_not_modified(self):
+        """Test a matching If-None-Match gets a 304 from one query."""
+        first = self.client.get(self.url)
+        assert first["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == first["ETag"]
+
+    def test_modified_by_new_order(self):
+        first = self.client.get(self.url, {"cursor": ""})
+        process_order([{"product_id": self.product.id, "quantity": 1}])
+
+        response = self.client.get(
+            self.url, {"cursor": ""}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["data"]) == 2
+
+    def test_modified_by_product_change(self):
+        """Test renaming a listed product changes the ETag."""
+        first = self.client.get(self.url)
+        self.product.name = "Clicky Keyboard"
+        self.product.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"][0]["products"][0]["name"] == "Clicky Keyboard"
+
+
+class TestOrderHoldAPIViews(APITestCase):
+    def setUp(self):
+        self.product = ProductsFactory(stock=10, price=20)
+        self.payload = {
+            "products": [{"product_id": str(self.product.id), "quantity": 3}]
+        }
+
+    def place_hold(self):
+        response = self.client.post(
+            reverse("order:hold-create"), self.payload, format="json"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        return response.json()["data"]
+
+    @override_settings(ORDER_HOLD_SECONDS=600)
+    def test_hold_and_confirm(self):
+        data = self.place_hold()
+        expires_at = timezone.make_aware(
+            datetime.strptime(data["expires_at"], "%Y-%m-%dT%H:%M:%SZ")
+        )
+        remaining = expires_at - timezone.now()
+        assert 590 < remaining.total_seconds() <= 600
+        self.product.refresh_from_db()
+        assert self.product.stock == 7
+
+        response = self.client.post(
+            reverse("order:hold-confirm", args=[data["order_id"]])
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["message"] == "Order confirmed."
+        order = self.client.get(reverse("order:list-create")).json()["data"][0]
+        assert order["status"] == "completed"
+
+    def test_release(self):
+        data = self.place_hold()
+
+        response = self.client.post(
+            reverse("order:hold-release", args=[data["order_id"]])
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        self.product.refresh_from_db()
+        assert self.product.stock == 10
+        order = self.client.get(reverse("order:list-create")).json()["data"][0]
+        assert order["status"] == "cancelled"
+
+        response = self.client.post(
+            reverse("order:hold-confirm", args=[data["order_id"]])
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.json()["code"] == error_codes.ORDER_HOLD_INACTIVE
+
+    def test_unknown_order(self):
+        response = self.client.post(reverse("order:hold-release", args=["missing"]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["code"] == error_codes.ORDER_NOT_FOUND
+
+    def test_hold_insufficient_stock(self):
+        self.payload["products"][0]["quantity"] = 11
+
+        response = self.client.post(
+            reverse("order:hold-create"), self.payload, format="json"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Order.objects.exists()
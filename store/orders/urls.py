@@ -1,6 +1,12 @@
 from django.urls import path
 from store.orders.views import (
+    OrderBatchCreateAPIView,
+    OrderExportAPIView,
+    OrderHoldConfirmAPIView,
+    OrderHoldCreateAPIView,
+    OrderHoldReleaseAPIView,
     OrderListCreateAPIView,
+    OrderListCreateAsyncView,
 )
 
 app_name = "orders"
@@ -11,4 +17,34 @@ urlpatterns = [
         view=OrderListCreateAPIView.as_view(),
         name="list-create",
     ),
+    path(
+        "batch/",
+        view=OrderBatchCreateAPIView.as_view(),
+        name="batch-create",
+    ),
+    path(
+        "holds/",
+        view=OrderHoldCreateAPIView.as_view(),
+        name="hold-create",
+    ),
+    path(
+        "<str:order_id>/confirm/",
+        view=OrderHoldConfirmAPIView.as_view(),
+        name="hold-confirm",
+    ),
+    path(
+        "<str:order_id>/release/",
+        view=OrderHoldReleaseAPIView.as_view(),
+        name="hold-release",
+    ),
+    path(
+        "export/",
+        view=OrderExportAPIView.as_view(),
+        name="export",
+    ),
+    path(
+        "async/",
+        view=OrderListCreateAsyncView.as_view(),
+        name="list-create-async",
+    ),
 ]
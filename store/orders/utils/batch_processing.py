@@ -0,0 +1,137 @@
+from collections import Counter
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from store.analytics.utils.rollups import roll_up_on_commit
+from store.db_router import use_primary
+from store.orders.enums import OrderStatusEnums
+from store.orders.exceptions import InsufficientStockException
+from store.orders.models import Order, OrderItem
+from store.orders.utils.hot_stock import get_store, is_hot, reserve_hot_stock, split_hot
+from store.orders.utils.order_processing import run_with_retries
+from store.orders.utils.stock_reservation import reserve_stock
+from store.outbox.utils.outbox import ORDER_COMPLETED, enqueue_orders
+from store.products.models import Product
+
+
+def lock_stock(product_ids: List[str]) -> Dict[str, int]:
+    """Lock the product rows in ascending id order and return their stock."""
+    return dict(
+        Product.objects.select_for_update()
+        .filter(id__in=product_ids)
+        .order_by("id")
+        .values_list("id", "stock")
+    )
+
+
+def allocate_stock(
+    carts: List[List[Dict]], available: Dict[str, int]
+) -> Tuple[List[int], List[Dict]]:
+    """
+    Allocate stock to carts in submission order.
+
+    Returns:
+        tuple: (indexes of the carts that fit, rejections as
+        {"index": int, "product_id": [ids that ran short]})
+    """
+    accepted, rejected = [], []
+    for index, cart in enumerate(carts):
+        short = [
+            str(item["product_id"])
+            for item in cart
+            if available.get(str(item["product_id"]), 0) < item["quantity"]
+        ]
+        if short:
+            rejected.append({"index": index, "product_id": short})
+            continue
+
+        for item in cart:
+            available[str(item["product_id"])] -= item["quantity"]
+        accepted.append(index)
+    return accepted, rejected
+
+
+def build_order(cart: List[Dict], products: Dict[str, Product]):
+    """Return an unsaved completed Order and its OrderItems."""
+    order = Order(status=OrderStatusEnums.COMPLETED.value)
+    order_items = []
+    total_price = Decimal("0")
+    for item in cart:
+        product = products[str(item["product_id"])]
+        total_price += product.price * item["quantity"]
+        order_items.append(
+            OrderItem(
+                order=order,
+                product=product,
+                quantity=item["quantity"],
+                unit_price=product.price,
+            )
+        )
+    order.total_price = total_price
+    return order, order_items
+
+
+@use_primary()
+def place_order_batch(
+    carts: List[List[Dict]], products: Dict[str, Product], atomic: bool = True
+) -> Tuple[List[Tuple[int, Order]], List[Dict]]:
+    """
+    Places many orders in one transaction.
+
+    Every referenced product is locked once, stock is allocated to the
+    carts in order, decremented with a single statement, and all orders and
+    order items are inserted with two bulk inserts. Hot products aren't
+    locked; they are allocated from and reserved in the hot stock counter
+    store.
+
+    Args:
+        carts (list): One list of {'product_id', 'quantity'} dicts per order.
+        products (dict): Dictionary of product_id -> Product for every
+        product in the batch.
+        atomic (bool): Reject the whole batch if any order lacks stock.
+        Otherwise place the orders that fit and report the others.
+
+    Returns:
+        tuple: ([(index, Order)] for the placed orders, rejections as
+        {"index": int, "product_id": [ids that ran short]})
+
+    Raises:
+        InsufficientStockException: If atomic and any order lacks stock.
+    """
+    product_ids = sorted({str(item["product_id"]) for cart in carts for item in cart})
+    hot_ids = [product_id for product_id in product_ids if is_hot(products[product_id])]
+
+    def place_orders():
+        available = lock_stock(
+            [product_id for product_id in product_ids if product_id not in hot_ids]
+        )
+        if hot_ids:
+            available.update(get_store().available(hot_ids))
+        accepted, rejected = allocate_stock(carts, available)
+        if atomic and rejected:
+            raise InsufficientStockException(errors={"orders": rejected})
+
+        quantities = Counter()
+        orders, order_items = [], []
+        for index in accepted:
+            for item in carts[index]:
+                quantities[str(item["product_id"])] += item["quantity"]
+            order, items = build_order(carts[index], products)
+            orders.append(order)
+            order_items.extend(items)
+
+        hot_quantities, quantities = split_hot(quantities, products)
+        for item in order_items:
+            item.stock_pending = item.product_id in hot_quantities
+
+        # Hot stock isn't locked, so a concurrent checkout can still take it
+        # and fail the whole batch here.
+        with reserve_hot_stock(hot_quantities):
+            reserve_stock(quantities)
+            Order.objects.bulk_create(orders)
+            OrderItem.objects.bulk_create(order_items)
+        enqueue_orders(ORDER_COMPLETED, [order.id for order in orders])
+        roll_up_on_commit([order.id for order in orders])
+        return list(zip(accepted, orders)), rejected
+
+    return run_with_retries(place_orders, product_ids)
@@ -0,0 +1,529 @@
+"""
+Write-behind stock for hot products.
+
+Every checkout normally decrements its products' rows, so during a flash
+sale all orders for one product queue on that row's lock. Products flagged
+``is_hot`` reserve their stock in a sharded counter store instead. Their
+order items are saved with ``stock_pending`` set, and flush_pending_stock
+later takes the sold quantities off products.stock in batches.
+
+The database stays the source of truth. The stock available for a hot
+product is always products.stock minus its pending order items, and those
+items are committed with their order, so they are the durable journal of
+what was sold. The counter store caches that number and journals the
+reservations whose order hasn't committed yet. reconcile() rebuilds it from
+the database, returning the stock of reservations left behind by a crashed
+or rolled back checkout.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from store.orders.exceptions import InsufficientStockException
+from store.orders.models import OrderItem
+from store.orders.utils.stock_reservation import per_product_quantity
+from store.products.cache import bump_catalog_generation
+from store.products.models import Product
+
+BACKEND_LOCAL = "local"
+BACKEND_SQLITE = "sqlite"
+
+# token -> (created timestamp, {product_id: quantity})
+Reservations = Dict[str, Tuple[float, Dict[str, int]]]
+
+
+def available_stock(
+    product_ids: Iterable[str], hot_only: bool = False
+) -> Dict[str, int]:
+    """
+    Return products.stock minus the pending quantities of each product, read
+    in one statement so a concurrent flush can't be counted twice.
+    """
+    pending = (
+        OrderItem.objects.filter(product_id=OuterRef("pk"), stock_pending=True)
+        .values("product_id")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    products = Product.objects.filter(id__in=list(product_ids))
+    if hot_only:
+        products = products.filter(is_hot=True)
+    return dict(
+        products.annotate(
+            available=F("stock") - Coalesce(Subquery(pending), 0)
+        ).values_list("id", "available")
+    )
+
+
+class LocalShard:
+    """Counters and reservations in process memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._reservations = {}
+
+    @contextmanager
+    def locked(self):
+        with self._lock:
+            yield
+
+    def get_counters(self, product_ids=None) -> Dict[str, int]:
+        if product_ids is None:
+            return dict(self._counters)
+        return {
+            product_id: self._counters[product_id]
+            for product_id in product_ids
+            if product_id in self._counters
+        }
+
+    def set_counters(self, counters: Dict[str, int]):
+        self._counters.update(counters)
+
+    def delete_counters(self, product_ids: List[str]):
+        for product_id in product_ids:
+            self._counters.pop(product_id, None)
+
+    def add_reservation(self, token: str, created: float, quantities: Dict[str, int]):
+        self._reservations[token] = (created, dict(quantities))
+
+    def pop_reservation(self, token: str) -> Dict[str, int]:
+        return self._reservations.pop(token, (None, {}))[1]
+
+    def get_reservations(self) -> Reservations:
+        return dict(self._reservations)
+
+
+class SQLiteShard:
+    """
+    Counters and reservations in a SQLite file shared by every process on
+    the host. Each change is committed to the file's write-ahead log before
+    the order that made it, so it survives the process crashing.
+    """
+
+    schema = [
+        """
+        CREATE TABLE IF NOT EXISTS counters (
+            product_id TEXT PRIMARY KEY,
+            available INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS reservations (
+            token TEXT NOT NULL,
+            product_id TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            created REAL NOT NULL,
+            PRIMARY KEY (token, product_id)
+        )
+        """,
+    ]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit; locked() opens the transactions.
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.schema:
+                connection.execute(statement)
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def locked(self):
+        connection = self._connection()
+        # Take the write lock up front, so two processes can't both read a
+        # counter before either decrements it.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get_counters(self, product_ids=None) -> Dict[str, int]:
+        sql = "SELECT product_id, available FROM counters"
+        if product_ids is None:
+            return dict(self._connection().execute(sql))
+        product_ids = list(product_ids)
+        placeholders = ", ".join("?" * len(product_ids))
+        return dict(
+            self._connection().execute(
+                f"{sql} WHERE product_id IN ({placeholders})", product_ids
+            )
+        )
+
+    def set_counters(self, counters: Dict[str, int]):
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO counters (product_id, available) VALUES (?, ?)",
+            counters.items(),
+        )
+
+    def delete_counters(self, product_ids: List[str]):
+        self._connection().executemany(
+            "DELETE FROM counters WHERE product_id = ?",
+            [(product_id,) for product_id in product_ids],
+        )
+
+    def add_reservation(self, token: str, created: float, quantities: Dict[str, int]):
+        self._connection().executemany(
+            "INSERT INTO reservations (token, product_id, quantity, created) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (token, product_id, quantity, created)
+                for product_id, quantity in quantities.items()
+            ],
+        )
+
+    def pop_reservation(self, token: str) -> Dict[str, int]:
+        connection = self._connection()
+        quantities = dict(
+            connection.execute(
+                "SELECT product_id, quantity FROM reservations WHERE token = ?",
+                [token],
+            )
+        )
+        connection.execute("DELETE FROM reservations WHERE token = ?", [token])
+        return quantities
+
+    def get_reservations(self) -> Reservations:
+        reservations = {}
+        rows = self._connection().execute(
+            "SELECT token, product_id, quantity, created FROM reservations"
+        )
+        for token, product_id, quantity, created in rows:
+            reservations.setdefault(token, (created, {}))[1][product_id] = quantity
+        return reservations
+
+
+class HotStockStore:
+    """
+    Available stock of hot products, partitioned into shards by product id.
+
+    Each shard has its own lock, which a checkout holds only while it
+    updates that shard's counters, never for its database transaction, so
+    checkouts of one product are limited by how fast a counter can be
+    decremented rather than by a row lock.
+    """
+
+    def __init__(self, shards, reconcile_interval: float = 0, stale_after: float = 0):
+        self.shards = shards
+        self.reconcile_interval = reconcile_interval
+        self.stale_after = stale_after
+        self._last_reconciled = time.monotonic()
+
+    def _by_shard(self, product_ids: Iterable[str]) -> Dict[int, List[str]]:
+        by_shard = defaultdict(list)
+        for product_id in sorted(product_ids):
+            index = zlib.crc32(product_id.encode()) % len(self.shards)
+            by_shard[index].append(product_id)
+        return dict(sorted(by_shard.items()))
+
+    def _load_counters(self, shard, product_ids: List[str]) -> Dict[str, int]:
+        """Fill in missing counters from the database; call with shard locked."""
+        in_flight = Counter()
+        for _, quantities in shard.get_reservations().values():
+            in_flight.update(quantities)
+        available = available_stock(product_ids)
+        counters = {
+            product_id: available.get(product_id, 0) - in_flight[product_id]
+            for product_id in product_ids
+        }
+        shard.set_counters(counters)
+        return counters
+
+    def _get_counters(self, shard, product_ids: List[str]) -> Dict[str, int]:
+        counters = shard.get_counters(product_ids)
+        missing = [
+            product_id for product_id in product_ids if product_id not in counters
+        ]
+        if missing:
+            counters.update(self._load_counters(shard, missing))
+        return counters
+
+    def available(self, product_ids: Iterable[str]) -> Dict[str, int]:
+        """Return the stock that can still be reserved for each product."""
+        available = {}
+        for index, shard_product_ids in self._by_shard(product_ids).items():
+            shard = self.shards[index]
+            with shard.locked():
+                available.update(self._get_counters(shard, shard_product_ids))
+        return available
+
+    def reserve(self, token: str, quantities: Dict[str, int]) -> List[int]:
+        """
+        Take ``quantities`` off the counters and journal them under ``token``.
+
+        Args:
+            token (str): Unique id of the reservation.
+            quantities (dict): Dictionary of product_id -> quantity.
+
+        Returns:
+            list: Indexes of the shards holding the reservation, to pass to
+            commit or release.
+
+        Raises:
+            InsufficientStockException: If a product doesn't have enough
+            stock. Nothing is reserved.
+        """
+        self.maybe_reconcile()
+
+        created = time.time()
+        reserved = []
+        try:
+            for index, product_ids in self._by_shard(quantities).items():
+                shard = self.shards[index]
+                with shard.locked():
+                    counters = self._get_counters(shard, product_ids)
+                    short = [
+                        product_id
+                        for product_id in product_ids
+                        if counters[product_id] < quantities[product_id]
+                    ]
+                    if short:
+                        raise InsufficientStockException(errors={"product_id": short})
+                    shard.set_counters(
+                        {
+                            product_id: counters[product_id] - quantities[product_id]
+                            for product_id in product_ids
+                        }
+                    )
+                    shard.add_reservation(
+                        token,
+                        created,
+                        {
+                            product_id: quantities[product_id]
+                            for product_id in product_ids
+                        },
+                    )
+                reserved.append(index)
+        except Exception:
+            self.release(token, reserved)
+            raise
+        return reserved
+
+    def commit(self, token: str, shard_indexes: List[int]):
+        """Forget a reservation whose order committed with pending items."""
+        for index in shard_indexes:
+            shard = self.shards[index]
+            with shard.locked():
+                shard.pop_reservation(token)
+
+    def release(self, token: str, shard_indexes: List[int]):
+        """Return the stock of a reservation whose order wasn't placed."""
+        for index in shard_indexes:
+            shard = self.shards[index]
+            with shard.locked():
+                quantities = shard.pop_reservation(token)
+                counters = shard.get_counters(list(quantities))
+                shard.set_counters(
+                    {
+                        product_id: available + quantities[product_id]
+                        for product_id, available in counters.items()
+                    }
+                )
+
+    def reconcile(self, stale_after: float = None) -> Dict[str, int]:
+        """
+        Rebuild every counter from the database.
+
+        Reservations older than ``stale_after`` seconds are dropped first.
+        By then their checkout either committed, and its items are pending
+        in the database, or crashed or rolled back, and its stock is
+        returned. Counters of products no longer flagged hot are removed.
+
+        Returns:
+            dict: Number of counters rebuilt and stale reservations dropped.
+        """
+        if stale_after is None:
+            stale_after = self.stale_after
+        self._last_reconciled = time.monotonic()
+        cutoff = time.time() - stale_after
+
+        result = {"counters": 0, "stale_reservations": 0}
+        for shard in self.shards:
+            with shard.locked():
+                in_flight = Counter()
+                for token, (created, quantities) in shard.get_reservations().items():
+                    if created < cutoff:
+                        shard.pop_reservation(token)
+                        result["stale_reservations"] += 1
+                    else:
+                        in_flight.update(quantities)
+
+                product_ids = list(shard.get_counters())
+                available = available_stock(product_ids, hot_only=True)
+                shard.delete_counters(
+                    [
+                        product_id
+                        for product_id in product_ids
+                        if product_id not in available
+                    ]
+                )
+                shard.set_counters(
+                    {
+                        product_id: stock - in_flight[product_id]
+                        for product_id, stock in available.items()
+                    }
+                )
+                result["counters"] += len(available)
+        return result
+
+    def maybe_reconcile(self):
+        """Reconcile if it's been reconcile_interval seconds since the last time."""
+        if (
+            self.reconcile_interval
+            and time.monotonic() - self._last_reconciled >= self.reconcile_interval
+        ):
+            self.reconcile()
+
+
+def build_store(backend: str, path: str, shards: int) -> HotStockStore:
+    options = {
+        "reconcile_interval": settings.HOT_STOCK_RECONCILE_INTERVAL,
+        "stale_after": settings.HOT_STOCK_RESERVATION_TIMEOUT,
+    }
+    if backend == BACKEND_LOCAL:
+        return HotStockStore([LocalShard() for _ in range(shards)], **options)
+    if backend == BACKEND_SQLITE:
+        os.makedirs(path, exist_ok=True)
+        return HotStockStore(
+            [
+                SQLiteShard(os.path.join(path, f"shard-{index}.sqlite3"))
+                for index in range(shards)
+            ],
+            **options,
+        )
+    raise ImproperlyConfigured(f"Unknown HOT_STOCK_BACKEND: {backend!r}")
+
+
+_store = None
+_store_config = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return this process's HotStockStore, or None if hot stock is disabled."""
+    global _store, _store_config
+
+    config = (
+        settings.HOT_STOCK_BACKEND,
+        settings.HOT_STOCK_PATH,
+        settings.HOT_STOCK_SHARDS,
+    )
+    if not config[0]:
+        return None
+    with _store_lock:
+        if _store is None or _store_config != config:
+            _store = build_store(*config)
+            _store_config = config
+        return _store
+
+
+def reset_store():
+    """Drop this process's store; the next get_store() builds a new one."""
+    global _store, _store_config
+    with _store_lock:
+        _store = _store_config = None
+
+
+def is_hot(product: Product) -> bool:
+    return bool(settings.HOT_STOCK_BACKEND) and product.is_hot
+
+
+def split_hot(
+    quantities: Dict[str, int], products: Dict[str, Product]
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Split ``quantities`` into (hot, other) by the products' is_hot flag.
+    Nothing is hot while hot stock is disabled.
+    """
+    hot, other = {}, {}
+    for product_id, quantity in quantities.items():
+        product = products.get(str(product_id))
+        if product is not None and is_hot(product):
+            hot[str(product_id)] = quantity
+        else:
+            other[product_id] = quantity
+    return hot, other
+
+
+@contextmanager
+def reserve_hot_stock(quantities: Dict[str, int]):
+    """
+    Reserve ``quantities`` of hot products for the block, which must save
+    the order items with ``stock_pending`` in the current transaction.
+
+    The reservation is released if the block raises, and cleared from the
+    journal once the transaction commits.
+
+    Raises:
+        InsufficientStockException: If a product doesn't have enough stock.
+    """
+    if not quantities:
+        yield
+        return
+
+    store = get_store()
+    token = uuid.uuid4().hex
+    shard_indexes = store.reserve(token, quantities)
+    try:
+        yield
+    except Exception:
+        store.release(token, shard_indexes)
+        raise
+    transaction.on_commit(partial(store.commit, token, shard_indexes))
+
+
+def flush_pending_stock(batch_size: int) -> int:
+    """
+    Take the quantities of up to ``batch_size`` pending order items off
+    products.stock, in one transaction with clearing their flag, so every
+    item is applied exactly once.
+
+    Returns:
+        int: Number of order items flushed.
+    """
+    with transaction.atomic():
+        items = list(
+            OrderItem.objects.select_for_update()
+            .filter(stock_pending=True)
+            .order_by("id")
+            .values_list("id", "product_id", "quantity")[:batch_size]
+        )
+        if not items:
+            return 0
+
+        totals = Counter()
+        for _, product_id, quantity in items:
+            totals[product_id] += quantity
+        Product.objects.filter(id__in=list(totals)).order_by("id").update(
+            stock=F("stock") - per_product_quantity(totals), modified=timezone.now()
+        )
+        OrderItem.objects.filter(id__in=[item_id for item_id, _, _ in items]).update(
+            stock_pending=False
+        )
+        # Cached product listings show stock.
+        transaction.on_commit(bump_catalog_generation)
+    return len(items)
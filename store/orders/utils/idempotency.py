@@ -0,0 +1,127 @@
+import hashlib
+import json
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from store.lru import LRUCache
+from store.orders.exceptions import IdempotencyKeyMismatchException
+from store.orders.models import IdempotencyKey
+from store.orders.utils.order_processing import run_with_retries
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# (status code, response body)
+StoredResponse = Tuple[int, Dict]
+
+# Per-process front for the idempotency_keys table, so a client retrying a
+# request it just sent is answered without a query. Entries never outlive
+# the row's TTL; the table stays the source of truth across workers.
+recent_responses = LRUCache(settings.IDEMPOTENCY_KEY_LRU_SIZE)
+
+
+class _KeyInUse(Exception):
+    """Another request committed a response for the key first."""
+
+
+def request_fingerprint(data) -> str:
+    """Return a stable hash of a request body."""
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode()
+    ).hexdigest()
+
+
+def _check_fingerprint(request_hash: str, fingerprint: str) -> None:
+    if request_hash != fingerprint:
+        raise IdempotencyKeyMismatchException()
+
+
+def _remember(key: str, fingerprint: str, response: StoredResponse, expires_at):
+    timeout = (expires_at - timezone.now()).total_seconds()
+    if timeout > 0:
+        recent_responses.set(key, (fingerprint, response), timeout)
+
+
+def _from_record(record: IdempotencyKey, fingerprint: str) -> StoredResponse:
+    _check_fingerprint(record.request_hash, fingerprint)
+    response = (record.response_status, record.response_body)
+    _remember(record.key, record.request_hash, response, record.expires_at)
+    return response
+
+
+def get_stored_response(key: str, fingerprint: str) -> Optional[StoredResponse]:
+    """
+    Return the stored response for ``key``, or None if the key is new or
+    expired.
+
+    Raises:
+        IdempotencyKeyMismatchException: If the key was used for a request
+        with a different body.
+    """
+    cached = recent_responses.get(key)
+    if cached is not None:
+        request_hash, response = cached
+        _check_fingerprint(request_hash, fingerprint)
+        return response
+
+    record = IdempotencyKey.objects.filter(key=key).first()
+    if record is None:
+        return None
+    if record.expires_at <= timezone.now():
+        record.delete()
+        return None
+    return _from_record(record, fingerprint)
+
+
+def run_once(
+    key: str,
+    fingerprint: str,
+    func: Callable[[], StoredResponse],
+    product_ids: List[str],
+) -> StoredResponse:
+    """
+    Run ``func`` and store its response under ``key`` in one transaction.
+
+    The key row is inserted before ``func`` runs, so a concurrent request
+    with the same key blocks on it instead of placing a second order. Once
+    the first transaction commits, the waiting request gets an integrity
+    error and replays the stored response. If ``func`` raises, nothing is
+    stored and the key can be retried.
+
+    Args:
+        key (str): The client's idempotency key.
+        fingerprint (str): request_fingerprint of the request body.
+        func (callable): Places the order and returns (status, body).
+        product_ids (list): Products in the order, for retry accounting.
+
+    Returns:
+        tuple: (status code, response body)
+
+    Raises:
+        IdempotencyKeyMismatchException: If a concurrent request stored a
+        response for the key with a different body.
+    """
+    expires_at = timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+    def execute():
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    key=key, request_hash=fingerprint, expires_at=expires_at
+                )
+        except IntegrityError:
+            raise _KeyInUse()
+
+        record.response_status, record.response_body = func()
+        record.save(update_fields=["response_status", "response_body"])
+        return record.response_status, record.response_body
+
+    try:
+        response = run_with_retries(execute, product_ids)
+    except _KeyInUse:
+        return _from_record(IdempotencyKey.objects.get(key=key), fingerprint)
+
+    _remember(key, fingerprint, response, expires_at)
+    return response
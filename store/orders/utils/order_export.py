@@ -0,0 +1,149 @@
+import csv
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+from django.db.models import Q
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from store.orders.enums import OrderStatusEnums
+from store.orders.models import OrderItem
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+
+CONTENT_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv",
+}
+
+CSV_HEADER = [
+    "order_id",
+    "status",
+    "total_price",
+    "created",
+    "product_id",
+    "product_name",
+    "unit_price",
+    "quantity",
+]
+
+ORDER_FIELDS = ["id", "status", "total_price", "created"]
+ITEM_FIELDS = ["order_id", "product_id", "product__name", "unit_price", "quantity"]
+
+
+def iter_order_batches(orders, batch_size: int) -> Iterator[Tuple[List, Dict]]:
+    """
+    Yield ``(orders, items_by_order)`` batches in (created, id) order.
+
+    Every batch is one keyset query for the orders and one for their items
+    and product names, so memory is bounded by ``batch_size`` and no query
+    gets slower as the export advances. A server-side cursor wouldn't give
+    that on MySQL, where the driver buffers the whole result set.
+    """
+    orders = orders.order_by("created", "id").values(*ORDER_FIELDS)
+    last = None
+    while True:
+        batch = orders
+        if last is not None:
+            created, pk = last
+            batch = batch.filter(
+                Q(created__gt=created) | Q(created=created, id__gt=pk)
+            )
+        rows = list(batch[:batch_size])
+        if not rows:
+            return
+
+        items_by_order = defaultdict(list)
+        items = (
+            OrderItem.objects.filter(order_id__in=[row["id"] for row in rows])
+            .order_by("order_id", "id")
+            .values_list(*ITEM_FIELDS)
+        )
+        for order_id, *item in items:
+            items_by_order[order_id].append(item)
+
+        yield rows, items_by_order
+        if len(rows) < batch_size:
+            return
+        last = (rows[-1]["created"], rows[-1]["id"])
+
+
+def _order_values(row):
+    return (
+        str(row["id"]),
+        OrderStatusEnums.get_name(row["status"]).lower(),
+        row["total_price"],
+        row["created"].strftime(api_settings.DATETIME_FORMAT),
+    )
+
+
+class _Echo:
+    """File-like object whose write returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def export_ndjson(orders, batch_size: int) -> Iterator[str]:
+    """Yield one JSON object per order, with its items, per line."""
+    encoder = JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    for rows, items_by_order in iter_order_batches(orders, batch_size):
+        lines = []
+        for row in rows:
+            order_id, status, total_price, created = _order_values(row)
+            products = [
+                {
+                    "id": str(product_id),
+                    "name": name,
+                    "unit_price": unit_price,
+                    "quantity": quantity,
+                }
+                for product_id, name, unit_price, quantity in items_by_order[row["id"]]
+            ]
+            lines.append(
+                encoder.encode(
+                    {
+                        "id": order_id,
+                        "status": status,
+                        "total_price": total_price,
+                        "created": created,
+                        "products": products,
+                    }
+                )
+            )
+        # One chunk per batch keeps the number of writes to the client low.
+        yield "\n".join(lines) + "\n"
+
+
+def export_csv(orders, batch_size: int) -> Iterator[str]:
+    """Yield CSV with one row per order item, order columns repeated."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for rows, items_by_order in iter_order_batches(orders, batch_size):
+        lines = []
+        for row in rows:
+            order = _order_values(row)
+            items = items_by_order[row["id"]] or [("", "", "", "")]
+            lines.extend(writer.writerow(order + tuple(item)) for item in items)
+        yield "".join(lines)
+
+
+EXPORTERS = {
+    FORMAT_NDJSON: export_ndjson,
+    FORMAT_CSV: export_csv,
+}
+
+
+def export_orders(orders, export_format: str, batch_size: int) -> Iterator[str]:
+    """
+    Stream ``orders`` with their line items as NDJSON or CSV.
+
+    Args:
+        orders (QuerySet): Orders to export, already filtered.
+        export_format (str): FORMAT_NDJSON or FORMAT_CSV.
+        batch_size (int): Orders fetched per query.
+
+    Returns:
+        iterator: Text chunks, each covering one batch of orders.
+    """
+    return EXPORTERS[export_format](orders, batch_size)
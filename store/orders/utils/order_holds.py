@@ -0,0 +1,160 @@
+"""
+Timed stock holds.
+
+``process_order(..., hold_for=seconds)`` takes the stock of a cart like any
+checkout but saves the order as PENDING with an ``expires_at``, e.g. while
+a payment is in flight. The hold is then confirmed, which completes the
+order, or released, which cancels it and returns its stock.
+release_expired_holds releases the holds nobody confirmed, in batches of
+set-based updates.
+"""
+
+from collections import Counter
+from typing import List
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from store.analytics.utils.rollups import roll_up_on_commit
+from store.db_router import use_primary
+from store.fields import parse_uuid
+from store.orders.enums import OrderStatusEnums
+from store.orders.exceptions import (
+    OrderHoldInactiveException,
+    OrderNotFoundException,
+)
+from store.orders.models import Order, OrderItem
+from store.orders.utils.stock_reservation import per_product_quantity
+from store.products.cache import bump_catalog_generation
+from store.outbox.utils.outbox import (
+    ORDER_CANCELLED,
+    ORDER_COMPLETED,
+    enqueue_orders,
+)
+from store.products.models import Product
+
+
+def raise_inactive(order_id: str):
+    """Raise the error for an order that isn't an active hold."""
+    if not Order.objects.filter(id=order_id).exists():
+        raise OrderNotFoundException()
+    raise OrderHoldInactiveException()
+
+
+def parse_order_id(order_id: str) -> str:
+    """Return the canonical form of ``order_id``, which comes from the URL."""
+    order_id = parse_uuid(order_id)
+    if order_id is None:
+        raise OrderNotFoundException()
+    return order_id
+
+
+@use_primary()
+def confirm_hold(order_id: str) -> None:
+    """
+    Complete a PENDING order whose hold hasn't expired.
+
+    Raises:
+        OrderNotFoundException: If there is no such order.
+        OrderHoldInactiveException: If it isn't an active hold.
+    """
+    order_id = parse_order_id(order_id)
+    now = timezone.now()
+    with transaction.atomic():
+        confirmed = Order.objects.filter(
+            id=order_id, status=OrderStatusEnums.PENDING.value, expires_at__gt=now
+        ).update(
+            status=OrderStatusEnums.COMPLETED.value, expires_at=None, modified=now
+        )
+        if not confirmed:
+            raise_inactive(order_id)
+        enqueue_orders(ORDER_COMPLETED, [order_id])
+        roll_up_on_commit([order_id])
+
+
+def release_orders(order_ids: List[str]) -> None:
+    """
+    Cancel PENDING orders locked by the caller and return their stock.
+
+    Uses one statement per table whatever the number of orders. Stock that
+    was taken from products.stock is added back; the items of hot products
+    still pending are cleared so flush_hot_stock never takes it. The hot
+    stock counters catch up at their next reconcile.
+    """
+    if not order_ids:
+        return
+    now = timezone.now()
+
+    # Items before products, in the order flush_pending_stock locks them.
+    items = list(
+        OrderItem.objects.select_for_update()
+        .filter(order_id__in=order_ids)
+        .order_by("id")
+        .values_list("product_id", "quantity", "stock_pending")
+    )
+    restock = Counter()
+    for product_id, quantity, stock_pending in items:
+        if not stock_pending:
+            restock[product_id] += quantity
+
+    if restock:
+        Product.objects.filter(id__in=list(restock)).order_by("id").update(
+            stock=F("stock") + per_product_quantity(restock), modified=now
+        )
+        transaction.on_commit(bump_catalog_generation)
+    OrderItem.objects.filter(order_id__in=order_ids, stock_pending=True).update(
+        stock_pending=False
+    )
+    Order.objects.filter(id__in=order_ids).update(
+        status=OrderStatusEnums.CANCELLED.value, expires_at=None, modified=now
+    )
+    enqueue_orders(ORDER_CANCELLED, order_ids)
+
+
+@use_primary()
+def release_hold(order_id: str) -> None:
+    """
+    Cancel a PENDING order and return its stock, expired or not.
+
+    Raises:
+        OrderNotFoundException: If there is no such order.
+        OrderHoldInactiveException: If it isn't PENDING.
+    """
+    order_id = parse_order_id(order_id)
+    with transaction.atomic():
+        order_ids = list(
+            Order.objects.select_for_update()
+            .filter(id=order_id, status=OrderStatusEnums.PENDING.value)
+            .values_list("id", flat=True)
+        )
+        if not order_ids:
+            raise_inactive(order_id)
+        release_orders(order_ids)
+
+
+@use_primary()
+def release_expired_holds(batch_size: int) -> int:
+    """
+    Release up to ``batch_size`` expired holds, oldest first, in one short
+    transaction.
+
+    Holds locked by a concurrent confirm or sweeper are skipped where the
+    database supports SKIP LOCKED, so several sweepers can run at once.
+
+    Returns:
+        int: Number of holds released.
+    """
+    with transaction.atomic():
+        order_ids = list(
+            Order.objects.select_for_update(
+                skip_locked=connection.features.has_select_for_update_skip_locked
+            )
+            .filter(
+                status=OrderStatusEnums.PENDING.value,
+                expires_at__lte=timezone.now(),
+            )
+            .order_by("expires_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        release_orders(order_ids)
+    return len(order_ids)
@@ -1,22 +1,49 @@
-from django.db import transaction
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
+from store.analytics.utils.rollups import roll_up_on_commit
+from store.db_router import use_primary
 from store.products.models import Product
+from store.products.snapshots import product_snapshots
 from store.orders.models import Order, OrderItem
 from store.orders.enums import OrderStatusEnums
-from store.orders.exceptions import InsufficientStockException
-from typing import Dict, List, Tuple
-
-
-def fetch_products(product_ids: List[int]) -> Dict[int, Product]:
+from store.orders.exceptions import (
+    InsufficientStockException,
+    ProductChangedException,
+)
+from store.orders.utils.hot_stock import reserve_hot_stock, split_hot
+from store.orders.utils.stock_reservation import (
+    StaleProductsError,
+    check_versions,
+    reservation_stats,
+    reserve_stock,
+)
+from store.outbox.utils.outbox import ORDER_COMPLETED, enqueue_orders
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# MySQL error codes for "deadlock found" and "lock wait timeout exceeded".
+LOCK_CONTENTION_ERRORS = (1213, 1205)
+
+
+def fetch_products(product_ids: List[str]) -> Dict[str, Product]:
     """
     Retrieve products in bulk and return a dictionary with product_id as keys.
+
+    Products are read from this worker's snapshots where cached, so they
+    only have the fields checkout needs and their stock is None.
     """
-    return Product.objects.in_bulk(product_ids)
+    return product_snapshots.get_many(product_ids)
 
 
 def validate_and_prepare_order_items(
     products: Dict[str, Product], cart_items: List[Dict[str, int]]
-) -> Tuple[List[OrderItem], float]:
+) -> Tuple[List[OrderItem], Decimal]:
     """
     Validates stock availability and prepares OrderItem instances.
 
@@ -30,7 +57,7 @@ def validate_and_prepare_order_items(
     """
     try:
         order_items = []
-        total_price = 0
+        total_price = Decimal("0")
         for item in cart_items:
             product_id = item.get("product_id")
             quantity = item.get("quantity", 1)
@@ -40,56 +67,168 @@ def validate_and_prepare_order_items(
                     {"product_id": f"Product with ID {product_id} not found."}
                 )
 
-            if product.stock < quantity:
+            # Fail fast on the stock we read, if any; the authoritative check
+            # is the conditional decrement in reserve_stock.
+            if product.stock is not None and product.stock < quantity:
                 raise InsufficientStockException()
 
-            # Deduct stock
-            product.stock -= quantity
             total_price += product.price * quantity
 
-            order_items.append(OrderItem(product=product, quantity=quantity))
+            order_items.append(
+                OrderItem(product=product, quantity=quantity, unit_price=product.price)
+            )
         return order_items, total_price
     except Exception:
         raise
 
 
-def create_order(order_items: List[OrderItem], total_price: float) -> Order:
-    """Creates an order and associates order items."""
+def create_order(
+    order_items: List[OrderItem], total_price: Decimal, expires_at=None
+) -> Order:
+    """
+    Creates a completed order and associates order items.
+
+    Stock has already been reserved when this runs, so the order is inserted
+    in its final status with one INSERT instead of being created PENDING and
+    updated. With ``expires_at``, the order is a PENDING stock hold that
+    expires then instead.
+    """
     order = Order.objects.create(
-        total_price=total_price, status=OrderStatusEnums.PENDING.value
+        total_price=total_price,
+        status=(
+            OrderStatusEnums.COMPLETED.value
+            if expires_at is None
+            else OrderStatusEnums.PENDING.value
+        ),
+        expires_at=expires_at,
     )
 
     for item in order_items:
         item.order = order
 
     OrderItem.objects.bulk_create(order_items)
-
-    order.mark_completed()
     return order
 
 
-def process_order(cart_items: List[Dict[str, int]]) -> Order:
+def is_lock_contention(exc: OperationalError) -> bool:
+    """Return True if the error is a deadlock or lock wait timeout."""
+    return bool(exc.args) and exc.args[0] in LOCK_CONTENTION_ERRORS
+
+
+def run_with_retries(func: Callable[[], T], product_ids: List[str]) -> T:
+    """
+    Run ``func`` in a transaction, retrying with exponential backoff if the
+    transaction is picked as a deadlock victim or times out waiting for a
+    row lock. Retries are only possible when not already inside a caller's
+    transaction and are counted against ``product_ids``.
+    """
+    max_retries = settings.ORDER_RESERVATION_MAX_RETRIES
+    can_retry = not connection.in_atomic_block
+
+    attempt = 0
+    while True:
+        try:
+            with transaction.atomic():
+                return func()
+        except OperationalError as e:
+            if not can_retry or not is_lock_contention(e) or attempt >= max_retries:
+                raise
+            attempt += 1
+            reservation_stats.record_retries(product_ids)
+            time.sleep(settings.ORDER_RESERVATION_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+
+@use_primary()
+def process_order(
+    cart_items: List[Dict[str, int]],
+    products: Dict[str, Product] = None,
+    hold_for: float = None,
+) -> Order:
     """
     Processes an order by validating stock, deducting inventory, and creating
     order records.
 
+    Stock is reserved with a conditional decrement, so concurrent checkouts
+    for the same product can never oversell it. Hot products are reserved in
+    the hot stock counter store instead and their items are saved as
+    pending. The transaction is retried with backoff if it is picked as a
+    deadlock victim, unless it runs inside a caller's transaction. Every
+    query goes to the primary database, never to a read replica. Side
+    effects of the order are left to the outbox, written in the same
+    transaction.
+
+    The order is priced from product snapshots, see
+    store.products.snapshots. Stock is only decremented while the products
+    still have the version they were priced from; products that changed
+    meanwhile are read again and the order is priced again.
+
     Args:
         cart_items (list): List of dictionaries containing 'product_id' and
         'quantity'.
+        products (dict, optional): Dictionary of product_id -> Product already
+        resolved by the caller. Fetched with fetch_products when omitted.
+        hold_for (float, optional): Create a PENDING order that holds the
+        stock for this many seconds instead of a completed one. See
+        store.orders.utils.order_holds.
 
     Returns:
         Order: The created Order instance.
     """
     product_ids = [item["product_id"] for item in cart_items]
-
-    with transaction.atomic():
+    if products is None:
         products = fetch_products(product_ids)
-        order_items, total_price = validate_and_prepare_order_items(
-            products, cart_items
-        )
 
-        # Bulk update stock in DB
-        Product.objects.bulk_update(products.values(), ["stock"])
+    for attempt in range(settings.ORDER_RESERVATION_MAX_RETRIES + 1):
+        try:
+            return place_priced_order(cart_items, products, hold_for)
+        except StaleProductsError as e:
+            if attempt >= settings.ORDER_RESERVATION_MAX_RETRIES:
+                raise ProductChangedException(errors={"product_id": e.product_ids})
+            product_snapshots.evict(e.product_ids)
+            products = fetch_products(product_ids)
+
+
+def place_priced_order(
+    cart_items: List[Dict[str, int]], products: Dict[str, Product], hold_for: float
+) -> Order:
+    """
+    Price the order from ``products`` and place it.
 
-        # Create order and save items
-        return create_order(order_items, total_price)
+    Raises:
+        StaleProductsError: If a product changed since it was read.
+    """
+    product_ids = [item["product_id"] for item in cart_items]
+
+    # Reads and price calculations happen before the transaction; the row
+    # locks taken by reserve_stock are only held for the two inserts.
+    order_items, total_price = validate_and_prepare_order_items(products, cart_items)
+    quantities = {item["product_id"]: item.get("quantity", 1) for item in cart_items}
+    hot_quantities, quantities = split_hot(quantities, products)
+    for item in order_items:
+        item.stock_pending = item.product_id in hot_quantities
+    versions = {
+        str(product_id): products[str(product_id)].version
+        for product_id in product_ids
+    }
+
+    def place_order():
+        # Hot products aren't decremented on their rows, so their versions
+        # are checked with an unlocked read instead. A price change can
+        # still commit before this order does, see store.products.snapshots.
+        check_versions(
+            {product_id: versions[product_id] for product_id in hot_quantities}
+        )
+        with reserve_hot_stock(hot_quantities):
+            reserve_stock(quantities, versions)
+
+            # Create order and save items
+            if hold_for is None:
+                order = create_order(order_items, total_price)
+                enqueue_orders(ORDER_COMPLETED, [order.id])
+                roll_up_on_commit([order.id])
+            else:
+                expires_at = timezone.now() + timedelta(seconds=hold_for)
+                order = create_order(order_items, total_price, expires_at)
+            return order
+
+    return run_with_retries(place_order, product_ids)
@@ -0,0 +1,171 @@
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Case, F, IntegerField, Value, When
+from store.products.cache import bump_catalog_generation
+from store.products.models import Product
+from store.orders.exceptions import InsufficientStockException
+
+
+class ReservationStats:
+    """
+    Thread-safe per-SKU counters for the stock reservation engine.
+
+    conflicts: a conditional decrement lost against a concurrent checkout.
+    retries: the reservation transaction was retried after a deadlock or a
+    lock wait timeout.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.conflicts = Counter()
+        self.retries = Counter()
+
+    def record_conflicts(self, product_ids: Iterable[str]):
+        with self._lock:
+            self.conflicts.update(str(product_id) for product_id in product_ids)
+
+    def record_retries(self, product_ids: Iterable[str]):
+        with self._lock:
+            self.retries.update(str(product_id) for product_id in product_ids)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Return a copy of the counters keyed by product id."""
+        with self._lock:
+            return {
+                product_id: {
+                    "conflicts": self.conflicts[product_id],
+                    "retries": self.retries[product_id],
+                }
+                for product_id in set(self.conflicts) | set(self.retries)
+            }
+
+    def reset(self):
+        with self._lock:
+            self.conflicts.clear()
+            self.retries.clear()
+
+
+reservation_stats = ReservationStats()
+
+
+class _ReservationConflict(Exception):
+    """Raised inside the reservation savepoint to roll back a partial decrement."""
+
+
+class StaleProductsError(Exception):
+    """
+    The products in ``product_ids`` changed, or were deleted, since the
+    order was priced from them.
+    """
+
+    def __init__(self, product_ids: Iterable[str]):
+        self.product_ids = list(product_ids)
+        super().__init__(self.product_ids)
+
+
+def per_product_quantity(quantities: Dict[str, int]) -> Case:
+    return Case(
+        *[
+            When(id=product_id, then=Value(quantity))
+            for product_id, quantity in quantities.items()
+        ],
+        output_field=IntegerField(),
+    )
+
+
+def check_versions(versions: Dict[str, int]) -> None:
+    """
+    Ensure every product in ``versions`` still has that version.
+
+    The rows aren't locked, so a product can still change before the
+    caller's transaction commits.
+
+    Raises:
+        StaleProductsError: For the products that changed or were deleted.
+    """
+    if not versions:
+        return
+    current = dict(
+        Product.objects.filter(id__in=list(versions)).values_list("id", "version")
+    )
+    stale = [
+        product_id
+        for product_id, version in versions.items()
+        if current.get(product_id) != version
+    ]
+    if stale:
+        raise StaleProductsError(stale)
+
+
+def reserve_stock(
+    quantities: Dict[str, int], versions: Optional[Dict[str, int]] = None
+) -> None:
+    """
+    Atomically decrement stock for every product in ``quantities``.
+
+    All rows are decremented by a single conditional statement,
+    ``stock = stock - q WHERE stock >= q``, applied in ascending id order so
+    concurrent checkouts always lock rows in the same order. Either every
+    product is decremented or none is.
+
+    Args:
+        quantities (dict): Dictionary of product_id -> quantity to reserve.
+        versions (dict, optional): Dictionary of product_id -> the version
+        the order was priced from. Products are then only decremented while
+        they still have that version.
+
+    Raises:
+        InsufficientStockException: If any product no longer has enough stock.
+        StaleProductsError: If any product changed since it was priced.
+    """
+    if not quantities:
+        return
+
+    quantities = dict(
+        sorted((str(product_id), quantity) for product_id, quantity in quantities.items())
+    )
+    requested = per_product_quantity(quantities)
+    products = Product.objects.filter(id__in=list(quantities), stock__gte=requested)
+    if versions is not None:
+        versions = {product_id: versions[product_id] for product_id in quantities}
+        products = products.filter(version=per_product_quantity(versions))
+
+    try:
+        with transaction.atomic():
+            updated = (
+                products.order_by("id")
+                .update(stock=F("stock") - requested, modified=timezone.now())
+            )
+            if updated != len(quantities):
+                raise _ReservationConflict()
+    except _ReservationConflict:
+        # The savepoint is rolled back but the row locks are still held, so
+        # the stock read here is the value the decrement was checked against.
+        rows = Product.objects.filter(id__in=list(quantities)).values_list(
+            "id", "stock", "version"
+        )
+        available = {
+            product_id: (stock, version) for product_id, stock, version in rows
+        }
+        if versions is not None:
+            stale = [
+                product_id
+                for product_id, version in versions.items()
+                if available.get(product_id, (0, None))[1] != version
+            ]
+            if stale:
+                raise StaleProductsError(stale)
+        short = [
+            product_id
+            for product_id, quantity in quantities.items()
+            if available.get(product_id, (0, None))[0] < quantity
+        ]
+        reservation_stats.record_conflicts(short)
+        raise InsufficientStockException(errors={"product_id": short})
+
+    # Cached product listings show stock, refresh them once this commits.
+    transaction.on_commit(bump_catalog_generation)
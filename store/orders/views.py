@@ -1,22 +1,65 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
-from store.orders.serializers import OrderSerializer
+from store.orders.serializers import OrderBatchSerializer, OrderSerializer
+from store.orders.utils.batch_processing import place_order_batch
+from store.orders.filters import OrderFilter
+from store.orders.utils.order_export import (
+    CONTENT_TYPES,
+    FORMAT_NDJSON,
+    export_orders,
+)
+from store.orders.utils.idempotency import (
+    IDEMPOTENCY_HEADER,
+    get_stored_response,
+    request_fingerprint,
+    run_once,
+)
+from store.orders.utils.order_holds import confirm_hold, release_hold
 from store.orders.utils.order_processing import process_order
-from rest_framework.serializers import ValidationError
+from rest_framework.serializers import DateTimeField, ValidationError
 from store.exceptions import BaseException
+from store.orders.exceptions import InsufficientStockException
 from store import error_codes
-from store.orders.models import Order
+from store.orders.models import IdempotencyKey, Order, OrderItem
+from store.products.models import Product
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django_filters import rest_framework as django_filters
 from rest_framework import filters
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from store.sync_pool import run_sync
+from store.views import (
+    AsyncListView,
+    ConditionalListMixin,
+    ReplicaListMixin,
+    ValuesListMixin,
+    json_response,
+)
+import json
 
 
-class OrderListCreateAPIView(generics.ListCreateAPIView):
+class OrderListCreateAPIView(
+    ReplicaListMixin,
+    ConditionalListMixin,
+    ValuesListMixin,
+    generics.ListCreateAPIView,
+):
     serializer_class = OrderSerializer
-    queryset = Order.objects.all()
+    # Orders are listed with the current name and price of their products.
+    related_models = [Product]
+    queryset = Order.objects.prefetch_related(
+        Prefetch(
+            "items",
+            queryset=OrderItem.objects.select_related("product").order_by("id"),
+        )
+    )
     filter_backends = [
         filters.OrderingFilter,
         django_filters.DjangoFilterBackend,
     ]
+    filterset_class = OrderFilter
     ordering_fields = ["created"]
     ordering = ["-created"]
 
@@ -34,18 +77,104 @@ class OrderListCreateAPIView(generics.ListCreateAPIView):
                 e.get_http_status_code(),
             )
 
+    def get_idempotency_key(self, request):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        max_length = IdempotencyKey._meta.get_field("key").max_length
+        if key is not None and not 0 < len(key) <= max_length:
+            raise ValidationError(
+                {
+                    IDEMPOTENCY_HEADER: [
+                        f"Must be between 1 and {max_length} characters."
+                    ]
+                }
+            )
+        return key
+
+    def post(self, request, *args, **kwargs):
+        try:
+            idempotency_key = self.get_idempotency_key(request)
+            if idempotency_key is not None:
+                fingerprint = request_fingerprint(request.data)
+                stored = get_stored_response(idempotency_key, fingerprint)
+                if stored is not None:
+                    response_status, body = stored
+                    return Response(
+                        body, response_status, headers={"Idempotent-Replayed": "true"}
+                    )
+
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            cart_items = serializer.validated_data["products"]
+
+            def place_order():
+                order = process_order(
+                    cart_items, products=serializer.resolved_products
+                )
+                return status.HTTP_201_CREATED, {
+                    "status": "success",
+                    "message": "Order placed successfully.",
+                    "data": {"order_id": str(order.id)},
+                }
+
+            if idempotency_key is None:
+                response_status, body = place_order()
+            else:
+                response_status, body = run_once(
+                    idempotency_key,
+                    fingerprint,
+                    place_order,
+                    [item["product_id"] for item in cart_items],
+                )
+            return Response(body, status=response_status)
+
+        except ValidationError as e:
+            return Response(
+                {
+                    "errors": e.detail,
+                    "code": error_codes.VALIDATION_ERROR,
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        except BaseException as e:
+            return Response(
+                {
+                    "status": "error",
+                    "code": e.get_error_code(),
+                    "message": str(e),
+                    "errors": e.get_errors(),
+                },
+                e.get_http_status_code(),
+            )
+
+
+class OrderBatchCreateAPIView(generics.GenericAPIView):
+    serializer_class = OrderBatchSerializer
+
     def post(self, request, *args, **kwargs):
         try:
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
 
-            order = process_order(serializer.validated_data["products"])
+            placed, rejected = place_order_batch(
+                [cart["products"] for cart in serializer.validated_data["orders"]],
+                serializer.resolved_products,
+                atomic=serializer.validated_data["atomic"],
+            )
+            if not placed:
+                raise InsufficientStockException(errors={"orders": rejected})
 
             return Response(
                 {
                     "status": "success",
-                    "message": "Order placed successfully.",
-                    "data": {"order_id": order.id},
+                    "message": f"{len(placed)} orders placed successfully.",
+                    "data": {
+                        "orders": [
+                            {"index": index, "order_id": order.id}
+                            for index, order in placed
+                        ],
+                        "rejected": rejected,
+                    },
                 },
                 status=status.HTTP_201_CREATED,
             )
@@ -69,3 +198,204 @@ class OrderListCreateAPIView(generics.ListCreateAPIView):
                 },
                 e.get_http_status_code(),
             )
+
+
+class OrderHoldCreateAPIView(generics.GenericAPIView):
+    """
+    Places a PENDING order that holds its stock for ORDER_HOLD_SECONDS,
+    until it is confirmed or released.
+    """
+
+    serializer_class = OrderSerializer
+
+    def post(self, request, *args, **kwargs):
+        try:
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+
+            order = process_order(
+                serializer.validated_data["products"],
+                products=serializer.resolved_products,
+                hold_for=settings.ORDER_HOLD_SECONDS,
+            )
+
+            return Response(
+                {
+                    "status": "success",
+                    "message": "Stock held.",
+                    "data": {
+                        "order_id": str(order.id),
+                        "expires_at": DateTimeField().to_representation(
+                            order.expires_at
+                        ),
+                    },
+                },
+                status=status.HTTP_201_CREATED,
+            )
+
+        except ValidationError as e:
+            return Response(
+                {
+                    "errors": e.detail,
+                    "code": error_codes.VALIDATION_ERROR,
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        except BaseException as e:
+            return Response(
+                {
+                    "status": "error",
+                    "code": e.get_error_code(),
+                    "message": str(e),
+                    "errors": e.get_errors(),
+                },
+                e.get_http_status_code(),
+            )
+
+
+class OrderHoldActionAPIView(generics.GenericAPIView):
+    """Confirms or releases the stock hold of a PENDING order."""
+
+    hold_action = None
+    message = None
+
+    def post(self, request, order_id, *args, **kwargs):
+        try:
+            self.hold_action(order_id)
+            return Response(
+                {
+                    "status": "success",
+                    "message": self.message,
+                    "data": {"order_id": order_id},
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        except BaseException as e:
+            return Response(
+                {
+                    "status": "error",
+                    "code": e.get_error_code(),
+                    "message": str(e),
+                    "errors": e.get_errors(),
+                },
+                e.get_http_status_code(),
+            )
+
+
+class OrderHoldConfirmAPIView(OrderHoldActionAPIView):
+    hold_action = staticmethod(confirm_hold)
+    message = "Order confirmed."
+
+
+class OrderHoldReleaseAPIView(OrderHoldActionAPIView):
+    hold_action = staticmethod(release_hold)
+    message = "Stock hold released."
+
+
+class OrderExportAPIView(generics.GenericAPIView):
+    """
+    Streams every matching order with its line items as NDJSON or CSV,
+    without pagination or a COUNT query.
+    """
+
+    queryset = Order.objects.all()
+    filter_backends = [django_filters.DjangoFilterBackend]
+    filterset_class = OrderFilter
+    format_query_param = "export_format"
+
+    def get(self, request, *args, **kwargs):
+        try:
+            export_format = request.query_params.get(
+                self.format_query_param, FORMAT_NDJSON
+            )
+            if export_format not in CONTENT_TYPES:
+                raise ValidationError(
+                    {
+                        self.format_query_param: [
+                            f"Must be one of: {', '.join(CONTENT_TYPES)}."
+                        ]
+                    }
+                )
+
+            orders = self.filter_queryset(self.get_queryset())
+            response = StreamingHttpResponse(
+                export_orders(orders, export_format, settings.ORDER_EXPORT_BATCH_SIZE),
+                content_type=CONTENT_TYPES[export_format],
+            )
+            response["Content-Disposition"] = (
+                f'attachment; filename="orders.{export_format}"'
+            )
+            return response
+
+        except ValidationError as e:
+            return Response(
+                {
+                    "errors": e.detail,
+                    "code": error_codes.VALIDATION_ERROR,
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class OrderListCreateAsyncView(AsyncListView):
+    """
+    Async variant of GET/POST /orders/ for ASGI deployments. Validation and
+    process_order are sync-only and run on the bounded sync pool.
+    """
+
+    serializer_class = OrderSerializer
+    filter_backends = OrderListCreateAPIView.filter_backends
+    filterset_class = OrderListCreateAPIView.filterset_class
+    ordering_fields = OrderListCreateAPIView.ordering_fields
+    ordering = OrderListCreateAPIView.ordering
+
+    def get_queryset(self):
+        return OrderListCreateAPIView.queryset.all()
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            try:
+                data = json.loads(request.body)
+            except ValueError:
+                raise ValidationError({"non_field_errors": ["Invalid JSON body."]})
+
+            serializer = self.serializer_class(data=data)
+            await run_sync(serializer.is_valid, raise_exception=True)
+
+            order = await run_sync(
+                process_order,
+                serializer.validated_data["products"],
+                products=serializer.resolved_products,
+            )
+
+            return json_response(
+                {
+                    "status": "success",
+                    "message": "Order placed successfully.",
+                    "data": {"order_id": order.id},
+                },
+                status.HTTP_201_CREATED,
+            )
+
+        except ValidationError as e:
+            return json_response(
+                {
+                    "errors": e.detail,
+                    "code": error_codes.VALIDATION_ERROR,
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        except BaseException as e:
+            return json_response(
+                {
+                    "status": "error",
+                    "code": e.get_error_code(),
+                    "message": str(e),
+                    "errors": e.get_errors(),
+                },
+                e.get_http_status_code(),
+            )
@@ -0,0 +1,6 @@
+from store.enums import BaseEnum
+
+
+class OutboxStatusEnums(BaseEnum):
+    PENDING = 1
+    DEAD = 2
@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from store.outbox.utils.outbox import drain_outbox, requeue_dead_messages
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the handlers of due outbox messages on a thread pool. Drains "
+        "the outbox once, or every --interval seconds until stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.OUTBOX_WORKER_THREADS,
+            help="Handlers run at the same time.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Seconds between drains. With 0, drain once and exit.",
+        )
+        parser.add_argument(
+            "--requeue-dead",
+            action="store_true",
+            help="First make dead-lettered messages due again.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_dead"]:
+            self.stdout.write(
+                f"Requeued {requeue_dead_messages()} dead-lettered messages."
+            )
+
+        batch_size = options["batch_size"]
+        with ThreadPoolExecutor(
+            max_workers=options["workers"], thread_name_prefix="store-outbox"
+        ) as executor:
+            while True:
+                totals = {"delivered": 0, "retried": 0, "dead": 0}
+                while True:
+                    result = drain_outbox(batch_size, executor)
+                    for key in totals:
+                        totals[key] += result[key]
+                    if result["claimed"] < batch_size:
+                        break
+                self.stdout.write(
+                    f"Delivered {totals['delivered']} messages, "
+                    f"{totals['retried']} to retry, {totals['dead']} dead-lettered."
+                )
+
+                if not options["interval"]:
+                    break
+                time.sleep(options["interval"])
@@ -0,0 +1,54 @@
+import uuid
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxMessage",
+            fields=[
+                (
+                    "id",
+                    models.CharField(
+                        default=uuid.uuid4,
+                        max_length=36,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("topic", models.CharField(max_length=100)),
+                ("handler", models.CharField(max_length=255)),
+                ("payload", models.JSONField()),
+                (
+                    "status",
+                    models.SmallIntegerField(
+                        choices=[("PENDING", 1), ("DEAD", 2)], default=1
+                    ),
+                ),
+                ("attempts", models.IntegerField(default=0)),
+                (
+                    "available_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "outbox_messages",
+                "managed": True,
+                "indexes": [
+                    models.Index(
+                        fields=["status", "available_at"], name="outbox_due_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+from store.outbox.enums import OutboxStatusEnums
+
+
+class OutboxMessage(models.Model):
+    """
+    A side effect of a committed change, such as an order, still to be run
+    by one handler. Written in the transaction of the change and deleted
+    once the handler succeeds.
+    """
+
+    id = models.CharField(max_length=36, primary_key=True, default=uuid.uuid4)
+    topic = models.CharField(max_length=100)
+    # Dotted path of the function called with the payload.
+    handler = models.CharField(max_length=255)
+    payload = models.JSONField()
+    status = models.SmallIntegerField(
+        choices=OutboxStatusEnums.choices(),
+        default=OutboxStatusEnums.PENDING.value,
+    )
+    attempts = models.IntegerField(default=0)
+    # When the message may next be claimed: after its backoff, or once the
+    # lease of the worker running it runs out.
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "outbox_messages"
+        managed = True
+        indexes = [
+            # Messages due for delivery, oldest first.
+            models.Index(fields=["status", "available_at"], name="outbox_due_idx"),
+        ]
@@ -0,0 +1,191 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from store.orders.exceptions import InsufficientStockException
+from store.orders.utils.order_holds import release_hold
+from store.orders.utils.order_processing import process_order
+from store.outbox.enums import OutboxStatusEnums
+from store.outbox.models import OutboxMessage
+from store.outbox.utils.outbox import (
+    ORDER_CANCELLED,
+    ORDER_COMPLETED,
+    claim_messages,
+    record_results,
+    drain_outbox,
+    enqueue,
+    requeue_dead_messages,
+)
+from store.products.models import Product
+
+A = "00000000-0000-7000-8000-000000000001"
+
+delivered = []
+
+
+def record(payload):
+    delivered.append(payload)
+
+
+def fail(payload):
+    raise RuntimeError("downstream is down")
+
+
+RECORD = "store.outbox.tests.test_outbox.record"
+FAIL = "store.outbox.tests.test_outbox.fail"
+
+
+@pytest.fixture(autouse=True)
+def handlers(settings):
+    delivered.clear()
+    settings.OUTBOX_HANDLERS = {ORDER_COMPLETED: [RECORD], ORDER_CANCELLED: [RECORD]}
+    settings.OUTBOX_RETRY_BACKOFF = 10
+    settings.OUTBOX_MAX_ATTEMPTS = 2
+    return settings.OUTBOX_HANDLERS
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+@pytest.fixture
+def product(db):
+    return Product.objects.create(id=A, name="A", price=10, stock=5)
+
+
+def messages():
+    return list(OutboxMessage.objects.order_by("created").values("topic", "payload"))
+
+
+@pytest.mark.django_db
+def test_order_writes_message_in_its_transaction(product):
+    order = process_order([{"product_id": A, "quantity": 2}])
+
+    assert messages() == [
+        {"topic": ORDER_COMPLETED, "payload": {"order_id": str(order.id)}}
+    ]
+    with pytest.raises(InsufficientStockException):
+        process_order([{"product_id": A, "quantity": 4}])
+    assert len(messages()) == 1
+
+
+@pytest.mark.django_db
+def test_released_hold_writes_message(product):
+    order = process_order([{"product_id": A, "quantity": 2}], hold_for=60)
+    assert messages() == []
+
+    release_hold(order.id)
+
+    assert messages() == [
+        {"topic": ORDER_CANCELLED, "payload": {"order_id": str(order.id)}}
+    ]
+
+
+@pytest.mark.django_db
+def test_topic_without_handlers_writes_nothing(handlers, django_assert_num_queries):
+    del handlers[ORDER_COMPLETED]
+
+    with django_assert_num_queries(0):
+        enqueue(ORDER_COMPLETED, [{"order_id": "x"}])
+
+
+@pytest.mark.django_db
+def test_drain_delivers_and_deletes(handlers, executor):
+    handlers["other"] = [RECORD, RECORD]
+    enqueue(ORDER_COMPLETED, [{"order_id": "1"}, {"order_id": "2"}])
+    enqueue("other", [{"n": 3}])
+
+    result = drain_outbox(10, executor)
+
+    assert result == {"claimed": 4, "delivered": 4, "retried": 0, "dead": 0}
+    assert sorted(map(str, delivered)) == sorted(
+        map(str, [{"order_id": "1"}, {"order_id": "2"}, {"n": 3}, {"n": 3}])
+    )
+    assert not OutboxMessage.objects.exists()
+
+
+@pytest.mark.django_db
+def test_failed_message_backs_off_then_dead_letters(handlers, executor):
+    handlers[ORDER_COMPLETED] = [FAIL]
+    enqueue(ORDER_COMPLETED, [{"order_id": "1"}])
+
+    before = timezone.now()
+    assert drain_outbox(10, executor)["retried"] == 1
+    message = OutboxMessage.objects.get()
+    assert message.attempts == 1
+    assert message.available_at >= before + timedelta(seconds=10)
+    assert "downstream is down" in message.last_error
+    # Not due again until the backoff has passed.
+    assert drain_outbox(10, executor)["claimed"] == 0
+
+    OutboxMessage.objects.update(available_at=timezone.now())
+    assert drain_outbox(10, executor)["dead"] == 1
+    message.refresh_from_db()
+    assert message.status == OutboxStatusEnums.DEAD.value
+    assert message.attempts == 2
+
+    OutboxMessage.objects.update(available_at=timezone.now())
+    assert drain_outbox(10, executor)["claimed"] == 0
+    assert requeue_dead_messages() == 1
+    OutboxMessage.objects.update(handler=RECORD)
+    assert drain_outbox(10, executor)["delivered"] == 1
+
+
+@pytest.mark.django_db
+def test_unfinished_message_is_delivered_again_after_its_lease(executor):
+    enqueue(ORDER_COMPLETED, [{"order_id": "1"}])
+    # A worker claims the message and dies before recording the result.
+    assert len(claim_messages(10)[0]) == 1
+    assert drain_outbox(10, executor)["claimed"] == 0
+
+    OutboxMessage.objects.update(available_at=timezone.now())
+    assert drain_outbox(10, executor)["delivered"] == 1
+    assert delivered == [{"order_id": "1"}]
+
+
+@pytest.mark.django_db
+def test_message_whose_last_attempt_dies_is_dead_lettered(executor):
+    enqueue(ORDER_COMPLETED, [{"order_id": "1"}])
+    for _ in range(2):
+        # Each worker claims the message and dies.
+        assert len(claim_messages(10)[0]) == 1
+        OutboxMessage.objects.update(available_at=timezone.now())
+
+    assert drain_outbox(10, executor) == {
+        "claimed": 0,
+        "delivered": 0,
+        "retried": 0,
+        "dead": 1,
+    }
+    message = OutboxMessage.objects.get()
+    assert message.status == OutboxStatusEnums.DEAD.value
+    assert message.attempts == 2
+    assert message.last_error
+    assert delivered == []
+
+
+@pytest.mark.django_db
+def test_results_are_recorded_without_loading_messages(django_assert_num_queries):
+    enqueue(ORDER_COMPLETED, [{"order_id": str(n)} for n in range(3)])
+    messages, _ = claim_messages(10)
+
+    # One DELETE and one UPDATE, in a savepoint.
+    with django_assert_num_queries(4):
+        record_results(messages, [None, "Traceback", "Traceback"])
+
+
+@pytest.mark.django_db
+def test_run_outbox_worker_command(handlers):
+    enqueue(ORDER_COMPLETED, [{"order_id": str(n)} for n in range(5)])
+    handlers["failing"] = [FAIL]
+    enqueue("failing", [{"order_id": "x"}])
+    out = StringIO()
+
+    call_command("run_outbox_worker", "--batch-size", "2", "--workers", "2", stdout=out)
+
+    assert out.getvalue() == "Delivered 5 messages, 1 to retry, 0 dead-lettered.\n"
+    assert len(delivered) == 5
@@ -0,0 +1,246 @@
+"""
+Transactional outbox.
+
+Side effects of an order, such as emails or an ERP sync, must not run
+inside checkout: they would add their latency to it, and a change rolled
+back after they ran can't be taken back. Instead, ``enqueue`` writes one
+OutboxMessage per handler in the transaction of the change, so messages
+exist exactly when the change commits. run_outbox_worker then claims due
+messages in batches and runs their handlers on a thread pool.
+
+Delivery is at least once: a message is deleted only after its handler
+returns, and a worker that dies mid-batch leaves its messages to be claimed
+again when their lease runs out. Handlers must therefore be idempotent, and
+messages aren't delivered in any particular order. A failed message is
+retried with exponential backoff, and after OUTBOX_MAX_ATTEMPTS it is
+dead-lettered: kept with its last error until requeue_dead_messages.
+"""
+
+import logging
+import traceback
+from concurrent.futures import Executor
+from datetime import timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from store.db_router import use_primary
+from store.outbox.enums import OutboxStatusEnums
+from store.outbox.models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+ORDER_COMPLETED = "order.completed"
+ORDER_CANCELLED = "order.cancelled"
+
+# last_error of a message whose last attempt never reported back.
+ABANDONED_ERROR = "The worker running the last attempt stopped before it finished."
+
+
+def handlers_for(topic: str) -> List[str]:
+    """Return the dotted paths of the handlers of ``topic``."""
+    return settings.OUTBOX_HANDLERS.get(topic, [])
+
+
+def enqueue(topic: str, payloads: List[Dict]) -> None:
+    """
+    Write one message per payload and handler of ``topic``, with one INSERT.
+
+    Call it inside the transaction of the change the messages are about, so
+    they are committed or rolled back with it. Does nothing when the topic
+    has no handlers.
+
+    Args:
+        topic (str): Key of OUTBOX_HANDLERS, e.g. ORDER_COMPLETED.
+        payloads (list): JSON-serializable dicts, one per message.
+    """
+    handlers = handlers_for(topic)
+    if not handlers or not payloads:
+        return
+    OutboxMessage.objects.bulk_create(
+        [
+            OutboxMessage(topic=topic, handler=handler, payload=payload)
+            for payload in payloads
+            for handler in handlers
+        ]
+    )
+
+
+def enqueue_orders(topic: str, order_ids: List) -> None:
+    """Enqueue ``{"order_id": ...}`` messages of ``topic`` for the orders."""
+    enqueue(topic, [{"order_id": str(order_id)} for order_id in order_ids])
+
+
+@lru_cache(maxsize=None)
+def get_handler(path: str) -> Callable[[Dict], None]:
+    return import_string(path)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before the next attempt of a message that failed ``attempts`` times."""
+    return timedelta(
+        seconds=min(
+            settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1),
+            settings.OUTBOX_RETRY_BACKOFF_MAX,
+        )
+    )
+
+
+@use_primary()
+def claim_messages(batch_size: int) -> Tuple[List[OutboxMessage], int]:
+    """
+    Claim up to ``batch_size`` due messages, oldest first.
+
+    Claimed messages count an attempt and aren't due again until
+    OUTBOX_LEASE_SECONDS from now, so other workers skip them while this
+    one runs their handlers. Messages locked by a concurrent claim are
+    skipped where the database supports SKIP LOCKED. Due messages that
+    already had OUTBOX_MAX_ATTEMPTS, because the worker running their last
+    attempt died, are dead-lettered instead of claimed.
+
+    Returns:
+        tuple: (claimed messages, number of messages dead-lettered)
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = list(
+            OutboxMessage.objects.select_for_update(
+                skip_locked=connection.features.has_select_for_update_skip_locked
+            )
+            .filter(status=OutboxStatusEnums.PENDING.value, available_at__lte=now)
+            .order_by("available_at")
+            # Every field record_results saves, so it doesn't load any.
+            .only("id", "handler", "payload", "attempts", "status", "last_error")[
+                :batch_size
+            ]
+        )
+        messages, abandoned = [], []
+        for message in due:
+            if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                abandoned.append(message)
+            else:
+                messages.append(message)
+
+        if messages:
+            lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            for message in messages:
+                message.attempts += 1
+                message.available_at = lease_until
+                message.modified = now
+            OutboxMessage.objects.bulk_update(
+                messages, ["attempts", "available_at", "modified"]
+            )
+        if abandoned:
+            for message in abandoned:
+                logger.warning(
+                    "Outbox message %s (%s) dead-lettered, its last attempt "
+                    "didn't finish.",
+                    message.id,
+                    message.handler,
+                )
+                message.status = OutboxStatusEnums.DEAD.value
+                message.last_error = message.last_error or ABANDONED_ERROR
+                message.modified = now
+            OutboxMessage.objects.bulk_update(
+                abandoned, ["status", "last_error", "modified"]
+            )
+    return messages, len(abandoned)
+
+
+def deliver(message: OutboxMessage) -> Optional[str]:
+    """
+    Run the handler of ``message``.
+
+    Returns:
+        str: The traceback if the handler raised, else None.
+    """
+    # Worker threads outlive batches, so clean up their connections here.
+    close_old_connections()
+    try:
+        get_handler(message.handler)(message.payload)
+        return None
+    except Exception:
+        return traceback.format_exc()
+    finally:
+        close_old_connections()
+
+
+@use_primary()
+def record_results(messages: List[OutboxMessage], errors: List[Optional[str]]) -> Dict:
+    """
+    Delete delivered messages and schedule the retry of failed ones, or
+    dead-letter them after OUTBOX_MAX_ATTEMPTS.
+
+    Returns:
+        dict: Number of messages delivered, retried and dead-lettered.
+    """
+    now = timezone.now()
+    delivered, failed = [], []
+    result = {"delivered": 0, "retried": 0, "dead": 0}
+    for message, error in zip(messages, errors):
+        if error is None:
+            delivered.append(message.id)
+            result["delivered"] += 1
+            continue
+        logger.warning(
+            "Outbox message %s (%s) failed, attempt %s:\n%s",
+            message.id,
+            message.handler,
+            message.attempts,
+            error,
+        )
+        message.last_error = error
+        message.modified = now
+        if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            message.status = OutboxStatusEnums.DEAD.value
+            result["dead"] += 1
+        else:
+            message.available_at = now + retry_delay(message.attempts)
+            result["retried"] += 1
+        failed.append(message)
+
+    with transaction.atomic():
+        if delivered:
+            OutboxMessage.objects.filter(id__in=delivered).delete()
+        if failed:
+            OutboxMessage.objects.bulk_update(
+                failed, ["status", "available_at", "last_error", "modified"]
+            )
+    return result
+
+
+def drain_outbox(batch_size: int, executor: Executor) -> Dict:
+    """
+    Claim one batch of due messages, run their handlers on ``executor`` and
+    record the results.
+
+    Returns:
+        dict: Number of messages claimed, delivered, retried and
+        dead-lettered.
+    """
+    messages, abandoned = claim_messages(batch_size)
+    if not messages:
+        return {"claimed": 0, "delivered": 0, "retried": 0, "dead": abandoned}
+    errors = list(executor.map(deliver, messages))
+    result = record_results(messages, errors)
+    result["dead"] += abandoned
+    return {"claimed": len(messages), **result}
+
+
+@use_primary()
+def requeue_dead_messages() -> int:
+    """
+    Make dead-lettered messages due again, with a fresh attempt count.
+
+    Returns:
+        int: Number of messages requeued.
+    """
+    return OutboxMessage.objects.filter(status=OutboxStatusEnums.DEAD.value).update(
+        status=OutboxStatusEnums.PENDING.value,
+        attempts=0,
+        available_at=timezone.now(),
+        modified=timezone.now(),
+    )
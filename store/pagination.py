@@ -1,13 +1,298 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+import math
+from datetime import datetime
+from functools import partial
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from store.fields import uuid_string
+
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+
+
+def estimate_count(queryset) -> int:
+    """
+    Return a cheap row count for ``queryset``.
+
+    Unfiltered querysets on MySQL and PostgreSQL use the table statistics
+    kept by the database instead of a full COUNT(*). Everything else falls
+    back to an exact count.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            if connection.vendor == "mysql":
+                cursor.execute(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                    [table],
+                )
+                row = cursor.fetchone()
+                if row and row[0] is not None:
+                    return int(row[0])
+            elif connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [table],
+                )
+                row = cursor.fetchone()
+                if row and row[0] >= 0:
+                    return int(row[0])
+
+    return queryset.count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that sizes pages from estimate_count instead of COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+
+class KnownCountPaginator(Paginator):
+    """Paginator for an object list whose length the caller already knows."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over ``created`` with ``id`` as a tiebreaker.
+
+    Pages are fetched with ``WHERE (created, id) < (cursor)`` instead of an
+    OFFSET, so every page costs the same no matter how deep it is. The
+    cursor is an opaque token; the position of the first or last row of the
+    current page is encoded in the ``next`` and ``previous`` links.
+    """
+
+    cursor_query_param = "cursor"
+    ordering_field = "created"
+
+    def __init__(self, page_size, count_mode=COUNT_NONE, known_count=None):
+        self.page_size = page_size
+        self.count_mode = count_mode
+        self.known_count = known_count
+
+    def encode_cursor(self, created, pk, reverse):
+        payload = {"c": created.isoformat(), "i": str(pk)}
+        if reverse:
+            payload["r"] = 1
+        token = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(token).decode().rstrip("=")
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return (
+                datetime.fromisoformat(payload["c"]),
+                uuid_string(payload["i"]),
+                bool(payload.get("r")),
+            )
+        except (TypeError, ValueError, KeyError):
+            raise NotFound("Invalid cursor")
+
+    def get_descending(self, queryset):
+        ordering = list(queryset.query.order_by)
+        if not ordering:
+            return True
+        if ordering[0] == self.ordering_field:
+            return False
+        if ordering[0] == f"-{self.ordering_field}":
+            return True
+        raise ValidationError(
+            {
+                "ordering": [
+                    f"Cursor pagination only supports ordering by "
+                    f"{self.ordering_field}."
+                ]
+            }
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.descending = self.get_descending(queryset)
+
+        token = request.query_params.get(self.cursor_query_param)
+        position = self.decode_cursor(token) if token else None
+        reverse = bool(position and position[2])
+
+        self.count = None
+        if self.count_mode != COUNT_NONE and self.known_count is not None:
+            self.count = self.known_count
+        elif self.count_mode == COUNT_EXACT:
+            self.count = queryset.count()
+        elif self.count_mode == COUNT_ESTIMATE:
+            self.count = estimate_count(queryset)
+
+        # Walk backwards when following a "previous" link, then flip the
+        # rows back into display order.
+        descending = self.descending != reverse
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.ordering_field}", f"{prefix}id")
+
+        if position:
+            created, pk = position[0], position[1]
+            lookup = "lt" if descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.ordering_field}__{lookup}": created})
+                | Q(**{self.ordering_field: created, f"id__{lookup}": pk})
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else bool(position)
+        self.has_previous = bool(position) if not reverse else has_more
+        self.first = rows[0] if rows else None
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_link(self, row, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, "page")
+        if isinstance(row, dict):
+            # A page of .values() rows.
+            created, pk = row[self.ordering_field], row["id"]
+        else:
+            created, pk = getattr(row, self.ordering_field), row.pk
+        token = self.encode_cursor(created, pk, reverse)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.get_link(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        return self.get_link(self.first, reverse=True)
+
+    def get_paginated_response(self, data):
+        pagination = {
+            "per_page": self.page_size,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        if self.count is not None:
+            pagination["count"] = self.count
+        return Response({"pagination": pagination, "data": data})
 
 
 class CustomPagination(PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset mode.
+
+    Passing ``cursor`` (empty for the first page) switches to
+    KeysetPagination. ``count=estimate`` replaces the exact COUNT(*) with
+    table statistics, and ``count=none`` skips it: the page is fetched by
+    number alone and ``count`` and ``total_pages`` are null. In cursor mode
+    the count is skipped unless ``count=exact`` or ``count=estimate`` is
+    passed. A view that already counted the rows sets ``known_count`` to
+    skip the count query.
+    """
 
     page_size_query_param = "page_size"
     max_page_size = 100
+    cursor_query_param = KeysetPagination.cursor_query_param
+    count_query_param = "count"
+
+    keyset = None
+    known_count = None
+    # (page number, page size) of a page fetched without a count.
+    uncounted_page = None
+
+    def get_count_mode(self, request, default):
+        mode = request.query_params.get(self.count_query_param, default)
+        if mode not in (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE):
+            raise ValidationError(
+                {
+                    self.count_query_param: [
+                        f"Must be one of {COUNT_EXACT}, {COUNT_ESTIMATE}, "
+                        f"{COUNT_NONE}."
+                    ]
+                }
+            )
+        return mode
+
+    def get_request_count_mode(self, request):
+        """Return the count mode of ``request``, with its mode's default."""
+        if self.cursor_query_param in request.query_params:
+            return self.get_count_mode(request, default=COUNT_NONE)
+        return self.get_count_mode(request, default=COUNT_EXACT)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        count_mode = self.get_request_count_mode(request)
+        if self.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination(
+                self.get_page_size(request), count_mode, self.known_count
+            )
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        if count_mode == COUNT_NONE:
+            return self.paginate_uncounted(queryset, request)
+        if self.known_count is not None:
+            self.django_paginator_class = partial(
+                KnownCountPaginator, count=self.known_count
+            )
+        elif count_mode == COUNT_ESTIMATE:
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def paginate_uncounted(self, queryset, request):
+        """Fetch the requested page with an OFFSET and no COUNT(*)."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            number = 0
+        if number < 1:
+            raise NotFound("Invalid page.")
+
+        offset = (number - 1) * page_size
+        rows = list(queryset[offset : offset + page_size])
+        if not rows and number > 1:
+            raise NotFound("Invalid page.")
+        self.uncounted_page = (number, page_size)
+        return rows
 
     def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        if self.uncounted_page is not None:
+            number, page_size = self.uncounted_page
+            return Response(
+                {
+                    "pagination": {
+                        "count": None,
+                        "per_page": page_size,
+                        "total_pages": None,
+                        "current": number,
+                    },
+                    "data": data,
+                }
+            )
+
         return Response(
             {
                 "pagination": {
@@ -19,3 +304,52 @@ class CustomPagination(PageNumberPagination):
                 "data": data,
             }
         )
+
+
+class AsyncPagination:
+    """
+    Page number pagination for async views, built on the async ORM.
+
+    Takes the same page/page_size params and returns the same envelope as
+    CustomPagination.
+    """
+
+    page_query_param = "page"
+    page_size_query_param = CustomPagination.page_size_query_param
+    max_page_size = CustomPagination.max_page_size
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.GET[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return CustomPagination.page_size
+
+    async def paginate_queryset(self, queryset, request):
+        """
+        Return ``(rows, pagination)`` for the requested page, or None if the
+        page number is invalid.
+        """
+        page_size = self.get_page_size(request)
+        count = await queryset.acount()
+        total_pages = max(1, math.ceil(count / page_size))
+
+        page = request.GET.get(self.page_query_param, "1")
+        try:
+            number = total_pages if page == "last" else int(page)
+        except ValueError:
+            return None
+        if not 1 <= number <= total_pages:
+            return None
+
+        offset = (number - 1) * page_size
+        rows = [row async for row in queryset[offset : offset + page_size]]
+        pagination = {
+            "count": count,
+            "per_page": page_size,
+            "total_pages": total_pages,
+            "current": number,
+        }
+        return rows, pagination
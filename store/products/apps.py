@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ProductsConfig(AppConfig):
     name = "store.products"
+
+    def ready(self):
+        from store.products import signals  # noqa: F401
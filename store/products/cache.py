@@ -0,0 +1,96 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from store.products.search import search_terms
+
+GENERATION_KEY = "products:generation"
+
+
+def get_cache():
+    return caches[settings.PRODUCT_LIST_CACHE_ALIAS]
+
+
+def get_catalog_generation() -> int:
+    """Return the current catalog generation, creating it if needed."""
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a generation lost to eviction can't come
+        # back with a value that old cache entries were keyed on.
+        cache.add(GENERATION_KEY, time.time_ns() // 1000, timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_catalog_generation() -> None:
+    """Invalidate every cached product listing."""
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        get_catalog_generation()
+        cache.incr(GENERATION_KEY)
+
+
+class ProductListCache:
+    """
+    Read-through cache for GET /products/ pages, stored as
+    ``(data, etag, last_modified)``.
+
+    Entries are keyed by the normalized query params and the catalog
+    generation, so bumping the generation invalidates every cached page at
+    once; stale entries age out through the backend's TTL and LRU eviction.
+    """
+
+    key_prefix = "products:page"
+
+    def is_enabled(self):
+        return settings.PRODUCT_LIST_CACHE_TIMEOUT > 0
+
+    def make_key(self, request, paginator, generation):
+        params = request.query_params
+        normalized = {
+            "host": request.get_host(),
+            # The name filter is a case-insensitive prefix match.
+            "name": params.get("name", "").lower(),
+            # Searches with the same terms share a page; a query without
+            # any terms matches nothing and is kept apart from no query.
+            "q": " ".join(search_terms(params.get("q", "")))
+            or params.get("q", "").strip(),
+            "ordering": params.get("ordering", ""),
+            "page": params.get(paginator.page_query_param, "1"),
+            "page_size": paginator.get_page_size(request),
+            "cursor": params.get(paginator.cursor_query_param),
+            "count": params.get(paginator.count_query_param, ""),
+        }
+        digest = hashlib.sha1(
+            json.dumps(normalized, sort_keys=True).encode()
+        ).hexdigest()
+        return f"{self.key_prefix}:{generation}:{digest}"
+
+    def lookup(self, request, paginator):
+        """
+        Return ``(key, data)`` for the request; ``data`` is None on a miss.
+
+        The key pins the generation read before the page is computed, so a
+        page built while a write lands is stored under the old generation
+        and never served after it.
+        """
+        if not self.is_enabled():
+            return None, None
+        key = self.make_key(request, paginator, get_catalog_generation())
+        return key, get_cache().get(key)
+
+    def store(self, key, data, timeout=None):
+        """Cache ``data`` for ``timeout`` seconds, by default the list TTL."""
+        if key is None:
+            return
+        if timeout is None:
+            timeout = settings.PRODUCT_LIST_CACHE_TIMEOUT
+        get_cache().set(key, data, timeout)
+
+
+product_list_cache = ProductListCache()
@@ -1,10 +1,21 @@
 from store.products.models import Product
+from store.products.search import search_products
 from django_filters import rest_framework as filters
+from rest_framework.settings import api_settings
 
 
 class ProductFilter(filters.FilterSet):
     name = filters.CharFilter(field_name="name", lookup_expr="istartswith")
+    q = filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Product
-        fields = ["name"]
+        fields = ["name", "q"]
+
+    def filter_search(self, queryset, name, value):
+        """Full-text search, ranked by relevance unless ordering is given."""
+        ordering_given = (
+            self.request is not None
+            and api_settings.ORDERING_PARAM in self.request.query_params
+        )
+        return search_products(queryset, value, order_by_rank=not ordering_given)
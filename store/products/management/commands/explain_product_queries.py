@@ -0,0 +1,84 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Value
+from django.db.models.functions import Upper
+from store.orders.models import Order
+from store.products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the EXPLAIN plan and median latency of the hot product and "
+        "order queries. Run it before and after migrating the indexes to "
+        "compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Insert this many synthetic products before measuring.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of timed runs per query.",
+        )
+
+    def seed(self, count, batch_size):
+        start = Product.objects.count()
+        for offset in range(start, start + count, batch_size):
+            Product.objects.bulk_create(
+                Product(
+                    name=f"Product {i:08d}",
+                    description=f"Synthetic product number {i}",
+                    price=10 + i % 500,
+                    stock=100,
+                )
+                for i in range(offset, min(offset + batch_size, start + count))
+            )
+        self.stdout.write(f"Seeded {count} products ({start + count} total).")
+
+    def get_queries(self):
+        newest = Product.objects.order_by("-created", "-id").first()
+        return {
+            "products: list by -created": lambda: Product.objects.order_by(
+                "-created"
+            )[:10],
+            "products: keyset page after cursor": lambda: Product.objects.filter(
+                created__lte=newest.created
+            ).order_by("-created", "-id")[:10],
+            "products: name istartswith": lambda: Product.objects.filter(
+                name__istartswith="product 0004"
+            )[:10],
+            "products: name uniqueness check": lambda: Product.objects.annotate(
+                name_upper=Upper("name")
+            ).filter(name_upper=Upper(Value("Product 00040000"))),
+            "orders: list by -created": lambda: Order.objects.order_by("-created")[
+                :10
+            ],
+        }
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"], options["batch_size"])
+
+        if not Product.objects.exists():
+            self.stdout.write("No products to query, pass --seed.")
+            return
+
+        for label, build in self.get_queries().items():
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                list(build())
+                timings.append((time.perf_counter() - started) * 1000)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(build().explain())
+            self.stdout.write(f"median {statistics.median(timings):.3f} ms\n")
@@ -0,0 +1,55 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from store.products.utils.product_import import (
+    FORMAT_CSV,
+    FORMAT_JSONL,
+    import_products,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream products from a CSV or JSON Lines file into the catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (with a header row) or JSONL file.")
+        parser.add_argument(
+            "--format",
+            choices=[FORMAT_CSV, FORMAT_JSONL],
+            help="Input format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.PRODUCT_IMPORT_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=100,
+            help="Maximum number of row errors to print.",
+        )
+
+    def handle(self, *args, **options):
+        input_format = options["format"]
+        if not input_format:
+            extension = os.path.splitext(options["path"])[1].lstrip(".").lower()
+            input_format = FORMAT_CSV if extension == FORMAT_CSV else FORMAT_JSONL
+
+        try:
+            stream = open(options["path"], "rb")
+        except OSError as e:
+            raise CommandError(str(e))
+
+        with stream:
+            result = import_products(
+                read_rows(stream, input_format), batch_size=options["batch_size"]
+            )
+
+        for error in result["errors"][: options["max_errors"]]:
+            self.stderr.write(json.dumps(error))
+        self.stdout.write(
+            f"Created {result['created']} products, "
+            f"{len(result['errors'])} rows rejected."
+        )
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:52
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_auto_20250317_1206"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["name"], name="products_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                django.db.models.functions.text.Upper("name"),
+                name="products_name_upper_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["created", "id"], name="products_created_id_idx"
+            ),
+        ),
+    ]
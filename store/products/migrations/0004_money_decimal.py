@@ -0,0 +1,22 @@
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0003_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="product",
+            name="price",
+            field=models.DecimalField(
+                decimal_places=2,
+                max_digits=12,
+                validators=[django.core.validators.MinValueValidator(Decimal("1"))],
+            ),
+        ),
+    ]
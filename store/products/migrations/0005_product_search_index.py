@@ -0,0 +1,51 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import store.products.models
+from store.products.search import create_search_index, drop_search_index
+
+
+def forwards(apps, schema_editor):
+    create_search_index(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    drop_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0004_money_decimal"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSearchDocument",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        db_column="product_id",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("description", models.TextField()),
+                (
+                    "document",
+                    store.products.models.SearchDocumentField(db_column="products_fts"),
+                ),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "products_fts",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
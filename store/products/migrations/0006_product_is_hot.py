@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from store.products.search import create_sqlite_search_triggers
+
+
+def recreate_search_triggers(apps, schema_editor):
+    create_sqlite_search_triggers(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0005_product_search_index"),
+    ]
+
+    operations = [
+        # Reversing the AddField rebuilds the table again.
+        migrations.RunPython(migrations.RunPython.noop, recreate_search_triggers),
+        migrations.AddField(
+            model_name="product",
+            name="is_hot",
+            field=models.BooleanField(default=False),
+        ),
+        # SQLite adds the column by rebuilding the table, which drops them.
+        migrations.RunPython(recreate_search_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+import store.fields
+from django.db import migrations
+from store.fields import convert_uuid_columns
+from store.products.search import (
+    create_sqlite_search_index,
+    drop_sqlite_search_index,
+)
+
+# products.id and the columns referring to it.
+COLUMNS = [
+    ("products", "id"),
+    ("order_items", "product_id"),
+    ("daily_product_sales", "product_id"),
+]
+
+# SQLite alters products.id by rebuilding every table that refers to it,
+# including products_fts through ProductSearchDocument, which would copy the
+# FTS5 table into a plain one. An empty plain table stands in for it
+# meanwhile, and the index is rebuilt from products afterwards.
+PLACEHOLDER_SQL = (
+    "CREATE TABLE products_fts (product_id, name, description, products_fts, rank)"
+)
+
+
+def drop_search_index(schema_editor):
+    drop_sqlite_search_index(schema_editor)
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(PLACEHOLDER_SQL)
+
+
+def create_search_index(schema_editor):
+    drop_sqlite_search_index(schema_editor)
+    create_sqlite_search_index(schema_editor)
+
+
+def convert_to_binary(apps, schema_editor):
+    drop_search_index(schema_editor)
+    convert_uuid_columns(schema_editor, COLUMNS)
+
+
+def convert_to_string(apps, schema_editor):
+    drop_search_index(schema_editor)
+    convert_uuid_columns(schema_editor, COLUMNS, to_binary=False)
+
+
+def rebuild_search_index(apps, schema_editor):
+    create_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_product_modified_idx"),
+        ("orders", "0008_order_holds"),
+        ("analytics", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_to_binary, rebuild_search_index),
+        migrations.AlterField(
+            model_name="product",
+            name="id",
+            field=store.fields.CompactUUIDField(
+                default=store.fields.uuid7, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.RunPython(rebuild_search_index, convert_to_string),
+    ]
@@ -0,0 +1,36 @@
+import store.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0009_product_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductDeletion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("product_id", store.fields.CompactUUIDField()),
+                ("modified", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "product_deletions",
+                "indexes": [
+                    models.Index(
+                        fields=["modified"], name="product_deletions_modified_idx"
+                    )
+                ],
+            },
+        ),
+    ]
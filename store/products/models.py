@@ -1,18 +1,114 @@
+from decimal import Decimal
 from django.db import models
-import uuid
+from django.db.models import F
+from django.db.models import Lookup
+from django.db.models.functions import Upper
 from django.core.validators import MinValueValidator
+from store.fields import CompactUUIDField, uuid7
 
 
 class Product(models.Model):
-    id = models.CharField(max_length=36, primary_key=True, default=uuid.uuid4)
+    id = CompactUUIDField(primary_key=True, default=uuid7)
     name = models.CharField(max_length=100)
     description = models.TextField()
-    price = models.FloatField(validators=[MinValueValidator(1)])  # Ensure price >= 0
+    price = models.DecimalField(
+        max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal("1"))]
+    )  # Ensure price >= 0
     stock = models.IntegerField(validators=[MinValueValidator(1)])  # Ensure stock >= 0
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
+    # Reserve stock in the hot stock counter store instead of on this row.
+    # See store.orders.utils.hot_stock.
+    is_hot = models.BooleanField(default=False)
+    # Bumped on every save. Checkout quotes from cached snapshots and only
+    # decrements stock while the version is still the one it quoted; see
+    # store.products.snapshots.
+    version = models.PositiveIntegerField(default=1)
     objects = models.Manager()
 
     class Meta:
         db_table = "products"
         managed = True
+        indexes = [
+            # Name prefix filter (case-insensitive collation on MySQL).
+            models.Index(fields=["name"], name="products_name_idx"),
+            # Case-insensitive name uniqueness check on every backend.
+            models.Index(Upper("name"), name="products_name_upper_idx"),
+            # Default ordering and keyset pagination.
+            models.Index(fields=["created", "id"], name="products_created_id_idx"),
+            # Latest change to the catalog, for the order list validators.
+            models.Index(fields=["modified"], name="products_modified_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            # Incremented in the UPDATE, so concurrent saves can't share one.
+            self.version = F("version") + 1
+        super().save(*args, **kwargs)
+        if not isinstance(self.version, int):
+            self.refresh_from_db(fields=["version"])
+
+
+class ProductDeletion(models.Model):
+    """
+    A deleted product. Deletes don't change MAX(products.modified), so the
+    product list validators also include the latest deletion; see
+    store.products.signals.
+    """
+
+    product_id = CompactUUIDField()
+    # When the product was deleted, named like Product.modified so listings
+    # can name this model in ConditionalListMixin.related_models.
+    modified = models.DateTimeField(auto_now_add=True)
+    objects = models.Manager()
+
+    class Meta:
+        db_table = "product_deletions"
+        indexes = [
+            models.Index(fields=["modified"], name="product_deletions_modified_idx"),
+        ]
+
+
+class SearchDocumentField(models.TextField):
+    """
+    The hidden FTS5 column named after its table. Matching against it
+    searches every indexed column.
+    """
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class ProductSearchDocument(models.Model):
+    """
+    Row of the SQLite FTS5 index over product names and descriptions.
+
+    The products_fts table is created by a migration and kept in sync by
+    triggers on the products table; on MySQL a FULLTEXT index on products is
+    used instead and this model is never queried. See store.products.search.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_column="product_id",
+        db_constraint=False,
+        related_name="search_document",
+    )
+    name = models.TextField()
+    description = models.TextField()
+    document = SearchDocumentField(db_column="products_fts")
+    # bm25 score of the current MATCH; lower is more relevant.
+    rank = models.FloatField()
+
+    class Meta:
+        db_table = "products_fts"
+        managed = False
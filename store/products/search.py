@@ -0,0 +1,222 @@
+"""
+Full-text product search over name and description.
+
+SQLite uses an FTS5 table (products_fts) kept in sync by triggers on the
+products table; MySQL uses a FULLTEXT index on the products table itself.
+Other backends fall back to unranked substring matching.
+"""
+
+import re
+from typing import List
+
+from django.db import connections
+from django.db.models import FloatField, Func, Q
+
+# Terms beyond this are ignored, which bounds the cost of a query.
+MAX_SEARCH_TERMS = 8
+
+_TERM_RE = re.compile(r"\w+")
+
+SQLITE_INDEX_SQL = [
+    # product_id holds the products key as is, for joins. product_key is its
+    # hex form, indexed so the triggers can find a product's row with a
+    # MATCH instead of scanning the index; searches only match the name and
+    # description columns.
+    """
+    CREATE VIRTUAL TABLE products_fts USING fts5(
+        product_id UNINDEXED, product_key, name, description,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    # Rank name matches above description matches.
+    "INSERT INTO products_fts(products_fts, rank) "
+    "VALUES ('rank', 'bm25(0.0, 0.0, 10.0, 1.0)')",
+    """
+    INSERT INTO products_fts(product_id, product_key, name, description)
+    SELECT id, hex(id), name, description FROM products
+    """,
+]
+
+# Django rebuilds a SQLite table to alter it, which drops its triggers, so
+# migrations that alter products on SQLite must recreate them.
+SQLITE_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products
+    BEGIN
+        INSERT INTO products_fts(product_id, product_key, name, description)
+        VALUES (new.id, hex(new.id), new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products
+    BEGIN
+        DELETE FROM products_fts
+        WHERE products_fts MATCH 'product_key:"' || hex(old.id) || '"';
+    END
+    """,
+    # Stock updates on every order must not touch the index.
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_update
+    AFTER UPDATE OF name, description ON products
+    WHEN old.name IS NOT new.name OR old.description IS NOT new.description
+    BEGIN
+        DELETE FROM products_fts
+        WHERE products_fts MATCH 'product_key:"' || hex(old.id) || '"';
+        INSERT INTO products_fts(product_id, product_key, name, description)
+        VALUES (new.id, hex(new.id), new.name, new.description);
+    END
+    """,
+]
+
+SQLITE_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS products_fts_update",
+    "DROP TRIGGER IF EXISTS products_fts_delete",
+    "DROP TRIGGER IF EXISTS products_fts_insert",
+    "DROP TABLE IF EXISTS products_fts",
+]
+
+MYSQL_INDEX_SQL = [
+    "ALTER TABLE products ADD FULLTEXT INDEX products_search_ft (name, description)",
+]
+
+MYSQL_DROP_SQL = [
+    "ALTER TABLE products DROP INDEX products_search_ft",
+]
+
+
+def create_search_index(schema_editor):
+    """Create and fill the search index for the connection's backend."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        statements = SQLITE_INDEX_SQL + SQLITE_TRIGGERS_SQL
+    elif vendor == "mysql":
+        statements = MYSQL_INDEX_SQL
+    else:
+        statements = []
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        statements = SQLITE_DROP_SQL
+    elif vendor == "mysql":
+        statements = MYSQL_DROP_SQL
+    else:
+        statements = []
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_sqlite_search_index(schema_editor):
+    """Create and fill the FTS5 index, on SQLite only."""
+    if schema_editor.connection.vendor == "sqlite":
+        create_search_index(schema_editor)
+
+
+def drop_sqlite_search_index(schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        drop_search_index(schema_editor)
+
+
+def create_sqlite_search_triggers(schema_editor):
+    """Recreate the FTS5 sync triggers after products was rebuilt."""
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SQLITE_TRIGGERS_SQL:
+            schema_editor.execute(statement)
+
+
+def search_terms(q: str) -> List[str]:
+    """
+    Split a query into lowercase word terms, without duplicates.
+
+    Only word characters are kept, so the terms can be quoted into FTS5 and
+    MySQL boolean-mode syntax without escaping.
+    """
+    terms = []
+    for term in _TERM_RE.findall(q.lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def fts5_query(terms: List[str]) -> str:
+    """Every term as a prefix, all required, in name or description."""
+    return "{name description}: " + " ".join(f'"{term}"*' for term in terms)
+
+
+def boolean_mode_query(terms: List[str]) -> str:
+    return " ".join(f"+{term}*" for term in terms)
+
+
+class MatchAgainst(Func):
+    """MySQL ``MATCH (columns) AGAINST (query IN BOOLEAN MODE)`` relevance."""
+
+    output_field = FloatField()
+
+    def __init__(self, *expressions, query):
+        super().__init__(*expressions)
+        self.query = query
+
+    def as_sql(self, compiler, connection, **extra_context):
+        columns, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            columns.append(sql)
+            params.extend(expression_params)
+        return (
+            f"MATCH ({', '.join(columns)}) AGAINST (%s IN BOOLEAN MODE)",
+            params + [self.query],
+        )
+
+
+def search_products(queryset, q: str, order_by_rank: bool = True):
+    """
+    Filter products to those whose name or description contains every word
+    of ``q`` (as a word prefix).
+
+    Args:
+        queryset (QuerySet): Products to search.
+        q (str): The user's query.
+        order_by_rank (bool): Order by relevance, best first. Otherwise the
+        queryset's ordering is kept.
+
+    Returns:
+        QuerySet: The matching products. Empty if ``q`` has no words.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return queryset.none()
+
+    # Migration 0005 creates the index for the backend, so the vendor alone
+    # decides how to search. Looking the index up would query the database,
+    # which async views can't do while filtering.
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        queryset = queryset.filter(
+            search_document__document__match=fts5_query(terms)
+        )
+        if order_by_rank:
+            # No tiebreaker: ordering by rank alone lets FTS5 sort the
+            # matches itself, which is several times faster on broad queries.
+            # Ties come back in index order, so pages stay stable.
+            queryset = queryset.order_by("search_document__rank")
+        return queryset
+
+    if vendor == "mysql":
+        relevance = MatchAgainst(
+            "name", "description", query=boolean_mode_query(terms)
+        )
+        queryset = queryset.annotate(search_rank=relevance).filter(search_rank__gt=0)
+        if order_by_rank:
+            # Ordering by relevance alone lets MySQL read the top matches
+            # from the FULLTEXT index.
+            queryset = queryset.order_by("-search_rank")
+        return queryset
+
+    for term in terms:
+        queryset = queryset.filter(
+            Q(name__icontains=term) | Q(description__icontains=term)
+        )
+    return queryset
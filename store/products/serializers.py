@@ -1,11 +1,19 @@
+from django.db.models import Value
+from django.db.models.functions import Upper
 from rest_framework import serializers
+from store.db_router import use_primary
+from store.instrumentation import TimedSerializerMixin
 from store.products.models import Product
+from store.serializers import ValuesSerializerMixin
 
 
-class ProductsSerializer(serializers.ModelSerializer):
+class ProductsSerializer(
+    TimedSerializerMixin, ValuesSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Product
-        fields = "__all__"
+        # is_hot is an operational flag, set with mark_hot_products.
+        exclude = ["is_hot"]
         read_only_fields = ["id", "created"]  # Make these fields read-only
 
     def validate_name(self, value):
@@ -16,8 +24,28 @@ class ProductsSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Product name cannot be entirely numeric."
             )
-        if Product.objects.filter(name__iexact=value).exists():
+        if self.name_exists(value):
             raise serializers.ValidationError(
                 "A product with this name already exists."
             )
         return value
+
+    @use_primary()
+    def name_exists(self, value):
+        """Case-insensitive check for an existing product with this name."""
+        # Compare UPPER(name) so the lookup uses products_name_upper_idx.
+        return (
+            Product.objects.annotate(name_upper=Upper("name"))
+            .filter(name_upper=Upper(Value(value)))
+            .exists()
+        )
+
+
+class ProductImportSerializer(ProductsSerializer):
+    """
+    Validates a single imported row without touching the database. Name
+    uniqueness is checked for a whole batch at once by import_products.
+    """
+
+    def name_exists(self, value):
+        return False
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from store.products.cache import bump_catalog_generation
+from store.products.models import Product, ProductDeletion
+from store.products.snapshots import product_snapshots
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_listings(sender, **kwargs):
+    # After the commit, so a listing read meanwhile can't be cached with
+    # the old rows under the new generation.
+    transaction.on_commit(bump_catalog_generation)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def evict_product_snapshot(sender, instance, **kwargs):
+    # Other workers find out from the version when they next check out.
+    product_snapshots.evict([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def record_product_deletion(sender, instance, **kwargs):
+    # In the deleting transaction, so the product list validators change
+    # exactly when the delete commits, in every process.
+    ProductDeletion.objects.create(product_id=instance.pk)
@@ -0,0 +1,94 @@
+"""
+Per-worker snapshots of the product fields checkout reads.
+
+Validating and pricing a cart only needs each product's name, price and
+hot flag, and most orders are for the same few hundred products. Each
+worker keeps those fields, with the product's version, in a bounded LRU,
+so a cart of cached products is quoted without a query.
+
+Product.version is bumped on every save, and reserve_stock only
+decrements a product whose version is still the one the order was priced
+from. The decrement locks the row, so an order for a normal product is
+always priced from the version it commits against. process_order evicts
+the products that changed and quotes again from the database. Saves made
+by this worker also evict their product right away (see
+store.products.signals).
+
+Hot products are the exception. Their rows aren't decremented at
+checkout, so their versions are checked with a plain read in the order's
+transaction. Locking them would bring back the row lock queue that hot
+stock exists to avoid. A price change that commits between that read and
+the order's commit can still leave the order priced from the previous
+version. This is the same window a checkout had before snapshots, when
+prices were read before its transaction.
+"""
+
+import threading
+from typing import Dict, Iterable
+
+from django.conf import settings
+from store.lru import LRUCache
+from store.products.models import Product
+
+SNAPSHOT_FIELDS = ("id", "name", "price", "version", "is_hot")
+
+
+class ProductSnapshotCache:
+    """
+    Bounded in-process cache of product snapshots, with hit and miss
+    counters.
+    """
+
+    def __init__(self, maxsize: int):
+        self._snapshots = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, product_ids: Iterable[str]) -> Dict[str, Product]:
+        """
+        Return product_id -> Product for the ids that exist, reading the
+        ones not cached with one query.
+
+        The products only have the snapshot fields; their stock is None.
+        """
+        products, missing = {}, []
+        for product_id in product_ids:
+            values = self._snapshots.get(product_id)
+            if values is None:
+                missing.append(product_id)
+            else:
+                products[product_id] = Product(**dict(zip(SNAPSHOT_FIELDS, values)))
+
+        with self._lock:
+            self.hits += len(products)
+            self.misses += len(missing)
+
+        if missing:
+            rows = Product.objects.filter(id__in=missing).values_list(*SNAPSHOT_FIELDS)
+            for values in rows:
+                self._snapshots.set(values[0], values)
+                products[values[0]] = Product(**dict(zip(SNAPSHOT_FIELDS, values)))
+        return products
+
+    def evict(self, product_ids: Iterable[str]) -> None:
+        for product_id in product_ids:
+            self._snapshots.delete(str(product_id))
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit and miss counts and the number of snapshots kept."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._snapshots),
+            }
+
+    def clear(self):
+        self._snapshots.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+product_snapshots = ProductSnapshotCache(settings.PRODUCT_SNAPSHOT_CACHE_SIZE)
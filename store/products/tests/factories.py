@@ -1,8 +1,11 @@
+import factory
 from store.products.models import Product
 from factory.django import DjangoModelFactory
 
 
 class ProductsFactory(DjangoModelFactory):
+    name = factory.Sequence(lambda n: f"Product {n}")
+    description = factory.Sequence(lambda n: f"Description of product {n}")
     stock = 10
     price = 100
 
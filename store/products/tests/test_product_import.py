@@ -0,0 +1,142 @@
+import io
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from store.products.models import Product
+from store.products.tests.factories import ProductsFactory
+from store.products.utils.product_import import (
+    FORMAT_CSV,
+    FORMAT_JSONL,
+    import_products,
+    read_rows,
+)
+
+
+def product_row(name, **overrides):
+    row = {"name": name, "description": f"{name} description", "price": 10, "stock": 5}
+    row.update(overrides)
+    return row
+
+
+@pytest.mark.django_db
+def test_import_products_in_batches():
+    """Should insert every valid row across several batches."""
+    rows = [product_row(f"Product {i}") for i in range(7)]
+
+    result = import_products(rows, batch_size=3)
+
+    assert result == {"created": 7, "errors": []}
+    assert Product.objects.count() == 7
+
+
+@pytest.mark.django_db
+def test_import_products_reports_row_errors():
+    """Should skip invalid and duplicate rows and report them by row number."""
+    ProductsFactory(name="Existing")
+    rows = [
+        product_row("Keyboard"),
+        product_row("existing"),  # Already in the catalog
+        product_row("KEYBOARD"),  # Duplicate within the input
+        product_row("Mouse", price=-1),
+        product_row("12345"),
+    ]
+
+    result = import_products(rows, batch_size=2)
+
+    assert result["created"] == 1
+    assert [error["row"] for error in result["errors"]] == [2, 3, 4, 5]
+    assert result["errors"][0]["errors"]["name"] == [
+        "A product with this name already exists."
+    ]
+    assert "price" in result["errors"][2]["errors"]
+
+
+@pytest.mark.django_db
+def test_import_products_query_count(django_assert_num_queries):
+    """Should cost a fixed number of queries per batch, not per row."""
+    rows = [product_row(f"Product {i}") for i in range(50)]
+
+    # Name check and bulk insert (plus savepoint) for each of the 2 batches.
+    with django_assert_num_queries(8):
+        import_products(rows, batch_size=25)
+
+
+def test_read_rows_csv_and_jsonl():
+    """Should decode CSV with a header row and JSON Lines."""
+    csv_stream = io.BytesIO(b'name,description,price,stock\nMug,"Big, blue",4,10\n')
+    jsonl_stream = io.BytesIO(b'{"name": "Mug"}\n\nnot json\n')
+
+    assert list(read_rows(csv_stream, FORMAT_CSV)) == [
+        {"name": "Mug", "description": "Big, blue", "price": "4", "stock": "10"}
+    ]
+    rows = list(read_rows(jsonl_stream, FORMAT_JSONL))
+    assert rows[0] == {"name": "Mug"}
+    assert rows[1].message == "Invalid JSON."
+
+
+def test_read_rows_reports_invalid_utf8():
+    """Should report rows that aren't UTF-8 and keep reading after them."""
+    csv_stream = io.BytesIO(b"name,price\nMug,4\n\xff\xfe,5\nCup,6\n")
+    jsonl_stream = io.BytesIO(b'{"name": "\xff\xfe"}\n{"name": "Cup"}\n')
+
+    rows = list(read_rows(csv_stream, FORMAT_CSV))
+    assert rows[0] == {"name": "Mug", "price": "4"}
+    assert rows[1].message == "Invalid UTF-8."
+    assert rows[2] == {"name": "Cup", "price": "6"}
+    rows = list(read_rows(jsonl_stream, FORMAT_JSONL))
+    assert rows[0].message == "Invalid UTF-8."
+    assert rows[1] == {"name": "Cup"}
+
+
+@pytest.mark.django_db
+def test_import_products_command(tmp_path):
+    """Should import a JSON Lines file from the command line."""
+    path = tmp_path / "products.jsonl"
+    path.write_text('{"name": "Lamp", "description": "Desk lamp", "price": 25, "stock": 3}\n')
+    out = io.StringIO()
+
+    call_command("import_products", str(path), stdout=out)
+
+    assert "Created 1 products, 0 rows rejected." in out.getvalue()
+    assert Product.objects.filter(name="Lamp").exists()
+
+
+@pytest.mark.django_db
+def test_import_products_endpoint():
+    """Should accept JSON and CSV bodies and report rejected rows."""
+    client = APIClient()
+    url = reverse("products:import")
+
+    response = client.post(
+        url, [product_row("Chair"), product_row("Chair")], format="json"
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["data"]["created"] == 1
+    assert response.json()["data"]["errors"][0]["row"] == 2
+
+    response = client.post(
+        url,
+        b"name,description,price,stock\nTable,Oak table,120,2\n",
+        content_type="text/csv",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert Product.objects.filter(name="Table").exists()
+
+    response = client.post(
+        url,
+        b"name,description,price,stock\nDesk,\xff\xfe,80,1\nShelf,Pine,40,2\n",
+        content_type="text/csv",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["data"]["errors"] == [
+        {"row": 1, "errors": {"non_field_errors": ["Invalid UTF-8."]}}
+    ]
+    assert Product.objects.filter(name="Shelf").exists()
+
+    response = client.post(url, [product_row("Chair")], format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.post(url, {"name": "Chair"}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
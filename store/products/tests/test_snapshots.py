@@ -0,0 +1,99 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from django.db.models import F
+from store.orders.exceptions import ProductChangedException
+from store.orders.models import Order
+from store.orders.utils.order_processing import process_order
+from store.products.models import Product
+from store.products.snapshots import ProductSnapshotCache, product_snapshots
+
+# Product ids.
+A = "00000000-0000-7000-8000-000000000001"
+B = "00000000-0000-7000-8000-000000000002"
+MISSING = "00000000-0000-7000-8000-000000000999"
+
+
+@pytest.fixture
+def products(db):
+    return [
+        Product.objects.create(id=A, name="A", price=10, stock=5),
+        Product.objects.create(id=B, name="B", price=20, stock=5, is_hot=True),
+    ]
+
+
+def change_elsewhere(product_id, **fields):
+    """Update a product the way another worker would, without our signals."""
+    Product.objects.filter(id=product_id).update(version=F("version") + 1, **fields)
+
+
+@pytest.mark.django_db
+def test_cached_snapshots_need_no_query(products, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert set(product_snapshots.get_many([A, B, MISSING])) == {A, B}
+    with django_assert_num_queries(0):
+        snapshots = product_snapshots.get_many([A, B])
+
+    assert snapshots[A].price == Decimal("10")
+    assert snapshots[B].is_hot
+    assert snapshots[A].stock is None
+    assert product_snapshots.stats() == {"hits": 2, "misses": 3, "size": 2}
+
+
+@pytest.mark.django_db
+def test_least_recently_used_snapshot_is_evicted(products):
+    snapshots = ProductSnapshotCache(maxsize=1)
+    snapshots.get_many([A])
+    snapshots.get_many([B])
+    snapshots.get_many([A])
+
+    assert snapshots.stats() == {"hits": 0, "misses": 3, "size": 1}
+
+
+@pytest.mark.django_db
+def test_save_bumps_version_and_evicts(products):
+    product_snapshots.get_many([A])
+    product = products[0]
+    product.price = 12
+    product.save()
+
+    assert product.version == 2
+    assert product_snapshots.get_many([A])[A].price == Decimal("12")
+    assert product_snapshots.stats()["hits"] == 0
+
+
+@pytest.mark.django_db
+def test_order_is_priced_again_when_a_snapshot_is_stale(products):
+    product_snapshots.get_many([A])
+    change_elsewhere(A, price=15)
+
+    order = process_order([{"product_id": A, "quantity": 2}])
+
+    assert order.total_price == 30
+    assert Product.objects.get(id=A).stock == 3
+    assert product_snapshots.get_many([A])[A].version == 2
+
+
+@pytest.mark.django_db
+def test_stale_hot_snapshot_is_priced_again(settings, products):
+    settings.HOT_STOCK_BACKEND = "local"
+    product_snapshots.get_many([B])
+    change_elsewhere(B, price=25)
+
+    order = process_order([{"product_id": B, "quantity": 1}])
+
+    assert order.total_price == 25
+
+
+@pytest.mark.django_db
+def test_products_that_keep_changing_fail_the_order(products):
+    product_snapshots.get_many([A])
+    change_elsewhere(A, price=15)
+
+    with patch.object(product_snapshots, "evict"):
+        with pytest.raises(ProductChangedException) as excinfo:
+            process_order([{"product_id": A, "quantity": 1}])
+
+    assert excinfo.value.errors == {"product_id": [A]}
+    assert not Order.objects.exists()
+    assert Product.objects.get(id=A).stock == 5
@@ -1,4 +1,12 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from store.orders.utils.order_processing import process_order
 from store.products.models import Product
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -82,6 +90,134 @@ class TestProductListCreateAPIView(APITestCase):
         assert response.json()["data"][0]["name"] == "mobile"
         assert response.json()["data"][1]["name"] == "earphone"
 
+    def test_get_products_with_cursor(self):
+        """Test walking the catalog with cursor pagination."""
+        ProductsFactory.create_batch(5)
+        expected = [
+            product["id"]
+            for product in self.client.get(self.url).json()["data"]
+        ]
+
+        seen = []
+        response = self.client.get(self.url, {"cursor": "", "page_size": 2})
+        pages = [response.json()]
+        while pages[-1]["pagination"]["next"]:
+            pages.append(self.client.get(pages[-1]["pagination"]["next"]).json())
+        for page in pages:
+            assert "count" not in page["pagination"]
+            seen.extend(product["id"] for product in page["data"])
+
+        assert seen == expected
+        assert pages[0]["pagination"]["previous"] is None
+
+        previous = self.client.get(pages[-1]["pagination"]["previous"]).json()
+        assert previous["data"] == pages[-2]["data"]
+
+    def test_get_products_with_cursor_ascending_and_count(self):
+        """Test cursor pagination honours ascending order and count=exact."""
+        ProductsFactory.create_batch(3)
+
+        response = self.client.get(
+            self.url,
+            {"cursor": "", "ordering": "created", "page_size": 2, "count": "exact"},
+        )
+        next_page = self.client.get(response.json()["pagination"]["next"])
+
+        assert response.json()["pagination"]["count"] == 3
+        ids = [p["id"] for p in response.json()["data"] + next_page.json()["data"]]
+        assert ids == [
+            str(pk) for pk in Product.objects.order_by("created", "id").values_list(
+                "id", flat=True
+            )
+        ]
+
+    def test_get_products_with_cursor_invalid(self):
+        """Test unsupported orderings and malformed cursors are rejected."""
+        response = self.client.get(self.url, {"cursor": "", "ordering": "name"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_products_with_estimated_count(self):
+        """Test page number pagination with an estimated count."""
+        ProductsFactory.create_batch(3)
+
+        response = self.client.get(self.url, {"count": "estimate"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["pagination"]["count"] == 3
+
+    @override_settings(PRODUCT_LIST_CACHE_TIMEOUT=0)
+    def test_get_products_without_count(self):
+        """Test count=none pages by number without running COUNT(*)."""
+        ProductsFactory.create_batch(3)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"count": "none", "page_size": 2})
+        assert not any("COUNT(" in query["sql"] for query in queries)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["pagination"] == {
+            "count": None,
+            "per_page": 2,
+            "total_pages": None,
+            "current": 1,
+        }
+        assert len(response.json()["data"]) == 2
+
+        response = self.client.get(
+            self.url, {"count": "none", "page_size": 2, "page": 2}
+        )
+        assert len(response.json()["data"]) == 1
+        response = self.client.get(
+            self.url, {"count": "none", "page_size": 2, "page": 3}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_products_served_from_cache(self):
+        """Test repeated listings are served from the cache."""
+        ProductsFactory.create_batch(2)
+        first = self.client.get(self.url, {"name": "", "ordering": "-created"})
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {"ordering": "-created"})
+
+        assert second.json() == first.json()
+
+    def test_get_products_cache_invalidated_on_create(self):
+        """Test creating a product invalidates cached listings."""
+        self.client.get(self.url)
+        data = {
+            "name": "keyboard",
+            "description": "Mechanical keyboard",
+            "price": 75.5,
+            "stock": 20,
+        }
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(self.url, data, format="json")
+            # Nothing is invalidated before the product is committed.
+            assert self.client.get(self.url).json()["pagination"]["count"] == 0
+        assert callbacks
+
+        response = self.client.get(self.url)
+
+        assert response.json()["pagination"]["count"] == 1
+
+    def test_get_products_cache_invalidated_on_order(self):
+        """Test placing an order refreshes the cached stock."""
+        product = ProductsFactory.create(stock=10)
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("order:list-create"),
+                {"products": [{"product_id": str(product.id), "quantity": 3}]},
+                format="json",
+            )
+
+        response = self.client.get(self.url)
+        assert response.json()["data"][0]["stock"] == 7
+
     def test_create_product_success(self):
         """Test successfully creating a new product."""
         data = {
@@ -211,3 +347,253 @@ class TestProductListCreateAPIView(APITestCase):
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "name" in response.data["errors"]
+
+
+class TestProductSearch(APITestCase):
+    def setUp(self):
+        self.url = reverse("products:list-create")
+        self.keyboard = ProductsFactory(
+            name="Mechanical Keyboard", description="Clicky switches."
+        )
+        self.mouse = ProductsFactory(
+            name="Wireless Mouse", description="Pairs with any keyboard."
+        )
+        self.lamp = ProductsFactory(name="Desk Lamp", description="Warm light.")
+
+    def search(self, q, **params):
+        response = self.client.get(self.url, {"q": q, **params})
+        assert response.status_code == status.HTTP_200_OK
+        return [product["name"] for product in response.json()["data"]]
+
+    def test_search_matches_words_in_name_and_description(self):
+        """Test words in the middle of a name and in descriptions match."""
+        assert self.search("mouse") == ["Wireless Mouse"]
+        assert self.search("warm") == ["Desk Lamp"]
+
+    def test_search_ranks_name_matches_first(self):
+        assert self.search("keyboard") == ["Mechanical Keyboard", "Wireless Mouse"]
+
+    def test_search_matches_word_prefixes_and_requires_every_word(self):
+        assert self.search("KEYB") == ["Mechanical Keyboard", "Wireless Mouse"]
+        assert self.search("keyboard wireless") == ["Wireless Mouse"]
+        assert self.search("keyboard lamp") == []
+
+    def test_search_with_ordering(self):
+        """Test an explicit ordering replaces relevance."""
+        assert self.search("keyboard", ordering="-name") == [
+            "Wireless Mouse",
+            "Mechanical Keyboard",
+        ]
+
+    def test_search_paginates(self):
+        response = self.client.get(
+            self.url, {"q": "keyboard", "page_size": 1, "page": 2}
+        )
+
+        assert response.json()["pagination"]["count"] == 2
+        assert [product["name"] for product in response.json()["data"]] == [
+            "Wireless Mouse"
+        ]
+
+    def test_search_query_syntax_is_not_interpreted(self):
+        """Test FTS operators and quotes in q are treated as plain words."""
+        assert self.search('mouse" OR lamp*') == []
+        assert self.search('"wireless" -mouse') == ["Wireless Mouse"]
+        assert self.search("*!?") == []
+
+    def test_search_index_follows_writes(self):
+        """Test renamed, deleted and bulk-created products are reindexed."""
+        self.lamp.name = "Floor Lantern"
+        self.lamp.save()
+        self.mouse.delete()
+        Product.objects.filter(id=self.keyboard.id).update(stock=1)
+        Product.objects.bulk_create(
+            [Product(name="Lantern Battery", description="AA", price=5, stock=1)]
+        )
+
+        assert self.search("lamp") == []
+        assert sorted(self.search("lantern")) == ["Floor Lantern", "Lantern Battery"]
+        assert self.search("wireless") == []
+        assert self.search("mechanical") == ["Mechanical Keyboard"]
+
+    def test_search_results_cached_per_query(self):
+        assert self.search("mouse") == ["Wireless Mouse"]
+        assert self.search("  Mouse ") == ["Wireless Mouse"]
+        assert self.search("lamp") == ["Desk Lamp"]
+        assert self.search("!!!") == []
+
+
+class TestProductListAsyncView(APITestCase):
+    def setUp(self):
+        self.url = reverse("products:list-async")
+
+    def test_matches_sync_view(self):
+        """Test the async listing returns the same payload as the DRF view."""
+        ProductsFactory.create(name="Laptop")
+        ProductsFactory.create(name="Lamp")
+        ProductsFactory.create(name="mouse")
+        params = {"name": "la", "ordering": "name", "page_size": 1, "page": 2}
+
+        response = self.client.get(self.url, params)
+        expected = self.client.get(reverse("products:list-create"), params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == expected.json()
+        assert response.json()["data"][0]["name"] == "Laptop"
+
+    def test_search(self):
+        """Test full-text search runs on the async listing."""
+        ProductsFactory.create(name="Laptop", description="")
+        ProductsFactory.create(name="mouse", description="Laptop mouse")
+        ProductsFactory.create(name="Lamp", description="")
+
+        response = self.client.get(self.url, {"q": "laptop"})
+        expected = self.client.get(reverse("products:list-create"), {"q": "laptop"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == expected.json()
+        assert [p["name"] for p in response.json()["data"]] == ["Laptop", "mouse"]
+
+    def test_invalid_page(self):
+        """Test requesting a page past the end."""
+        response = self.client.get(self.url, {"page": 5})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@override_settings(PRODUCT_LIST_CACHE_TIMEOUT=0)
+class TestProductListValuesSerialization(APITestCase):
+    def setUp(self):
+        self.url = reverse("products:list-create")
+        ProductsFactory.create(name="Lamp \u2028 café", price=Decimal("1234567.89"))
+        ProductsFactory.create(name="Laptop", price=Decimal("20.00"), stock=3)
+        ProductsFactory.create(name="mouse", description="Laptop mouse")
+
+    def assert_same_response(self, params):
+        response = self.client.get(self.url, params)
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            expected = self.client.get(self.url, params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == expected.content
+        assert response.content == JSONRenderer().render(response.data)
+        return response.json()
+
+    def test_matches_model_serialization(self):
+        """Test pages built from .values() rows are byte-identical."""
+        for params in (
+            {},
+            {"ordering": "price"},
+            {"name": "la", "page_size": 1, "page": 2},
+            {"q": "laptop"},
+            {"cursor": "", "ordering": "created"},
+        ):
+            self.assert_same_response(params)
+
+    def test_cursor_links(self):
+        """Test cursor links built from .values() rows page correctly."""
+        first = self.assert_same_response({"cursor": "", "page_size": 2})
+        next_url = first["pagination"]["next"]
+        cursor = next_url.split("cursor=")[1].split("&")[0]
+
+        second = self.assert_same_response({"cursor": cursor, "page_size": 2})
+
+        names = [product["name"] for product in first["data"] + second["data"]]
+        assert sorted(names) == ["Lamp \u2028 café", "Laptop", "mouse"]
+
+
+@override_settings(PRODUCT_LIST_CACHE_TIMEOUT=0)
+class TestProductListConditionalGet(APITestCase):
+    def setUp(self):
+        self.url = reverse("products:list-create")
+        self.keyboard = ProductsFactory(name="Keyboard", stock=5)
+        ProductsFactory(name="Mouse")
+
+    def test_not_modified(self):
+        """Test a matching If-None-Match gets a 304 from one query."""
+        first = self.client.get(self.url, {"q": "keyboard"})
+        assert first["Cache-Control"] == "no-cache"
+        assert first["Last-Modified"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url, {"q": "keyboard"}, HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response["ETag"] == first["ETag"]
+
+    def test_if_modified_since(self):
+        first = self.client.get(self.url)
+
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_modified_by_stock_update(self):
+        """Test stock taken by an order changes the ETag."""
+        first = self.client.get(self.url)
+        process_order([{"product_id": self.keyboard.id, "quantity": 1}])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != first["ETag"]
+
+    def test_modified_by_delete(self):
+        first = self.client.get(self.url)
+        self.keyboard.delete()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["pagination"]["count"] == 1
+
+    def test_cursor_mode_runs_no_count(self):
+        """Test the validators don't count the rows unless the page does."""
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(self.url, {"cursor": ""})
+        assert not any("COUNT(" in query["sql"] for query in queries)
+
+        self.keyboard.delete()
+        response = self.client.get(
+            self.url, {"cursor": ""}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["data"]) == 1
+
+    def test_modified_by_update_outside_the_listing(self):
+        """Test a product renamed out of a filtered listing changes its ETag."""
+        first = self.client.get(self.url, {"name": "key"})
+        self.keyboard.name = "Piano"
+        self.keyboard.save()
+
+        response = self.client.get(
+            self.url, {"name": "key"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"] == []
+
+    def test_validators_come_from_the_database(self):
+        """Test every worker sends the same ETag, whatever its cache holds."""
+        first = self.client.get(self.url)
+        cache.clear()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @override_settings(PRODUCT_LIST_CACHE_TIMEOUT=30)
+    def test_not_modified_from_cache(self):
+        """Test a cached page answers conditional requests without queries."""
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == first["ETag"]
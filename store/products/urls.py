@@ -1,5 +1,7 @@
 from django.urls import path
 from store.products.views import (
+    ProductsImportAPIView,
+    ProductsListAsyncView,
     ProductsListCreateAPIView,
 )
 
@@ -11,4 +13,14 @@ urlpatterns = [
         view=ProductsListCreateAPIView.as_view(),
         name="list-create",
     ),
+    path(
+        "import/",
+        view=ProductsImportAPIView.as_view(),
+        name="import",
+    ),
+    path(
+        "async/",
+        view=ProductsListAsyncView.as_view(),
+        name="list-async",
+    ),
 ]
@@ -0,0 +1,160 @@
+import csv
+import json
+from typing import Dict, Iterable, Iterator, List
+
+from django.db import transaction
+from django.db.models.functions import Upper
+from rest_framework.exceptions import ValidationError
+from store.products.cache import bump_catalog_generation
+from store.products.models import Product
+from store.products.serializers import ProductImportSerializer
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+
+DUPLICATE_NAME_ERROR = "A product with this name already exists."
+INVALID_ENCODING_ERROR = "Invalid UTF-8."
+
+
+class RowParseError:
+    """Stands in for a row that couldn't be decoded from the input."""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def _decode_lines(stream, invalid: List[bytes]) -> Iterator[str]:
+    """
+    Decode each line of ``stream`` as UTF-8. Undecodable lines are added to
+    ``invalid`` and decoded with replacement characters.
+    """
+    for line in stream:
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError:
+            invalid.append(line)
+            yield line.decode("utf-8", "replace")
+
+
+def read_rows(stream, input_format: str) -> Iterator[Dict]:
+    """
+    Lazily decode product rows from a binary stream of CSV (with a header
+    row) or JSON Lines. Rows that aren't valid UTF-8, and undecodable JSON
+    lines, yield a RowParseError so they are reported against their row
+    number.
+    """
+    invalid = []
+    lines = _decode_lines(stream, invalid)
+    if input_format == FORMAT_CSV:
+        reader = csv.DictReader(lines)
+        # An undecodable header shows up as unknown or missing fields.
+        if reader.fieldnames is not None:
+            invalid.clear()
+        for row in reader:
+            if invalid:
+                invalid.clear()
+                yield RowParseError(INVALID_ENCODING_ERROR)
+            else:
+                yield row
+        return
+
+    for line in lines:
+        if invalid:
+            invalid.clear()
+            yield RowParseError(INVALID_ENCODING_ERROR)
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield RowParseError("Invalid JSON.")
+            continue
+        if not isinstance(row, dict):
+            yield RowParseError("Each line must be a JSON object.")
+            continue
+        yield row
+
+
+def _existing_names(names: List[str]) -> set:
+    """Return the upper-cased names that already exist, in one query."""
+    if not names:
+        return set()
+    return set(
+        Product.objects.annotate(name_upper=Upper("name"))
+        .filter(name_upper__in=names)
+        .values_list("name_upper", flat=True)
+    )
+
+
+def _import_batch(batch, seen_names, result):
+    # One serializer validates every row; building a serializer per row
+    # costs more than the validation itself.
+    validator = ProductImportSerializer()
+    errors = []
+    valid = []
+    for row_number, row in batch:
+        if isinstance(row, RowParseError):
+            errors.append(
+                {"row": row_number, "errors": {"non_field_errors": [row.message]}}
+            )
+            continue
+
+        try:
+            valid.append((row_number, validator.run_validation(row)))
+        except ValidationError as e:
+            errors.append({"row": row_number, "errors": e.detail})
+
+    existing = _existing_names([data["name"].upper() for _, data in valid])
+
+    products = []
+    for row_number, data in valid:
+        name = data["name"].upper()
+        if name in existing or name in seen_names:
+            errors.append(
+                {"row": row_number, "errors": {"name": [DUPLICATE_NAME_ERROR]}}
+            )
+            continue
+        seen_names.add(name)
+        products.append(Product(**data))
+
+    with transaction.atomic():
+        Product.objects.bulk_create(products)
+    result["created"] += len(products)
+    result["errors"].extend(sorted(errors, key=lambda error: error["row"]))
+
+
+def import_products(rows: Iterable[Dict], batch_size: int = 1000) -> Dict:
+    """
+    Validate and insert products in batches.
+
+    Each batch is validated in memory, checked for existing names with a
+    single query and inserted with one bulk_create, so the cost per row is
+    independent of the catalog size. Names must also be unique within the
+    input.
+
+    Args:
+        rows (iterable): Product dictionaries, or RowParseError for rows
+        that couldn't be decoded.
+        batch_size (int): Number of rows validated and inserted together.
+
+    Returns:
+        dict: {"created": int, "errors": [{"row": int, "errors": dict}]}
+        where row is the 1-based position in the input.
+    """
+    result = {"created": 0, "errors": []}
+    seen_names = set()
+
+    batch = []
+    for row_number, row in enumerate(rows, start=1):
+        batch.append((row_number, row))
+        if len(batch) >= batch_size:
+            _import_batch(batch, seen_names, result)
+            batch = []
+    if batch:
+        _import_batch(batch, seen_names, result)
+
+    # bulk_create doesn't send post_save, so invalidate listings here.
+    if result["created"]:
+        transaction.on_commit(bump_catalog_generation)
+    return result
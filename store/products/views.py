@@ -1,17 +1,40 @@
+import io
+from django.conf import settings
 from rest_framework import generics
 from store.products.serializers import ProductsSerializer
-from store.products.models import Product
+from store.products.models import Product, ProductDeletion
 from django_filters import rest_framework as django_filters
 from store.products.filters import ProductFilter
+from store.products.cache import product_list_cache
+from store.products.utils.product_import import (
+    FORMAT_CSV,
+    FORMAT_JSONL,
+    import_products,
+    read_rows,
+)
 from rest_framework.response import Response
 from rest_framework import filters
 from rest_framework import status
 from store import error_codes
+from store.db_router import client_pinned, reads_from_replica
 from store.exceptions import BaseException
 from rest_framework.serializers import ValidationError
+from django.utils.cache import get_conditional_response
+from store.views import (
+    AsyncListView,
+    ConditionalListMixin,
+    ReplicaListMixin,
+    ValuesListMixin,
+    set_validators,
+)
 
 
-class ProductsListCreateAPIView(generics.ListCreateAPIView):
+class ProductsListCreateAPIView(
+    ReplicaListMixin,
+    ConditionalListMixin,
+    ValuesListMixin,
+    generics.ListCreateAPIView,
+):
     serializer_class = ProductsSerializer
     queryset = Product.objects.all()
     filter_backends = [
@@ -28,10 +51,47 @@ class ProductsListCreateAPIView(generics.ListCreateAPIView):
     ]
 
     ordering = ["-created"]
+    # Any product change or delete, including writes that move rows out of
+    # the filtered listing.
+    related_models = [Product, ProductDeletion]
+
+    def use_list_cache(self):
+        """Pinned clients must read their own writes from the primary."""
+        return not client_pinned()
+
+    def get_list_cache_timeout(self):
+        """
+        A page read from a lagging replica can miss writes the catalog
+        generation already counts, so it is kept no longer than
+        DATABASE_READ_YOUR_WRITES_SECONDS, the lag replicas are allowed.
+        """
+        timeout = settings.PRODUCT_LIST_CACHE_TIMEOUT
+        if reads_from_replica():
+            timeout = min(timeout, settings.DATABASE_READ_YOUR_WRITES_SECONDS)
+        return timeout
 
     def get(self, request, *args, **kwargs):
         try:
-            return super().get(request, *args, **kwargs)
+            cache_key, cached = (
+                product_list_cache.lookup(request, self.paginator)
+                if self.use_list_cache()
+                else (None, None)
+            )
+            if cached is not None:
+                data, etag, last_modified = cached
+                response = get_conditional_response(
+                    request, etag=etag, last_modified=last_modified
+                )
+                return set_validators(response or Response(data), etag, last_modified)
+
+            response = super().get(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                product_list_cache.store(
+                    cache_key,
+                    (response.data, *self.validators),
+                    self.get_list_cache_timeout(),
+                )
+            return response
         except BaseException as e:
             return Response(
                 {
@@ -76,3 +136,76 @@ class ProductsListCreateAPIView(generics.ListCreateAPIView):
                 },
                 e.get_http_status_code(),
             )
+
+
+class ProductsImportAPIView(generics.GenericAPIView):
+    """
+    Bulk product import. Accepts a JSON array of products, CSV with a header
+    row (text/csv) or JSON Lines (application/x-ndjson).
+    """
+
+    content_formats = {
+        "text/csv": FORMAT_CSV,
+        "application/x-ndjson": FORMAT_JSONL,
+        "application/jsonl": FORMAT_JSONL,
+    }
+
+    def get_rows(self, request):
+        input_format = self.content_formats.get(request.content_type.split(";")[0])
+        if input_format:
+            return read_rows(request.stream or io.BytesIO(), input_format)
+
+        if not isinstance(request.data, list):
+            raise ValidationError(
+                {"non_field_errors": ["Expected a list of products."]}
+            )
+        return request.data
+
+    def post(self, request):
+        try:
+            result = import_products(
+                self.get_rows(request), batch_size=settings.PRODUCT_IMPORT_BATCH_SIZE
+            )
+            if not result["created"] and result["errors"]:
+                raise ValidationError(result["errors"])
+
+            return Response(
+                {
+                    "status": "success",
+                    "message": "Products imported.",
+                    "data": result,
+                },
+                status.HTTP_201_CREATED,
+            )
+        except ValidationError as e:
+            return Response(
+                {
+                    "errors": e.detail,
+                    "code": error_codes.VALIDATION_ERROR,
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        except BaseException as e:
+            return Response(
+                {
+                    "status": "error",
+                    "code": e.get_error_code(),
+                    "message": str(e),
+                    "errors": e.get_errors(),
+                },
+                e.get_http_status_code(),
+            )
+
+
+class ProductsListAsyncView(AsyncListView):
+    """Async variant of GET /products/ for ASGI deployments."""
+
+    serializer_class = ProductsSerializer
+    filter_backends = ProductsListCreateAPIView.filter_backends
+    filterset_class = ProductsListCreateAPIView.filterset_class
+    ordering_fields = ProductsListCreateAPIView.ordering_fields
+    ordering = ProductsListCreateAPIView.ordering
+
+    def get_queryset(self):
+        return Product.objects.all()
@@ -0,0 +1,71 @@
+"""
+JSON renderer backed by orjson, when it is installed.
+"""
+
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+# Python writes floats outside this range in exponent notation ("1e+16"),
+# which orjson spells differently ("1e16").
+_PLAIN_FLOAT_RANGE = (1e-4, 1e16)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson.
+
+    The output is byte-for-byte what JSONRenderer produces with the
+    project's settings: compact, UTF-8, U+2028 and U+2029 escaped, and
+    dates, Decimals, UUIDs and lazy strings formatted by DRF's encoder.
+    Data orjson can't encode the same way (non-string keys, huge ints,
+    Decimals that would render in exponent notation), indented responses
+    and a missing orjson all fall back to JSONRenderer. Native floats, which
+    the API never returns, are the one exception: orjson writes them
+    without the exponent sign and writes NaN as null.
+    """
+
+    _encoder = JSONEncoder()
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            value = float(obj)
+            low, high = _PLAIN_FLOAT_RANGE
+            if value and not low <= abs(value) < high:
+                # Makes orjson fail, so JSONRenderer renders the response.
+                raise TypeError(f"{obj!r} renders in exponent notation")
+            return value
+        return self._encoder.default(obj)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.default,
+                # Dates and dataclasses go through DRF's encoder, as they
+                # would with JSONRenderer.
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # JSONRenderer escapes these so the output is also valid JavaScript.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+from django.utils.functional import cached_property
+
+
+class ValuesSerializerMixin:
+    """
+    Read-only serialization of ``QuerySet.values()`` rows.
+
+    to_representation_values returns what ``.data`` returns for the same
+    objects, using each field's own to_representation, but without building
+    model instances or going through DRF's per-field attribute lookup.
+
+    Every readable field must either read a model column (its ``source`` may
+    follow foreign keys with dots) or have ``source="*"``, like a
+    SerializerMethodField. Those are passed the row with its columns as
+    attributes; list the columns they read in ``extra_value_fields``.
+    """
+
+    extra_value_fields = ()
+
+    @cached_property
+    def _value_fields(self):
+        # (output name, column or None for the whole row, to_representation)
+        return [
+            (
+                field.field_name,
+                None if field.source == "*" else "__".join(field.source_attrs),
+                field.to_representation,
+            )
+            for field in self._readable_fields
+        ]
+
+    def get_value_fields(self):
+        """Return the field names to pass to ``QuerySet.values()``."""
+        columns = [column for _, column, _ in self._value_fields if column]
+        for column in self.extra_value_fields:
+            if column not in columns:
+                columns.append(column)
+        return columns
+
+    def to_representation_values(self, rows):
+        """
+        Args:
+            rows (list): Dicts from ``.values(*self.get_value_fields())``.
+
+        Returns:
+            list: The representation of every row, in order.
+        """
+        fields = self._value_fields
+        data = []
+        for row in rows:
+            representation = {}
+            for name, column, to_representation in fields:
+                value = row[column] if column else SimpleNamespace(**row)
+                representation[name] = (
+                    None if value is None else to_representation(value)
+                )
+            data.append(representation)
+        return data
@@ -0,0 +1,62 @@
+"""
+Bounded thread pool for running sync-only code from async views.
+
+Django's async ORM covers simple reads, but transactions (``process_order``)
+and serializer validation that queries the database are sync-only. Running
+them through a fixed-size pool caps how many threads, and therefore how
+many database connections, the async request path can hold at once.
+"""
+
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_SYNC_WORKERS,
+                thread_name_prefix="store-sync",
+            )
+        return _executor
+
+
+def _with_connection_cleanup(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Pool threads outlive requests, so they don't get the per-request
+        # connection cleanup; do it around every call instead.
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return wrapper
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    Await ``func(*args, **kwargs)`` on the bounded pool.
+
+    With ASYNC_SYNC_WORKERS = 0 the call falls back to Django's
+    thread-sensitive ``sync_to_async``, which shares the request thread's
+    database connection (and so its transaction, which tests rely on).
+    """
+    if not settings.ASYNC_SYNC_WORKERS:
+        return await sync_to_async(func)(*args, **kwargs)
+
+    return await sync_to_async(
+        _with_connection_cleanup(func),
+        thread_sensitive=False,
+        executor=get_executor(),
+    )(*args, **kwargs)
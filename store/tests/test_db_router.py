@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import patch
+from django.core.cache import caches
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from store.db_router import PIN_COOKIE, PRIMARY, read_alias, replica_reads
+from store.orders.models import Order
+from store.orders.utils.order_processing import process_order
+from store.products.models import Product
+from store.products.serializers import ProductsSerializer
+from store.products.tests.factories import ProductsFactory
+
+P1 = "00000000-0000-7000-8000-000000000001"
+
+REPLICA = "replica_1"
+
+# The replica is a separate database that nothing replicates to, so a read
+# shows which database it was sent to. Reads inside a transaction on the
+# primary stay there, hence transaction=True.
+pytestmark = pytest.mark.django_db(transaction=True, databases=[PRIMARY, REPLICA])
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = [REPLICA]
+    settings.PRODUCT_LIST_CACHE_TIMEOUT = 0
+    return settings
+
+
+def listed_names(client):
+    response = client.get(reverse("products:list-create"))
+    return [product["name"] for product in response.json()["data"]]
+
+
+def test_list_views_read_from_replica(replica):
+    ProductsFactory(name="On primary")
+    Product.objects.using(REPLICA).create(
+        name="On replica", description="", price=10, stock=1
+    )
+    client = APIClient()
+
+    assert listed_names(client) == ["On replica"]
+    assert client.get(reverse("order:list-create")).json()["data"] == []
+    assert client.get(reverse("analytics:revenue")).json()["data"]["orders"] == 0
+
+
+def test_reads_use_primary_without_replicas():
+    ProductsFactory(name="On primary")
+
+    assert listed_names(APIClient()) == ["On primary"]
+
+
+def test_write_pins_client_to_primary(replica):
+    client = APIClient()
+    response = client.post(
+        reverse("products:list-create"),
+        {"name": "Mine", "description": "Mine", "price": 10, "stock": 1},
+        format="json",
+    )
+
+    assert response.cookies[PIN_COOKIE]["max-age"] == 10
+    assert listed_names(client) == ["Mine"]
+    assert listed_names(APIClient()) == []
+
+
+def test_failed_write_does_not_pin_client(replica):
+    response = APIClient().post(
+        reverse("products:list-create"), {"name": "123"}, format="json"
+    )
+
+    assert response.status_code == 400
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_checkout_and_name_check_use_primary(replica):
+    ProductsFactory(id=P1, name="Mouse", stock=5)
+
+    with replica_reads():
+        assert ProductsSerializer().name_exists("mouse")
+        order = process_order([{"product_id": P1, "quantity": 2}])
+
+    assert Order.objects.get(id=order.id).total_price == 200
+    assert Product.objects.get(id=P1).stock == 3
+
+
+def test_read_alias(replica):
+    assert read_alias() == PRIMARY
+    with replica_reads():
+        assert read_alias() == REPLICA
+        with transaction.atomic():
+            assert read_alias() == PRIMARY
+
+
+def test_list_cache_keeps_replica_pages_for_the_lag_window(replica):
+    replica.PRODUCT_LIST_CACHE_TIMEOUT = 30
+    replica.DATABASE_READ_YOUR_WRITES_SECONDS = 5
+    writer = APIClient()
+    writer.post(
+        reverse("products:list-create"),
+        {"name": "Mine", "description": "Mine", "price": 10, "stock": 1},
+        format="json",
+    )
+
+    # Read from the lagging replica after the write's generation bump.
+    cache = caches["default"]
+    with patch.object(cache, "set", wraps=cache.set) as cache_set:
+        assert listed_names(APIClient()) == []
+    assert cache_set.call_args.args[2] == 5
+    # The writer reads its write from the primary, not that cached page.
+    assert listed_names(writer) == ["Mine"]
+    # The write reaches the replica, which bumps no generation here.
+    Product.objects.using(REPLICA).bulk_create(
+        [Product(name="Replicated", description="", price=10, stock=1)]
+    )
+    # Other readers get the cached page until it expires.
+    assert listed_names(APIClient()) == []
+    cache.clear()
+    assert listed_names(APIClient()) == ["Replicated"]
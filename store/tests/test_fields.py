@@ -0,0 +1,80 @@
+import pytest
+import uuid
+from django.core.exceptions import ValidationError
+from django.db import connection
+from store.fields import convert_uuid_columns, parse_uuid, uuid7
+from store.orders.tests.factories import OrderItemFactory
+from store.products.models import Product
+from store.products.tests.factories import ProductsFactory
+
+
+def stored_ids(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT id FROM {table} ORDER BY id")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def test_uuid7_is_time_ordered():
+    keys = [uuid7()]
+    for _ in range(50):
+        keys.append(uuid7())
+
+    value = uuid.UUID(keys[0])
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert len(set(keys)) == len(keys)
+    # The leading 48 bits are a millisecond timestamp.
+    assert [key[:13] for key in keys] == sorted(key[:13] for key in keys)
+
+
+def test_parse_uuid():
+    value = "0195a1f8-3c2e-7d4b-9a61-2f0c8e5b7a13"
+
+    assert parse_uuid(value.upper()) == value
+    assert parse_uuid(value.replace("-", "")) == value
+    assert parse_uuid(uuid.UUID(value)) == value
+    assert parse_uuid("99999999") is None
+
+
+@pytest.mark.django_db
+def test_keys_are_stored_in_16_bytes():
+    item = OrderItemFactory()
+
+    assert isinstance(item.id, str)
+    assert stored_ids("order_items") == [uuid.UUID(item.id).bytes]
+    assert stored_ids("products") == [uuid.UUID(item.product_id).bytes]
+    # Any form of the UUID finds the row, and it comes back canonical.
+    product = Product.objects.get(id=item.product_id.upper().replace("-", ""))
+    assert product.id == item.product_id
+    assert product.orderitem_set.get().id == item.id
+
+
+@pytest.mark.django_db
+def test_invalid_key_lookup_raises_validation_error():
+    with pytest.raises(ValidationError):
+        Product.objects.filter(id="not-a-uuid").exists()
+
+
+@pytest.mark.django_db
+def test_keys_sort_like_their_strings():
+    products = ProductsFactory.create_batch(5)
+
+    assert list(Product.objects.order_by("id").values_list("id", flat=True)) == sorted(
+        product.id for product in products
+    )
+
+
+# The SQLite schema editor can't run inside the test's transaction.
+@pytest.mark.django_db(transaction=True)
+def test_convert_uuid_columns():
+    products = ProductsFactory.create_batch(3)
+    ids = sorted(product.id for product in products)
+
+    with connection.schema_editor() as schema_editor:
+        convert_uuid_columns(schema_editor, [("products", "id")], to_binary=False)
+    assert stored_ids("products") == ids
+
+    with connection.schema_editor() as schema_editor:
+        convert_uuid_columns(schema_editor, [("products", "id")])
+    assert stored_ids("products") == [uuid.UUID(id).bytes for id in ids]
+    assert sorted(Product.objects.values_list("id", flat=True)) == ids
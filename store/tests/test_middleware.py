@@ -0,0 +1,87 @@
+import json
+import re
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from store import instrumentation
+from store.orders.models import Order
+from store.orders.tests.factories import OrderItemFactory
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class TestRequestMetricsMiddleware(APITestCase):
+    def setUp(self):
+        self.url = reverse("order:list-create")
+        OrderItemFactory.create_batch(3)
+
+    def test_server_timing_header(self):
+        """Test the response carries query count and timings."""
+        response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        metrics = parse_server_timing(response["Server-Timing"])
+        assert set(metrics) == {"db", "serializer", "view", "total"}
+        # Count, orders page and prefetched items with their products.
+        assert metrics["db"]["desc"] == '"3 queries"'
+        assert float(metrics["serializer"]["dur"]) > 0
+        assert float(metrics["total"]["dur"]) >= float(metrics["view"]["dur"])
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=False)
+    def test_server_timing_header_disabled(self):
+        response = self.client.get(self.url)
+
+        assert "Server-Timing" not in response
+
+    @override_settings(REQUEST_METRICS_LOG=True)
+    def test_structured_log_line(self):
+        with self.assertLogs("store.request_metrics", "INFO") as logs:
+            self.client.get(self.url)
+
+        line = json.loads(logs.records[0].getMessage())
+        assert logs.records[0].levelname == "INFO"
+        assert line["path"] == self.url
+        assert line["status"] == status.HTTP_200_OK
+        assert line["queries"] == 3
+        assert "slow_queries" not in line
+
+    @override_settings(REQUEST_METRICS_MAX_QUERIES=1)
+    def test_logs_call_sites_past_query_threshold(self):
+        """Test queries past the threshold are logged with their call site."""
+        with self.assertLogs("store.request_metrics", "WARNING") as logs:
+            self.client.get(self.url)
+
+        line = json.loads(logs.records[0].getMessage())
+        assert len(line["slow_queries"]) == 2
+        for query in line["slow_queries"]:
+            assert query["stack"]
+            assert all(
+                re.match(r"store/\S+\.py:\d+ in ", frame) for frame in query["stack"]
+            )
+
+    def test_reports_repeated_queries(self):
+        """Test an N+1 loop shows up as one repeated statement."""
+        metrics = instrumentation.RequestMetrics(max_queries=2)
+        token = instrumentation.activate(metrics)
+        try:
+            names = [
+                item.product.name
+                for order in Order.objects.all()
+                for item in order.items.all()
+            ]
+        finally:
+            instrumentation.deactivate(token)
+
+        report = metrics.report()
+        assert len(names) == 3
+        # One query for the orders, then one per order and one per product.
+        assert report["queries"] == 7
+        assert [query["count"] for query in report["repeated_queries"]] == [3, 3]
@@ -0,0 +1,59 @@
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+from store import renderers
+from store.renderers import FastJSONRenderer
+
+
+class TestFastJSONRenderer(SimpleTestCase):
+    def assert_same_output(self, data, accepted_media_type=None):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        assert FastJSONRenderer().render(data, accepted_media_type) == expected
+
+    def test_matches_json_renderer(self):
+        """Test the output is byte-identical to JSONRenderer."""
+        self.assert_same_output(
+            {
+                "text": 'Café \u2028 \u2029 "quoted" \\ / \x00\x1f\x7f\n\t\U0001f600',
+                "prices": [Decimal("20.00"), Decimal("1.10"), Decimal("0")],
+                "total": Decimal("123456789012.34"),
+                "created": datetime(2024, 5, 1, 12, 30, 15, 123456, timezone.utc),
+                "offset": datetime(
+                    2024, 5, 1, 12, 30, tzinfo=timezone(timedelta(hours=2))
+                ),
+                "day": date(2024, 5, 1),
+                "at": time(8, 15, 30, 500),
+                "duration": timedelta(hours=1, seconds=3),
+                "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+                "label": gettext_lazy("Lazy"),
+                "errors": ReturnDict(
+                    {"name": [ErrorDetail("Required.", code="required")]},
+                    serializer=None,
+                ),
+                "nested": [{"a": None, "b": True, "c": 1.5}, (1, 2)],
+            }
+        )
+
+    def test_falls_back_to_json_renderer(self):
+        """Test data orjson renders differently still matches JSONRenderer."""
+        self.assert_same_output({1: "int key", None: "none key"})
+        self.assert_same_output({"big": 2**70})
+        self.assert_same_output(
+            {"huge": Decimal("1E+20"), "tiny": Decimal("0.00001")}
+        )
+        self.assert_same_output({"a": [1, 2]}, "application/json; indent=2")
+
+    def test_without_orjson(self):
+        """Test JSONRenderer is used when orjson isn't installed."""
+        with patch.object(renderers, "orjson", None):
+            self.assert_same_output({"price": Decimal("9.99"), "name": "\u2028"})
+
+    def test_empty_body(self):
+        assert FastJSONRenderer().render(None) == b""
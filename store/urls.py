@@ -17,6 +17,10 @@ urlpatterns = [
         "products/",
         include("store.products.urls", namespace="products"),
     ),
+    path(
+        "analytics/",
+        include("store.analytics.urls", namespace="analytics"),
+    ),
     path(
         "apis/",
         include("store.apis.urls", namespace="apis"),
@@ -0,0 +1,196 @@
+import hashlib
+from calendar import timegm
+
+from django.conf import settings
+from django.db.models import Count, Max, Subquery
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from store import error_codes
+from store.db_router import replica_reads
+from store.pagination import COUNT_EXACT, AsyncPagination
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    """JsonResponse rendered like the DRF views (compact, DRF encoder)."""
+    return JsonResponse(
+        data,
+        status=status_code,
+        encoder=JSONEncoder,
+        safe=False,
+        json_dumps_params={"separators": (",", ":"), "ensure_ascii": False},
+    )
+
+
+class ReplicaListMixin:
+    """
+    List action for generic views that reads from a replica, if configured.
+    See store.db_router.
+    """
+
+    def list(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().list(request, *args, **kwargs)
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Add the validators to ``response`` and have clients revalidate.
+
+    Args:
+        etag (str): Quoted ETag of the representation.
+        last_modified (int): Its modification time as a Unix timestamp, or
+        None.
+    """
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class ConditionalListMixin:
+    """
+    Conditional GET for list views.
+
+    The ETag and Last-Modified of a listing are computed from MAX(modified)
+    of the filtered queryset, so a request whose If-None-Match or
+    If-Modified-Since still matches is answered with 304 before the page is
+    fetched or serialized. When the pagination counts the rows exactly
+    anyway, COUNT(*) is computed in the same query, reused by the
+    pagination, and part of the ETag. Other count modes run no count.
+
+    Rows that change must update ``modified``, including through
+    ``QuerySet.update()``. Listings that also show columns of other rows
+    name those models in ``related_models``; the latest ``modified`` of
+    each is part of the validators. Deletes don't change MAX(modified), so
+    views whose rows can be deleted record deletes in a model with a
+    ``modified`` column and name it there too.
+    """
+
+    related_models = ()
+
+    def get_validators(self, queryset, count=False):
+        """
+        Args:
+            count (bool): Also count the rows.
+
+        Returns:
+            tuple: (ETag, Last-Modified timestamp or None, row count or
+            None)
+        """
+        aggregates = {
+            f"modified_{index}": Max(
+                Subquery(
+                    model.objects.order_by("-modified").values("modified")[:1]
+                )
+            )
+            for index, model in enumerate(self.related_models)
+        }
+        aggregates["modified"] = Max("modified")
+        if count:
+            aggregates["count"] = Count("pk")
+        stats = queryset.order_by().aggregate(**aggregates)
+        row_count = stats.pop("count", None)
+        modified = [value for value in stats.values() if value is not None]
+        last_modified = timegm(max(modified).utctimetuple()) if modified else None
+        digest = hashlib.sha1(
+            ":".join(
+                [str(row_count)] + [str(value) for _, value in sorted(stats.items())]
+            ).encode()
+        ).hexdigest()
+        return quote_etag(digest), last_modified, row_count
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        count = (
+            self.paginator is not None
+            and self.paginator.get_request_count_mode(request) == COUNT_EXACT
+        )
+        etag, last_modified, row_count = self.get_validators(queryset, count)
+        self.validators = (etag, last_modified)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            if row_count is not None:
+                self.paginator.known_count = row_count
+            response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+
+class ValuesListMixin:
+    """
+    List action for generic views whose serializer uses
+    ValuesSerializerMixin: the page is fetched with ``.values()`` and
+    serialized from the rows, which gives the same response as
+    ListModelMixin.list for a fraction of the CPU time. Disabled by the
+    FAST_LIST_SERIALIZATION setting.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_LIST_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.get_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        # Related rows are loaded by the serializer, once per page.
+        rows = queryset.prefetch_related(None).values(*serializer.get_value_fields())
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation_values(page)
+            )
+        return Response(serializer.to_representation_values(list(rows)))
+
+
+class AsyncListView(View):
+    """
+    Async list endpoint that mirrors a DRF list view.
+
+    Subclasses set ``serializer_class``, ``filter_backends`` and the
+    filter/ordering attributes those backends read, exactly as on the DRF
+    view, and implement ``get_queryset``. Filtering reuses the DRF backends;
+    counting and fetching the page use the async ORM.
+    """
+
+    serializer_class = None
+    filter_backends = []
+    pagination_class = AsyncPagination
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def filter_queryset(self, request, queryset):
+        drf_request = Request(request)
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(drf_request, queryset, self)
+        return queryset
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            queryset = self.filter_queryset(request, self.get_queryset())
+        except ValidationError as e:
+            return json_response(
+                {"errors": e.detail, "code": error_codes.VALIDATION_ERROR},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        with replica_reads():
+            page = await self.pagination_class().paginate_queryset(queryset, request)
+        if page is None:
+            return json_response(
+                {"detail": "Invalid page."}, status.HTTP_404_NOT_FOUND
+            )
+
+        rows, pagination = page
+        data = self.serializer_class(rows, many=True).data
+        return json_response({"pagination": pagination, "data": data})